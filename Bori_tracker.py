@@ -1,19 +1,49 @@
-import pandas as pd
-import numpy as np
+from __future__ import annotations
 import time
+# Instante de arranque del proceso (antes de las importaciones pesadas) para medir el tiempo hasta el primer tick
+STARTUP_PERF_COUNTER = time.perf_counter()
+import numpy as np
 import os
-import matplotlib.pyplot as plt
+import copy
 import sys
-import select
-import tty
-import termios
 import random 
-import requests 
 import json
+import abc
+import re
+import struct
+import io
+import tempfile
+import shutil
+import threading
+import queue
+import heapq
 import warnings
+from collections import deque, namedtuple
 # Suprimir advertencias de Matplotlib/Pandas
 warnings.filterwarnings("ignore")
 
+
+class _LazyModule:
+    """Importa el módulo recién en el primer acceso a uno de sus atributos.
+
+    pandas y requests solo se usan en reportes, backtests y en el hilo del feed: cargarlos
+    perezosamente deja el arranque del loop en lo que cuesta NumPy.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            import importlib
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+pd = _LazyModule('pandas')
+requests = _LazyModule('requests')
+
 # --- Códigos ANSI para colores (Estética mejorada) ---
 class Colors:
     HEADER = '\033[95m'
@@ -47,6 +77,16 @@ class BotConfiguration:
         
         # 🚨 PARÁMETRO DE ORDEN LIMITADA 
         self.LIMIT_ORDER_OFFSET_PCT = 0.0005 
+        # Pipeline de órdenes en vivo: lotes por viaje y lotes simultáneos en vuelo
+        self.ORDER_PIPELINE_ENABLED = True
+        self.ORDER_MAX_BATCH = 50
+        self.ORDER_MAX_IN_FLIGHT = 4
+        self.ORDER_FLUSH_TIMEOUT_SECONDS = 5.0
+        # Exchange simulado (hasta conectar uno real): latencia por lote, rechazos y llenados parciales
+        self.MOCK_EXCHANGE_LATENCY_SECONDS = 0.05
+        self.MOCK_EXCHANGE_JITTER_SECONDS = 0.02
+        self.MOCK_EXCHANGE_REJECT_RATE = 0.02
+        self.MOCK_EXCHANGE_PARTIAL_FILL_RATE = 0.1
         
         # ==========================================================
         # 🌐 ACTIVOS Y MAPPING A COINGECKO ID (TOTAL: 30 ACTIVOS)
@@ -84,12 +124,100 @@ class BotConfiguration:
         # ⏳ TIEMPO Y ESTRATEGIA (MODO DCA/ACUMULACIÓN)
         # ==========================================================
         self.TICK_INTERVAL_SECONDS = 12.0   
+        # API de CoinGecko (se puede apuntar al servidor local de prueba) y su caché
+        self.COINGECKO_API_URL = os.environ.get('BORI_COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
+        self.COINGECKO_CACHE_TTL_SECONDS = 10.0
+        self.COINGECKO_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'boritracker_coingecko_cache.json')
+        # Plan de consultas: lotes por largo de URL, en paralelo y con un presupuesto común de consultas
+        self.COINGECKO_MAX_URL_LENGTH = 8000
+        self.COINGECKO_MAX_CONCURRENCY = 4
+        self.COINGECKO_REQUESTS_PER_MINUTE = 30
+        self.COINGECKO_REQUEST_BURST = 10
+        # Índice local de /coins/list para los activos que no están en COINGECKO_IDS
+        self.COINGECKO_COINS_LIST_PATH = os.path.join(tempfile.gettempdir(), 'boritracker_coins_list.json')
+        self.COINGECKO_COINS_LIST_MAX_AGE_SECONDS = 86400
+        # Feed de precios en segundo plano (no bloquea el loop) y tolerancia de datos viejos
+        self.PRICE_FEED_BACKGROUND = True
+        self.PRICE_STALE_AFTER_SECONDS = self.TICK_INTERVAL_SECONDS * 3
+        self.FEED_BACKOFF_BASE_SECONDS = 1.0
+        self.FEED_BACKOFF_MAX_SECONDS = 120.0
+        # Fuente del feed: 'coingecko' (consulta periódica) o 'websocket' (canal ticker por push, formato Coinbase)
+        self.PRICE_FEED = os.environ.get('BORI_PRICE_FEED', 'coingecko')
+        self.WS_FEED_URL = os.environ.get('BORI_WS_URL', 'wss://ws-feed.exchange.coinbase.com')
+        self.WS_QUOTE_CURRENCY = 'USD'
+        # Ventana de coalescencia: las ráfagas de un mismo activo se reducen a su último precio por ventana
+        self.WS_PUBLISH_INTERVAL_SECONDS = 0.1
+        # Semilla de los generadores aleatorios (None = aleatoria, se graba en el diario)
+        self.RNG_SEED = None
+        # Diario binario de la sesión para reproducción determinista (None = desactivado)
+        self.JOURNAL_PATH = os.environ.get('BORI_JOURNAL_PATH')
+        # Registro de compras columnar: volcado incremental (.parquet, .arrow o .csv; None = solo en memoria)
+        self.LEDGER_PATH = os.environ.get('BORI_LEDGER_PATH')
+        self.LEDGER_INITIAL_CAPACITY = 1024
+        self.LEDGER_FLUSH_ROWS = 4096
+        self.LEDGER_FLUSH_SECONDS = 60.0
+        # Checkpoints atómicos del estado completo (balances, ventanas, RSI, índice, métricas y ledger)
+        # para reanudar con --resume tras una caída; sin ruta no se escriben
+        self.CHECKPOINT_PATH = os.environ.get('BORI_CHECKPOINT_PATH')
+        self.CHECKPOINT_INTERVAL_SECONDS = 30.0
+        # Instrumentación por etapa del loop: se activa al definir un archivo (.json o texto
+        # Prometheus) y/o un puerto local (/metrics y /metrics.json). Sin ninguno no hay costo.
+        self.METRICS_EXPORT_PATH = os.environ.get('BORI_METRICS_PATH')
+        self.METRICS_PORT = int(os.environ['BORI_METRICS_PORT']) if os.environ.get('BORI_METRICS_PORT') else None
+        self.METRICS_EXPORT_INTERVAL_SECONDS = 5.0
+        # Tick visual (micro-movimientos simulados entre consultas reales); 0 = solo datos reales.
+        # El loop duerme entre eventos: es el intervalo de un timer, no un sondeo.
         self.DISPLAY_INTERVAL_SECONDS = 0.001 
+        # Redibujo del contador de la pantalla cuando no llegan precios
+        self.DISPLAY_REFRESH_SECONDS = 1.0
+        # Historial acotado (valor del portafolio / índice): puntos crudos recientes y
+        # niveles agregados (x HISTORY_ROLLUP_FACTOR cada uno) con techo fijo de memoria
+        self.HISTORY_RAW_POINTS = 20000
+        self.HISTORY_ROLLUP_FACTOR = 10
+        self.HISTORY_ROLLUP_LEVELS = 6
+        self.HISTORY_LEVEL_POINTS = 20000
+        # Máximo de cuadros por segundo en pantalla (independiente del tick visual)
+        self.RENDER_MAX_FPS = 20
+        # Gráfico del reporte final: archivo .png o .svg (backend sin pantalla), decimado a un punto
+        # por píxel horizontal ('lttb' o 'minmax') y dibujado en un proceso aparte para no demorar el reporte
+        self.REPORT_CHART_PATH = os.environ.get('BORI_REPORT_PATH', 'boritracker_reporte.png')
+        self.REPORT_FIGSIZE = (12, 6)
+        self.REPORT_DPI = 100
+        self.REPORT_DOWNSAMPLE = 'lttb'
+        self.REPORT_BACKGROUND = True
+        # Abrir además la ventana interactiva de Matplotlib (bloquea hasta cerrarla)
+        self.REPORT_SHOW = False
         self.INITIAL_HISTORY_TICKS = 28 
+        # Capacidad fija de la ventana de precios por activo (buffer circular)
+        self.PRICE_WINDOW_SIZE = 300
+        # Simulador de mercado (mock): volatilidad y log-retorno medio por tick de lógica, correlación
+        # entre activos y saltos de mercado comunes (probabilidad por tick, media y desvío del log-salto)
+        self.SIM_STEP_VOLATILITY = 0.005
+        self.SIM_DRIFT = 0.0
+        self.SIM_CORRELATION = 0.6
+        self.SIM_JUMP_INTENSITY = 0.002
+        self.SIM_JUMP_MEAN = -0.03
+        self.SIM_JUMP_STD = 0.015
+        self.SIM_CHUNK_SIZE = 4096
+        # Escala de los movimientos simulados en ticks visuales y en precios de fallback
+        self.SIM_VISUAL_TICK_SCALE = 1e-4
+        self.SIM_FALLBACK_SCALE = 0.025
+        # Límite de ticks de lógica de la sesión (0 = sin límite, hasta Ctrl+C / SIGTERM)
         self.MAX_SIMULATION_TICKS = 0 
         self.RSI_PERIOD = 5             
+        # Suavizado del RSI: 'ema' (ewm span=RSI_PERIOD) o 'wilder' (alpha=1/RSI_PERIOD)
+        self.RSI_SMOOTHING = 'ema'
         # El bot solo buscará este umbral para comprar
         self.RSI_BUY_THRESHOLD = 15    
+        # Señal de compra declarativa (condiciones sobre indicadores unidas con & y |), p. ej.
+        # 'rsi <= RSI_BUY_THRESHOLD & close < bb_lower(20, 2)' o 'rsi <= 20 & macd_hist > 0'
+        self.BUY_SIGNAL = 'rsi <= RSI_BUY_THRESHOLD'
+        # Temporalidad en la que se evalúa BUY_SIGNAL: 'tick' (cada tick de lógica) o una vela
+        # ('1m', '5m', '1h', '1d'...): el RSI y la señal corren sobre los cierres y se compra al cerrar la vela
+        self.SIGNAL_TIMEFRAME = 'tick'
+        # Velas OHLC que se construyen con los ticks reales y cuántas conserva cada temporalidad
+        self.CANDLE_TIMEFRAMES = ('1m', '5m', '1h', '1d')
+        self.CANDLE_WINDOW = 500
         # ESTOS PARÁMETROS YA NO SE USAN EN EL MODO DCA
         self.RSI_SELL_THRESHOLD = 999 
         self.STOP_LOSS_PCT = 0.00    
@@ -100,7 +228,92 @@ class BotConfiguration:
         # La asignación por activo se calcula automáticamente en base a 1000
         self.CAPITAL_PER_ASSET = self.INITIAL_USDC_BALANCE / len(self.ASSETS_TO_TRACK)
         self.USDC_TO_TRADE_PCT = self.MAX_CAPITAL_ALLOCATION_PCT
+        # Parámetros fijados explícitamente (archivo, entorno, argv) en cualquier apply_overrides previo
+        self.explicit_keys = frozenset()
         
+    def set_assets(self, tickers: list):
+        """Reemplaza la lista de activos y recalcula los valores derivados."""
+        self.ASSETS_TO_TRACK = list(tickers)
+        self.INITIAL_PRICES = {ticker: self.INITIAL_PRICES.get(ticker, 1.0) for ticker in self.ASSETS_TO_TRACK}
+        self.CAPITAL_PER_ASSET = self.INITIAL_USDC_BALANCE / len(self.ASSETS_TO_TRACK)
+
+    def apply_overrides(self, overrides: dict):
+        """Aplica parámetros (archivo, entorno o argv) convirtiendo el texto al tipo del valor actual.
+
+        Los valores derivados (asignación por activo, tolerancia de datos viejos) se recalculan
+        salvo que hayan venido explícitos en esta llamada o en una anterior (p. ej. el --set base
+        de una copia por portafolio en multi).
+        """
+        explicit = set()
+        for key, value in overrides.items():
+            key = key.upper()
+            if not hasattr(self, key):
+                raise ValueError(f"Parámetro de configuración desconocido: {key}")
+            setattr(self, key, self._coerce(getattr(self, key), value))
+            explicit.add(key)
+        # Conjunto nuevo (no mutado): las copias con copy.copy no comparten lo que agregue cada una
+        self.explicit_keys = self.explicit_keys | explicit
+        fixed = self.explicit_keys
+
+        if 'ASSETS_TO_TRACK' in explicit:
+            capital_per_asset = self.CAPITAL_PER_ASSET
+            self.set_assets(self.ASSETS_TO_TRACK)
+            if 'CAPITAL_PER_ASSET' in fixed:
+                self.CAPITAL_PER_ASSET = capital_per_asset
+        elif 'CAPITAL_PER_ASSET' not in fixed:
+            self.CAPITAL_PER_ASSET = self.INITIAL_USDC_BALANCE / len(self.ASSETS_TO_TRACK)
+        if 'USDC_TO_TRADE_PCT' not in fixed:
+            self.USDC_TO_TRADE_PCT = self.MAX_CAPITAL_ALLOCATION_PCT
+        if 'PRICE_STALE_AFTER_SECONDS' not in fixed:
+            self.PRICE_STALE_AFTER_SECONDS = self.TICK_INTERVAL_SECONDS * 3
+        if 'BUY_SIGNAL' in explicit:
+            BuySignal(self.BUY_SIGNAL, self)  # Valida la expresión antes de arrancar (ValueError)
+        if explicit & {'SIGNAL_TIMEFRAME', 'CANDLE_TIMEFRAMES'}:
+            unknown = [tf for tf in (self.SIGNAL_TIMEFRAME, *self.CANDLE_TIMEFRAMES)
+                       if tf != 'tick' and tf not in TIMEFRAME_SECONDS]
+            if unknown:
+                raise ValueError(f"Temporalidad desconocida: {', '.join(unknown)} (use tick o {', '.join(TIMEFRAME_SECONDS)})")
+        return explicit
+
+    @staticmethod
+    def _coerce(current, value):
+        if not isinstance(value, str):
+            return tuple(value) if isinstance(current, tuple) and isinstance(value, list) else value
+        text = value.strip()
+        if isinstance(current, bool):
+            return text.lower() in ('1', 'true', 's', 'si', 'sí', 'y', 'yes', 'on')
+        if isinstance(current, int):
+            return int(text)
+        if isinstance(current, float):
+            return float(text)
+        if isinstance(current, (list, tuple, dict)):
+            parsed = json.loads(text) if text[:1] in '[{' else [item.strip() for item in text.split(',') if item.strip()]
+            return tuple(parsed) if isinstance(current, tuple) else parsed
+        if current is None:
+            if text.lower() in ('', 'none', 'null'):
+                return None
+            try:
+                return json.loads(text)
+            except ValueError:
+                return text
+        return text
+
+    def load_sources(self, path: str = None, env: dict = None, overrides: dict = None):
+        """Configuración sin menú: archivo (.json/.toml) < variables BORI_<PARÁMETRO> < `overrides` (argv)."""
+        merged = {}
+        if path:
+            with open(path, 'rb') as f:
+                if path.endswith('.toml'):
+                    import tomllib
+                    merged.update(tomllib.load(f))
+                else:
+                    merged.update(json.load(f))
+        env = os.environ if env is None else env
+        merged.update({key[5:]: value for key, value in env.items()
+                       if key.startswith('BORI_') and key[5:] in vars(self)})
+        merged.update(overrides or {})
+        return self.apply_overrides(merged)
+
     def display_options(self, mode):
         """Muestra los parámetros de configuración."""
         print(f"{Colors.HEADER}="*70)
@@ -130,48 +343,839 @@ class BotConfiguration:
 CONFIG = BotConfiguration()
 RSI_PERIOD = CONFIG.RSI_PERIOD
 
+# -----------------------------------------------------------
+# 🗄️ HISTORIAL ACOTADO MULTI-RESOLUCIÓN
+# -----------------------------------------------------------
+class TieredSeries:
+    """Serie temporal con techo fijo de memoria.
+
+    Los últimos `raw_capacity` valores se guardan a resolución completa; los más viejos se
+    agregan en buckets (primer índice, min, max, último, muestras) cada vez más gruesos
+    (x `rollup_factor` por nivel). Lo que excede el último nivel se descarta.
+    """
+
+    def __init__(self, initial=(), raw_capacity: int = None, rollup_factor: int = None,
+                 levels: int = None, level_capacity: int = None):
+        raw_capacity = CONFIG.HISTORY_RAW_POINTS if raw_capacity is None else raw_capacity
+        levels = CONFIG.HISTORY_ROLLUP_LEVELS if levels is None else levels
+        level_capacity = CONFIG.HISTORY_LEVEL_POINTS if level_capacity is None else level_capacity
+        self.rollup_factor = CONFIG.HISTORY_ROLLUP_FACTOR if rollup_factor is None else rollup_factor
+        self._raw = deque(maxlen=raw_capacity)
+        self._levels = [deque(maxlen=level_capacity) for _ in range(levels)]
+        self._pending = [None] * levels  # Bucket en construcción por nivel: [first, min, max, last, muestras, items]
+        self.count = 0
+        self.dropped = 0
+        self.peak = -np.inf
+        self.extend(initial)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value: float):
+        raw = self._raw
+        if len(raw) == raw.maxlen:
+            oldest = raw[0]
+            self._roll_up(0, self.count - len(raw), oldest, oldest, oldest, 1)
+        raw.append(value)
+        self.count += 1
+        if value > self.peak:
+            self.peak = value
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def _roll_up(self, level: int, first: int, low: float, high: float, last: float, samples: int):
+        if level >= len(self._levels):
+            self.dropped += samples
+            return
+        pending = self._pending[level]
+        if pending is None:
+            pending = self._pending[level] = [first, low, high, last, samples, 1]
+        else:
+            pending[1] = min(pending[1], low)
+            pending[2] = max(pending[2], high)
+            pending[3] = last
+            pending[4] += samples
+            pending[5] += 1
+        if pending[5] < self.rollup_factor:
+            return
+
+        self._pending[level] = None
+        buckets = self._levels[level]
+        if len(buckets) == buckets.maxlen:
+            self._roll_up(level + 1, *buckets.popleft())
+        buckets.append(tuple(pending[:5]))
+
+    def last(self) -> float:
+        return self._raw[-1]
+
+    def get_state(self) -> dict:
+        """Estado completo (crudo, buckets por nivel y buckets en construcción) para checkpoints."""
+        return {
+            'raw': np.array(self._raw, dtype=float),
+            'levels': {str(level): np.array(buckets, dtype=float).reshape(-1, 5) for level, buckets in enumerate(self._levels)},
+            'pending': np.array([p if p is not None else [np.nan] * 6 for p in self._pending], dtype=float).reshape(-1, 6),
+            'count': self.count, 'dropped': self.dropped, 'peak': float(self.peak),
+        }
+
+    def set_state(self, state: dict):
+        self._raw.clear()
+        self._raw.extend(state['raw'].tolist())
+        for level, buckets in enumerate(self._levels):
+            buckets.clear()
+            rows = state['levels'].get(str(level))
+            if rows is not None:
+                buckets.extend((int(b[0]), b[1], b[2], b[3], int(b[4])) for b in rows.tolist())
+        self._pending = [None if np.isnan(p[0]) else [int(p[0]), p[1], p[2], p[3], int(p[4]), int(p[5])]
+                         for p in state['pending'].tolist()][:len(self._levels)]
+        self._pending += [None] * (len(self._levels) - len(self._pending))
+        self.count = state['count']
+        self.dropped = state['dropped']
+        self.peak = state['peak']
+
+    def tail(self, n: int) -> list:
+        """Últimos N valores a resolución completa (N <= raw_capacity)."""
+        raw = self._raw
+        n = min(n, len(raw))
+        return [raw[i] for i in range(len(raw) - n, len(raw))]
+
+    def _buckets_oldest_first(self):
+        for level in range(len(self._levels) - 1, -1, -1):
+            yield from self._levels[level]
+            if self._pending[level] is not None:
+                yield tuple(self._pending[level][:5])
+
+    def series(self):
+        """(índices, valores) de toda la sesión, del más viejo al más nuevo, para graficar."""
+        xs, ys = [], []
+        for first, low, high, last, samples in self._buckets_oldest_first():
+            xs.append(first + samples - 1)
+            ys.append(last)
+        raw_start = self.count - len(self._raw)
+        xs.extend(range(raw_start, self.count))
+        ys.extend(self._raw)
+        return np.asarray(xs), np.asarray(ys, dtype=float)
+
+    def sampled(self, step: int) -> list:
+        """Valores en los índices múltiplos de `step` (exacto en la zona cruda, 'last' del bucket en la agregada)."""
+        step = max(1, int(step))
+        values = []
+        for first, low, high, last, samples in self._buckets_oldest_first():
+            if (-first) % step < samples:
+                values.append(last)
+        raw_start = self.count - len(self._raw)
+        offset = (-raw_start) % step
+        raw = self._raw
+        values.extend(raw[i] for i in range(offset, len(raw), step))
+        return values
+
+
+# -----------------------------------------------------------
+# 🎲 SIMULADOR DE MERCADO CORRELACIONADO (VECTORIZADO Y CON SEMILLA)
+# -----------------------------------------------------------
+class MarketSimulator:
+    """GBM multi-activo correlacionado con saltos comunes (crashes), generado en bloques NumPy.
+
+    Los log-retornos se generan por bloques de `chunk_size` pasos a la volatilidad nativa
+    (SIM_STEP_VOLATILITY por tick de lógica) y se reparten fila por fila; `scale` reduce
+    la amplitud para ticks visuales o precios de fallback.
+    """
+
+    def __init__(self, tickers: list, seed: int = None, covariance: np.ndarray = None, chunk_size: int = None):
+        self.tickers = list(tickers)
+        n_assets = len(self.tickers)
+        # Sin semilla explícita se deriva de np.random, que seed_rngs ya sembró para la sesión
+        self.rng = np.random.default_rng(np.random.randint(0, 2**31) if seed is None else seed)
+        self.chunk_size = CONFIG.SIM_CHUNK_SIZE if chunk_size is None else chunk_size
+
+        if covariance is None:
+            # Modelo de un factor: misma volatilidad y correlación constante entre todos los activos
+            correlation = np.full((n_assets, n_assets), CONFIG.SIM_CORRELATION)
+            np.fill_diagonal(correlation, 1.0)
+            covariance = correlation * CONFIG.SIM_STEP_VOLATILITY ** 2
+        self.covariance = np.asarray(covariance, dtype=float)
+        self._cholesky = np.linalg.cholesky(self.covariance)
+        # Deriva compensada: el log-retorno medio (saltos incluidos) es SIM_DRIFT, así los crashes
+        # se recuperan en promedio en lugar de hundir la serie indefinidamente
+        self._drift = CONFIG.SIM_DRIFT - CONFIG.SIM_JUMP_INTENSITY * CONFIG.SIM_JUMP_MEAN
+        self._chunk = np.empty((0, n_assets))
+        self._pos = 0
+
+    def log_returns(self, n_steps: int) -> np.ndarray:
+        """Bloque (n_steps x activos) de log-retornos correlacionados con saltos de mercado."""
+        shocks = self.rng.standard_normal((n_steps, len(self.tickers))) @ self._cholesky.T
+        log_returns = shocks + self._drift
+        # Saltos: un evento de mercado (Poisson) golpea a todos los activos a la vez
+        events = self.rng.poisson(CONFIG.SIM_JUMP_INTENSITY, n_steps)
+        jump_rows = np.flatnonzero(events)
+        if jump_rows.size:
+            sizes = self.rng.normal(CONFIG.SIM_JUMP_MEAN, CONFIG.SIM_JUMP_STD, (jump_rows.size, len(self.tickers)))
+            log_returns[jump_rows] += sizes * events[jump_rows, None]
+        return log_returns
+
+    def next_returns(self, scale: float = 1.0) -> np.ndarray:
+        """Siguiente fila de retornos simples (uno por activo) desde el bloque pre-generado."""
+        if self._pos >= len(self._chunk):
+            self._chunk = self.log_returns(self.chunk_size)
+            self._pos = 0
+        row = self._chunk[self._pos]
+        self._pos += 1
+        return np.expm1(row * scale)
+
+    def simulate_paths(self, n_steps: int, start_prices, scale: float = 1.0) -> np.ndarray:
+        """Trayectorias completas (n_steps x activos) que arrancan en `start_prices`."""
+        start = np.asarray(start_prices, dtype=float)
+        log_returns = self.log_returns(n_steps - 1) * scale
+        paths = np.empty((n_steps, len(self.tickers)))
+        paths[0] = start
+        paths[1:] = start * np.exp(np.cumsum(log_returns, axis=0))
+        return paths
+
+
 # -----------------------------------------------------------
 # 🔌 CLASE DE CONEXIÓN A LA API (COINGECKO INTEGRACIÓN)
 # -----------------------------------------------------------
+# Último precio publicado por el feed: dict ticker -> USD y el instante (time.time()) de la respuesta
+PriceSnapshot = namedtuple('PriceSnapshot', ['prices', 'timestamp'])
+
+
+class CoinGeckoCache:
+    """Caché de respuestas de CoinGecko: TTL, snapshot en disco y revalidación condicional (ETag).
+
+    El snapshot en disco sobrevive reinicios y se comparte entre procesos: si otro bot lo
+    actualizó, se recarga antes de salir a la red.
+    """
+
+    def __init__(self, ttl: float = None, path: str = None, session=None):
+        self.ttl = CONFIG.COINGECKO_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.path = CONFIG.COINGECKO_CACHE_PATH if path is None else path
+        # Sesión persistente (creada en la primera consulta): reutiliza la conexión keep-alive
+        self._session = session
+        self.entries = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._disk_mtime = None
+        self._lock = threading.Lock()
+        self._reload_from_disk()
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    @staticmethod
+    def _key(url: str, params: dict) -> str:
+        return url + '?' + '&'.join(f"{k}={params[k]}" for k in sorted(params))
+
+    def _reload_from_disk(self):
+        if not self.path:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self._disk_mtime:
+                return
+            with open(self.path) as f:
+                stored = json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            return
+        for key, entry in stored.items():
+            if key not in self.entries or entry['fetched_at'] > self.entries[key]['fetched_at']:
+                self.entries[key] = entry
+        self._disk_mtime = mtime
+
+    def _save_to_disk(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'entries': self.entries}, f)
+            os.replace(tmp_path, self.path)  # Reemplazo atómico: nunca se lee un archivo a medias
+            self._disk_mtime = os.path.getmtime(self.path)
+        except OSError:
+            pass
+
+    def get_json(self, url: str, params: dict, timeout: float = 5):
+        """Retorna el JSON de `url`, desde caché si está fresco o revalidando con If-None-Match."""
+        key = self._key(url, params)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry['fetched_at'] >= self.ttl:
+                self._reload_from_disk()
+                entry = self.entries.get(key)
+            if entry is not None and time.time() - entry['fetched_at'] < self.ttl:
+                self.hits += 1
+                return entry['data']
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        with self._lock:
+            if response.status_code == 304 and entry is not None:
+                self.revalidated += 1
+                entry['fetched_at'] = time.time()
+                self._save_to_disk()
+                return entry['data']
+
+            response.raise_for_status()
+            data = response.json()
+            self.misses += 1
+            self.entries[key] = {
+                'data': data,
+                'fetched_at': time.time(),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            self._save_to_disk()
+            return data
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class RequestBudget:
+    """Cubeta de tokens compartida entre hilos: limita las consultas por minuto a la API."""
+
+    def __init__(self, per_minute: float = None, burst: int = None):
+        self.rate = (CONFIG.COINGECKO_REQUESTS_PER_MINUTE if per_minute is None else per_minute) / 60.0
+        self.capacity = float(CONFIG.COINGECKO_REQUEST_BURST if burst is None else burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Toma un token, esperando como mucho `timeout` segundos (None = sin límite)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else float('inf')
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+            time.sleep(wait)
+
+
+class CoinIdIndex:
+    """Índice local del volcado /coins/list de CoinGecko: símbolo -> ids.
+
+    El volcado se guarda en disco y solo se vuelve a descargar cuando supera `max_age`; sin red
+    se usa el archivo viejo si existe.
+    """
+
+    def __init__(self, path: str = None, max_age: float = None, base_url: str = None, session=None,
+                 budget: RequestBudget = None):
+        self.path = CONFIG.COINGECKO_COINS_LIST_PATH if path is None else path
+        self.max_age = CONFIG.COINGECKO_COINS_LIST_MAX_AGE_SECONDS if max_age is None else max_age
+        self.base_url = CONFIG.COINGECKO_API_URL if base_url is None else base_url
+        self.session = requests.Session() if session is None else session
+        self.budget = budget
+        self.by_symbol = {}
+
+    def load(self):
+        coins = None
+        try:
+            if self.path and time.time() - os.path.getmtime(self.path) < self.max_age:
+                with open(self.path) as f:
+                    coins = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if coins is None:
+            coins = self._download()
+        self._build(coins or [])
+        return self
+
+    def _download(self):
+        try:
+            if self.budget is not None:
+                self.budget.acquire()
+            response = self.session.get(f"{self.base_url}/coins/list", timeout=30)
+            response.raise_for_status()
+            coins = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"{Colors.WARNING}No se pudo descargar /coins/list ({e}). Usando el índice local si existe.{Colors.ENDC}")
+            try:
+                with open(self.path) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return None
+        if not self.path:
+            return coins
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(coins, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+        return coins
+
+    def _build(self, coins: list):
+        by_symbol = {}
+        for coin in coins:
+            by_symbol.setdefault(coin.get('symbol', '').lower(), []).append(coin)
+        self.by_symbol = by_symbol
+
+    def lookup(self, ticker: str):
+        """Id de CoinGecko para `ticker` (None si no existe).
+
+        Con símbolos repetidos se prefiere el id que coincide con el nombre o el símbolo y
+        luego el más corto (los tokens puente/envueltos suelen tener ids más largos).
+        """
+        candidates = self.by_symbol.get(ticker.lower())
+        if not candidates:
+            return None
+
+        def rank(coin):
+            coin_id = coin['id']
+            exact = coin_id in (ticker.lower(), coin.get('name', '').lower().replace(' ', '-'))
+            return (not exact, len(coin_id), coin_id)
+
+        return min(candidates, key=rank)['id']
+
+
+def resolve_coingecko_ids(tickers: list, overrides: dict = None, index: CoinIdIndex = None) -> dict:
+    """Mapa ticker -> id de CoinGecko: primero COINGECKO_IDS (manual), luego el índice de /coins/list.
+
+    El índice solo se carga si algún ticker no tiene id manual. BRCN no cotiza en CoinGecko.
+    """
+    overrides = CONFIG.COINGECKO_IDS if overrides is None else overrides
+    resolved = {ticker: overrides[ticker] for ticker in tickers if ticker in overrides}
+    missing = [ticker for ticker in tickers if ticker not in resolved and ticker != 'BRCN']
+    if missing:
+        index = (index or CoinIdIndex()).load()
+        unresolved = []
+        for ticker in missing:
+            coin_id = index.lookup(ticker)
+            if coin_id is None:
+                unresolved.append(ticker)
+            else:
+                resolved[ticker] = coin_id
+        if unresolved:
+            print(f"{Colors.WARNING}Sin id de CoinGecko para {len(unresolved)} activos (se simulan): {', '.join(unresolved[:10])}{Colors.ENDC}")
+    return resolved
+
+
+class FetchPlanner:
+    """Plan de consultas a simple/price para miles de ids.
+
+    Divide los ids en la menor cantidad de lotes que respeta el largo máximo de URL, los
+    consulta en paralelo (cada lote pasa por la caché y toma un token del presupuesto común)
+    y fusiona las respuestas en un solo dict. Si fallan algunos lotes se devuelve lo
+    obtenido; si fallan todos se relanza el primer error (para el backoff del feed).
+    """
+
+    FIXED_QUERY = '?ids=&vs_currencies=usd'
+    SEPARATOR_LENGTH = 3  # requests codifica ',' como %2C
+
+    def __init__(self, url: str, cache: CoinGeckoCache = None, budget: RequestBudget = None,
+                 max_url_length: int = None, max_workers: int = None, timeout: float = 5):
+        self.url = url
+        self.cache = CoinGeckoCache() if cache is None else cache
+        self.budget = RequestBudget() if budget is None else budget
+        self.max_url_length = CONFIG.COINGECKO_MAX_URL_LENGTH if max_url_length is None else max_url_length
+        self.max_workers = CONFIG.COINGECKO_MAX_CONCURRENCY if max_workers is None else max_workers
+        self.timeout = timeout
+        self.failed_batches = 0
+        self._plan_cache = (None, None)
+        self._executor = None
+
+    def _batch_length(self, batch: list) -> int:
+        return (len(self.url) + len(self.FIXED_QUERY) + sum(len(coin_id) for coin_id in batch)
+                + self.SEPARATOR_LENGTH * (len(batch) - 1))
+
+    def plan(self, ids: list) -> list:
+        """Lotes de ids de tamaño parejo (para repartir la carga entre hilos) bajo el largo máximo de URL."""
+        key = tuple(ids)
+        if self._plan_cache[0] == key:
+            return self._plan_cache[1]
+
+        greedy, batch = [], []
+        for coin_id in ids:
+            if batch and self._batch_length(batch + [coin_id]) > self.max_url_length:
+                greedy.append(batch)
+                batch = []
+            batch.append(coin_id)
+        if batch:
+            greedy.append(batch)
+
+        balanced = [list(chunk) for chunk in np.array_split(np.array(ids, dtype=object), len(greedy))] if greedy else []
+        batches = balanced if all(self._batch_length(b) <= self.max_url_length for b in balanced) else greedy
+        self._plan_cache = (key, batches)
+        return batches
+
+    def _fetch_batch(self, batch: list, deadline: float) -> dict:
+        if not self.budget.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise requests.exceptions.RequestException("Presupuesto de consultas a CoinGecko agotado para este tick")
+        params = {'ids': ','.join(batch), 'vs_currencies': 'usd'}
+        return self.cache.get_json(self.url, params, timeout=self.timeout)
+
+    def fetch(self, ids: list, time_budget: float = None) -> dict:
+        """Respuesta fusionada de simple/price para todos los `ids` (sin esperar más de `time_budget`)."""
+        batches = self.plan(ids)
+        if not batches:
+            return {}
+        deadline = time.monotonic() + (CONFIG.TICK_INTERVAL_SECONDS if time_budget is None else time_budget)
+        if len(batches) == 1:
+            return self._fetch_batch(batches[0], deadline)
+
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='coingecko-batch')
+        futures = [self._executor.submit(self._fetch_batch, batch, deadline) for batch in batches]
+
+        merged, errors = {}, []
+        for future in futures:
+            try:
+                merged.update(future.result())
+            except requests.exceptions.RequestException as e:
+                errors.append(e)
+        self.failed_batches += len(errors)
+        if errors and not merged:
+            raise errors[0]
+        return merged
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class PriceFeed(abc.ABC):
+    """Interfaz de los feeds de precios de fondo que consume LiveFetcher.
+
+    Un feed corre en su propio hilo, publica PriceSnapshot inmutables (`latest()` nunca bloquea)
+    y activa los Events de `listeners` con cada snapshot. `streaming = True` indica que los precios
+    se empujan a medida que llegan: el loop muestra precios reales entre ticks de lógica.
+    """
+
+    streaming = False
+    thread_name = 'price-feed'
+
+    def __init__(self):
+        # Events a activar con cada snapshot nuevo (p. ej. el despertar del LoopScheduler)
+        self.listeners = []
+        self._snapshot = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def latest(self):
+        """Retorna el último PriceSnapshot (o None) sin bloquear nunca."""
+        # Leer una referencia es atómico en CPython: el snapshot se reemplaza, nunca se muta
+        return self._snapshot
+
+    def _publish(self, prices: dict):
+        self._snapshot = PriceSnapshot(prices, time.time())
+        for listener in self.listeners:
+            listener.set()
+
+    @abc.abstractmethod
+    def _run(self):
+        """Cuerpo del hilo: publica snapshots hasta que se active `_stop_event`."""
+
+
+class BackgroundPriceFeed(PriceFeed):
+    """Consulta CoinGecko en un hilo de fondo y publica atómicamente el último snapshot."""
+
+    thread_name = 'coingecko-feed'
+
+    def __init__(self, url: str, api_ids: list, id_to_ticker: dict, interval: float = None, timeout: float = 5,
+                 cache: CoinGeckoCache = None, planner: FetchPlanner = None):
+        super().__init__()
+        self.url = url
+        self.api_ids = list(api_ids)
+        self.id_to_ticker = id_to_ticker
+        self.interval = CONFIG.TICK_INTERVAL_SECONDS if interval is None else interval
+        self.timeout = timeout
+        self.cache = CoinGeckoCache() if cache is None else cache
+        self.planner = FetchPlanner(url, self.cache, timeout=timeout) if planner is None else planner
+        self.consecutive_errors = 0
+        self.last_error = None
+
+    def stop(self, timeout: float = 1.0):
+        super().stop(timeout)
+        self.planner.close()
+        self.cache.close()
+
+    def fetch_once(self) -> dict:
+        data = self.planner.fetch(self.api_ids, time_budget=self.interval)
+        return parse_coingecko_prices(data, self.id_to_ticker)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._publish(self.fetch_once())
+                self.consecutive_errors = 0
+                self.last_error = None
+                delay = self.interval
+            except Exception as e:
+                # Red caída o payload malformado (KeyError/ValueError/TypeError): el hilo no debe
+                # morir en silencio, sigue reintentando con backoff y el error queda en last_error
+                self.consecutive_errors += 1
+                self.last_error = e
+                delay = self._backoff_delay(e)
+            self._stop_event.wait(delay)
+
+    def _backoff_delay(self, error) -> float:
+        """Backoff exponencial con jitter completo; respeta Retry-After en HTTP 429."""
+        delay = feed_backoff_delay(self.consecutive_errors)
+        response = getattr(error, 'response', None)
+        if response is not None and response.status_code == 429:
+            try:
+                delay = max(delay, float(response.headers.get('Retry-After', 0)))
+            except ValueError:
+                pass
+        return delay
+
+
+def feed_backoff_delay(consecutive_errors: int) -> float:
+    """Espera antes de reintentar: exponencial con jitter completo, acotada por FEED_BACKOFF_MAX_SECONDS."""
+    ceiling = min(CONFIG.FEED_BACKOFF_MAX_SECONDS, CONFIG.FEED_BACKOFF_BASE_SECONDS * (2 ** (consecutive_errors - 1)))
+    return random.uniform(0, ceiling)
+
+
+WEBSOCKET_OPEN_TIMEOUT_SECONDS = 10.0
+
+
+class WebSocketPriceFeed(PriceFeed):
+    """Feed por push del canal `ticker` (formato Coinbase Exchange) con coalescencia por activo.
+
+    Cada mensaje solo pisa el último precio de su activo en un dict; un publicador emite a lo sumo
+    un snapshot cada `publish_interval`, así una ráfaga de N actualizaciones del mismo activo cuesta
+    un frame del loop. Acepta mensajes sueltos o listas de mensajes (lotes).
+    """
+
+    streaming = True
+    thread_name = 'websocket-feed'
+
+    def __init__(self, url: str, tickers: list, publish_interval: float = None, quote: str = None):
+        super().__init__()
+        self.url = url
+        quote = CONFIG.WS_QUOTE_CURRENCY if quote is None else quote
+        # BRCN no cotiza en el exchange: sigue simulado en LiveFetcher
+        self.product_to_ticker = {f"{ticker}-{quote}": ticker for ticker in tickers if ticker != 'BRCN'}
+        self.publish_interval = CONFIG.WS_PUBLISH_INTERVAL_SECONDS if publish_interval is None else publish_interval
+        self.messages_received = 0
+        self.updates_received = 0
+        self.snapshots_published = 0
+        self.consecutive_errors = 0
+        self.last_error = None
+        self.connected = threading.Event()
+        # Retraso servidor -> ingesta (solo si los mensajes traen el campo numérico 'ts', como el stand-in)
+        self.lag = LatencyHistogram()
+        self._latest = {}
+        self._dirty = False
+        self._loop = None
+        self._task = None
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # El loop ya terminó
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def subscribe_message(self) -> str:
+        return json.dumps({'type': 'subscribe', 'product_ids': list(self.product_to_ticker), 'channels': ['ticker']})
+
+    def ingest(self, raw):
+        """Decodifica un frame y pisa el último precio de cada activo (no publica)."""
+        data = json.loads(raw)
+        items = data if isinstance(data, list) else (data,)
+        latest, product_to_ticker = self._latest, self.product_to_ticker
+        updates = 0
+        for item in items:
+            ticker = product_to_ticker.get(item.get('product_id'))
+            if ticker is not None and 'price' in item:
+                latest[ticker] = float(item['price'])
+                updates += 1
+        self.messages_received += len(items)
+        if updates:
+            self.updates_received += updates
+            self._dirty = True
+            sent = items[-1].get('ts')
+            if sent is not None:
+                self.lag.record(max(0, int((time.time() - sent) * 1e9)))
+
+    def publish_pending(self) -> bool:
+        """Publica un snapshot si llegó algo desde el anterior (una vez por ventana de coalescencia)."""
+        if not self._dirty:
+            return False
+        self._dirty = False
+        self._publish(dict(self._latest))
+        self.snapshots_published += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'messages_received': self.messages_received,
+            'updates_received': self.updates_received,
+            'snapshots_published': self.snapshots_published,
+            'coalesced_updates': self.updates_received - self.snapshots_published,
+            'consecutive_errors': self.consecutive_errors,
+            'lag': self.lag.summary(),
+        }
+
+    def _run(self):
+        import asyncio
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._main())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        import asyncio
+        import websockets
+        publisher = asyncio.ensure_future(self._publish_loop())
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    async with websockets.connect(self.url, max_size=None, open_timeout=WEBSOCKET_OPEN_TIMEOUT_SECONDS) as ws:
+                        await ws.send(self.subscribe_message())
+                        self.connected.set()
+                        self.consecutive_errors = 0
+                        self.last_error = None
+                        async for raw in ws:
+                            self.ingest(raw)
+                except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException, ValueError) as e:
+                    self.consecutive_errors += 1
+                    self.last_error = e
+                self.connected.clear()
+                if not self._stop_event.is_set():
+                    await asyncio.sleep(feed_backoff_delay(max(1, self.consecutive_errors)))
+        finally:
+            publisher.cancel()
+
+    async def _publish_loop(self):
+        import asyncio
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            self.publish_pending()
+
+
+def parse_coingecko_prices(data: dict, id_to_ticker: dict) -> dict:
+    """Convierte la respuesta de simple/price en un dict ticker -> precio USD."""
+    updated_prices = {}
+    for coin_id, price_data in data.items():
+        if 'usd' in price_data:
+            ticker = id_to_ticker.get(coin_id)
+            if ticker:
+                updated_prices[ticker] = price_data['usd']
+    return updated_prices
+
+
 class LiveFetcher:
     """Clase para manejar precios en tiempo real y simulación de mercado."""
     def __init__(self, assets: list):
-        self.api_ids = [v for k, v in CONFIG.COINGECKO_IDS.items() if k != 'BRCN']
-        self.id_to_ticker = {v: k for k, v in CONFIG.COINGECKO_IDS.items()}
-        self.COINGECKO_URL = "https://api.coingecko.com/api/v3/simple/price"
+        self.assets = list(assets)
+        self.budget = RequestBudget()
+        # Los ids se resuelven en la primera consulta real (mock, replay y benchmarks no tocan la red)
+        self.ticker_to_id = None
+        self.api_ids = []
+        self.id_to_ticker = {}
+        self.COINGECKO_URL = f"{CONFIG.COINGECKO_API_URL}/simple/price"
+        self.cache = CoinGeckoCache()
+        self.planner = FetchPlanner(self.COINGECKO_URL, self.cache, budget=self.budget)
         self.current_prices = CONFIG.INITIAL_PRICES.copy() 
         self.previous_prices = CONFIG.INITIAL_PRICES.copy() # Nuevo para seguimiento de flechas
+        self.simulator = MarketSimulator(CONFIG.ASSETS_TO_TRACK)
+        self._brcn_index = CONFIG.ASSETS_TO_TRACK.index('BRCN') if 'BRCN' in CONFIG.ASSETS_TO_TRACK else None
         
         # CORRECCIÓN DE ALPHA/BENCHMARK: Índice inicial = Capital inicial del portafolio.
         self.initial_market_index_value = CONFIG.INITIAL_USDC_BALANCE 
-        self.market_index_history = [self.initial_market_index_value]
+        self.market_index_history = TieredSeries([self.initial_market_index_value])
         
         self.last_api_call_time = time.time() - CONFIG.TICK_INTERVAL_SECONDS 
+        self.feed = None
+        self.is_stale = False
+        # El último fetch_latest_prices trajo precios reales nuevos (si no, el tick de lógica no opera)
+        self.has_fresh_prices = False
+        self._applied_snapshot_time = None
 
     # --- MÉTODO CORREGIDO/REINCORPORADO PARA EL ERROR ANTERIOR ---
-    def fetch_initial_history(self, initial_ticks=CONFIG.INITIAL_HISTORY_TICKS):
+    def fetch_initial_history(self, initial_ticks=None):
         """Carga los datos iniciales (simulados) antes de que empiece el loop en vivo."""
-        return self._simulate_initial_history(initial_ticks)
+        return self._simulate_initial_history(CONFIG.INITIAL_HISTORY_TICKS if initial_ticks is None else initial_ticks)
 
     def _simulate_initial_history(self, initial_ticks):
         print(f"\n[{Colors.OKCYAN}API{Colors.ENDC}] Cargando {initial_ticks} puntos de datos históricos iniciales (Mock)...")
-        history_data = {}
-        for ticker in CONFIG.ASSETS_TO_TRACK:
-            initial_price = CONFIG.INITIAL_PRICES[ticker] 
-            prices = [initial_price]
-            # Simular una serie de precios que varía ligeramente
-            for _ in range(initial_ticks - 1):
-                current_price = prices[-1]
-                change_pct = np.random.normal(0, 0.005) # Pequeña variación
-                new_price = current_price * (1 + change_pct)
-                prices.append(new_price)
-            
-            history_data[ticker] = pd.DataFrame(prices, columns=['Close'])
-        return history_data
+        start_prices = [CONFIG.INITIAL_PRICES[ticker] for ticker in CONFIG.ASSETS_TO_TRACK]
+        paths = self.simulator.simulate_paths(initial_ticks, start_prices)
+        return {ticker: {'Close': paths[:, i]} for i, ticker in enumerate(CONFIG.ASSETS_TO_TRACK)}
     # -----------------------------------------------------------------------------
         
+    def _resolve_ids(self):
+        if self.ticker_to_id is None:
+            self.ticker_to_id = resolve_coingecko_ids(self.assets, index=CoinIdIndex(budget=self.budget))
+            self.api_ids = list(dict.fromkeys(self.ticker_to_id.values()))
+            self.id_to_ticker = {v: k for k, v in self.ticker_to_id.items()}
+
+    def start_background_feed(self, feed: PriceFeed = None):
+        """Arranca un feed de fondo: `feed` si se pasa, si no el de CONFIG.PRICE_FEED."""
+        if feed is not None:
+            self.feed = feed
+        if self.feed is None:
+            self.feed = self._build_feed(CONFIG.PRICE_FEED)
+        self.feed.start()
+        return self.feed
+
+    def _build_feed(self, kind: str) -> PriceFeed:
+        if kind == 'websocket':
+            import importlib.util
+            if importlib.util.find_spec('websockets') is not None:
+                return WebSocketPriceFeed(CONFIG.WS_FEED_URL, self.assets)
+            warnings.warn("websockets no está instalado: se usa el feed por consulta de CoinGecko")
+        elif kind != 'coingecko':
+            raise ValueError(f"PRICE_FEED desconocido: {kind!r} (use 'coingecko' o 'websocket')")
+        self._resolve_ids()
+        return BackgroundPriceFeed(self.COINGECKO_URL, self.api_ids, self.id_to_ticker, cache=self.cache,
+                                   planner=self.planner)
+
+    def stop_background_feed(self):
+        if self.feed is not None:
+            self.feed.stop()
+
     def fetch_latest_prices(self):
+        if self.feed is not None:
+            return self._apply_feed_snapshot()
+
         updated_prices = {}
+        self.has_fresh_prices = False
         if time.time() - self.last_api_call_time < CONFIG.TICK_INTERVAL_SECONDS:
             return self._mock_prices_only()
         
@@ -179,21 +1183,55 @@ class LiveFetcher:
         self.previous_prices = self.current_prices.copy() # Guardar precios anteriores
 
         try:
-            params = {'ids': ','.join(self.api_ids), 'vs_currencies': 'usd'}
-            response = requests.get(self.COINGECKO_URL, params=params, timeout=5)
-            response.raise_for_status()  
-            data = response.json()
-            
-            for coin_id, price_data in data.items():
-                if 'usd' in price_data:
-                    ticker = self.id_to_ticker.get(coin_id)
-                    if ticker:
-                        updated_prices[ticker] = price_data['usd']
+            self._resolve_ids()
+            data = self.planner.fetch(self.api_ids)
+            updated_prices = parse_coingecko_prices(data, self.id_to_ticker)
         
         except requests.exceptions.RequestException as e:
             print(f"{Colors.FAIL}Error de conexión con CoinGecko ({e}). Usando precios de fallback simulados.{Colors.ENDC}")
+            # Los precios de fallback solo se muestran: el tick de lógica no opera sobre ellos
+            self.is_stale = True
             return self._fallback_mock_prices()
         
+        self._apply_prices(updated_prices)
+        self.is_stale = False
+        self.has_fresh_prices = True
+        return self.current_prices
+
+    def has_new_snapshot(self) -> bool:
+        """Hay un snapshot del feed que todavía no se aplicó (no bloquea)."""
+        snapshot = self.feed.latest() if self.feed is not None else None
+        return snapshot is not None and snapshot.timestamp != self._applied_snapshot_time
+
+    def _apply_feed_snapshot(self):
+        """Lee el snapshot del feed sin bloquear y marca los datos viejos como 'stale'."""
+        snapshot = self.feed.latest()
+        self.has_fresh_prices = False
+        self.is_stale = snapshot is None or time.time() - snapshot.timestamp > CONFIG.PRICE_STALE_AFTER_SECONDS
+        if self.is_stale:
+            # Sin datos frescos: solo micro-movimientos visuales, nunca precios de fallback para operar
+            return self._mock_prices_only()
+        if self.feed.streaming:
+            # Por push el tick de lógica lo marca el reloj y opera con el último precio recibido,
+            # aunque ya se haya mostrado en un frame de stream
+            self.last_api_call_time = time.time()
+        elif snapshot.timestamp == self._applied_snapshot_time:
+            # El vigía venció sin snapshot nuevo (pero aún no 'stale'): no hay datos reales que operar
+            return self._mock_prices_only()
+        else:
+            self.last_api_call_time = snapshot.timestamp
+        self.has_fresh_prices = True
+        return self.fetch_stream_frame()
+
+    def fetch_stream_frame(self):
+        """Aplica el último snapshot del feed tal cual (frames entre ticks de lógica de un feed por push)."""
+        snapshot = self.feed.latest()
+        self._applied_snapshot_time = snapshot.timestamp
+        self.previous_prices = self.current_prices.copy()
+        self._apply_prices(snapshot.prices)
+        return self.current_prices
+
+    def _apply_prices(self, updated_prices: dict):
         for ticker in CONFIG.ASSETS_TO_TRACK:
             if ticker in updated_prices:
                 self.current_prices[ticker] = updated_prices[ticker]
@@ -201,13 +1239,13 @@ class LiveFetcher:
                 self.current_prices[ticker] = CONFIG.INITIAL_PRICES[ticker] 
                 
         self._update_mock_brcn_and_index()
-        
-        return self.current_prices
 
-    def _update_mock_brcn_and_index(self):
-        current = self.current_prices.get('BRCN', CONFIG.INITIAL_PRICES['BRCN'])
-        change_pct = random.uniform(-0.0002, 0.0002) 
-        self.current_prices['BRCN'] = current * (1 + change_pct)
+    def _update_mock_brcn_and_index(self, brcn_simulated: bool = False):
+        # BRCN no cotiza: en frames simulados ya se movió con la fila de _apply_simulated_returns
+        if self._brcn_index is not None and not brcn_simulated:
+            current = self.current_prices.get('BRCN', CONFIG.INITIAL_PRICES['BRCN'])
+            change_pct = self.simulator.next_returns(CONFIG.SIM_FALLBACK_SCALE)[self._brcn_index]
+            self.current_prices['BRCN'] = current * (1 + change_pct)
 
         # Cálculo de nuevo valor de índice (Benchmark)
         price_changes = [
@@ -218,7 +1256,7 @@ class LiveFetcher:
         
         avg_change_pct = np.mean(price_changes) if price_changes else 0.0
         
-        previous_market_index_value = self.market_index_history[-1]
+        previous_market_index_value = self.market_index_history.last()
         new_market_index_value = previous_market_index_value * (1 + avg_change_pct)
         
         self.market_index_history.append(new_market_index_value)
@@ -226,26 +1264,39 @@ class LiveFetcher:
     def _mock_prices_only(self):
         self.previous_prices = self.current_prices.copy()
         
-        for ticker in CONFIG.ASSETS_TO_TRACK:
-            current = self.current_prices.get(ticker, CONFIG.INITIAL_PRICES[ticker])
-            # Variación mínima para ticks visuales (sin llamada API)
-            change_pct = random.uniform(-0.000001, 0.000001) 
-            self.current_prices[ticker] = current * (1 + change_pct)
+        # Variación mínima para ticks visuales (sin llamada API)
+        self._apply_simulated_returns(CONFIG.SIM_VISUAL_TICK_SCALE)
         
-        self._update_mock_brcn_and_index()
+        self._update_mock_brcn_and_index(brcn_simulated=True)
         return self.current_prices
         
     def _fallback_mock_prices(self):
         print(f"[{Colors.WARNING}API{Colors.ENDC}] Usando precios de fallback simulados para evitar interrupción.")
         self.previous_prices = self.current_prices.copy()
+        self._apply_simulated_returns(CONFIG.SIM_FALLBACK_SCALE)
+        
+        self._update_mock_brcn_and_index(brcn_simulated=True)
+        return self.current_prices
 
-        for ticker in CONFIG.ASSETS_TO_TRACK:
+    def _apply_simulated_returns(self, scale: float):
+        returns = self.simulator.next_returns(scale)
+        for ticker, change_pct in zip(CONFIG.ASSETS_TO_TRACK, returns.tolist()):
             current = self.current_prices.get(ticker, CONFIG.INITIAL_PRICES[ticker])
-            change_pct = random.uniform(-0.0002, 0.0002) 
             self.current_prices[ticker] = current * (1 + change_pct)
-        
-        self._update_mock_brcn_and_index()
-        return self.current_prices
+
+    def get_state(self) -> dict:
+        return {
+            'current_prices': np.array([self.current_prices[t] for t in CONFIG.ASSETS_TO_TRACK], dtype=float),
+            'previous_prices': np.array([self.previous_prices[t] for t in CONFIG.ASSETS_TO_TRACK], dtype=float),
+            'initial_market_index_value': self.initial_market_index_value,
+            'market_index_history': self.market_index_history.get_state(),
+        }
+
+    def set_state(self, state: dict):
+        self.current_prices.update(zip(CONFIG.ASSETS_TO_TRACK, state['current_prices'].tolist()))
+        self.previous_prices.update(zip(CONFIG.ASSETS_TO_TRACK, state['previous_prices'].tolist()))
+        self.initial_market_index_value = state['initial_market_index_value']
+        self.market_index_history.set_state(state['market_index_history'])
 
     def get_price_indicator(self, ticker: str):
         """Retorna el símbolo de flecha de dirección de precio."""
@@ -259,20 +1310,411 @@ class LiveFetcher:
         else:
             return f"{Colors.WARNING}\u25c6{Colors.ENDC}" # Rombo amarillo (sin cambio)
 
-# ... (Clase TradingAsset se mantiene sin cambios en su lógica principal) ...
+# -----------------------------------------------------------
+# 🧮 BUFFER CIRCULAR DE PRECIOS (Close/RSI)
+# -----------------------------------------------------------
+class PriceRingBuffer:
+    """Ventana de capacidad fija para Close y RSI, preasignada en NumPy."""
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        # Doble escritura: cada valor se guarda en i y en i + capacity, así
+        # cualquier ventana de los últimos N (N <= capacity) es contigua y se
+        # puede devolver como vista sin copiar.
+        self._close = np.full(2 * self.capacity, np.nan)
+        self._rsi = np.full(2 * self.capacity, np.nan)
+        self._head = 0  # Próxima posición de escritura
+        self._size = 0
+        self._last_close = np.nan
+        self._last_rsi = np.nan
+
+    def __len__(self):
+        return self._size
+
+    def append(self, close: float, rsi: float = np.nan):
+        """Agrega un precio en O(1) sin asignar memoria."""
+        i = self._head
+        j = i + self.capacity
+        self._close[i] = self._close[j] = close
+        self._rsi[i] = self._rsi[j] = rsi
+        self._head = i + 1 if i + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+        self._last_close = close
+        self._last_rsi = rsi
+
+    def extend(self, closes):
+        for close in closes:
+            self.append(float(close))
+
+    def set_last_rsi(self, rsi: float):
+        """Actualiza el RSI de la fila más reciente."""
+        i = self._head - 1 if self._head > 0 else self.capacity - 1
+        self._rsi[i] = self._rsi[i + self.capacity] = rsi
+        self._last_rsi = rsi
+
+    def last_close(self) -> float:
+        return self._last_close
+
+    def last_rsi(self) -> float:
+        return self._last_rsi
+
+    def close_window(self, n: int = None) -> np.ndarray:
+        """Vista (sin copia) de los últimos N precios, del más viejo al más nuevo."""
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return self._close[end - n:end]
+
+    def rsi_window(self, n: int = None) -> np.ndarray:
+        """Vista (sin copia) de los últimos N valores de RSI."""
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return self._rsi[end - n:end]
+
+    def load_window(self, closes: np.ndarray, rsis: np.ndarray):
+        """Reemplaza el contenido por una ventana (más vieja primero) en una sola copia por columna."""
+        closes, rsis = closes[-self.capacity:], rsis[-self.capacity:]
+        n, capacity = len(closes), self.capacity
+        for buffer, values in ((self._close, closes), (self._rsi, rsis)):
+            buffer[:] = np.nan
+            buffer[:n] = values
+            buffer[capacity:capacity + n] = values
+        self._head = n % capacity
+        self._size = n
+        self._last_close = float(closes[-1]) if n else np.nan
+        self._last_rsi = float(rsis[-1]) if n else np.nan
+
+
+# -----------------------------------------------------------
+# 📐 RSI INCREMENTAL (O(1) POR TICK)
+# -----------------------------------------------------------
+def rsi_smoothing_alpha(period: int, smoothing: str = 'ema') -> float:
+    """Factor de suavizado equivalente a ewm(..., adjust=False)."""
+    if smoothing == 'ema':
+        return 2.0 / (period + 1.0)
+    if smoothing == 'wilder':
+        return 1.0 / period
+    raise ValueError(f"Suavizado de RSI desconocido: {smoothing!r} (use 'ema' o 'wilder')")
+
+
+class IncrementalRSI:
+    """Mantiene la ganancia/pérdida promedio de un activo y actualiza el RSI en O(1)."""
+
+    def __init__(self, period: int = None, smoothing: str = None):
+        self.period = CONFIG.RSI_PERIOD if period is None else period
+        self.smoothing = CONFIG.RSI_SMOOTHING if smoothing is None else smoothing
+        self.alpha = rsi_smoothing_alpha(self.period, self.smoothing)
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.last_price = None
+        self.count = 0
+
+    def update(self, price: float) -> float:
+        """Incorpora un nuevo precio y retorna el RSI resultante."""
+        if self.last_price is None:
+            # Igual que diff() en pandas: el primer delta es NaN y cuenta como 0
+            gain = loss = 0.0
+        else:
+            delta = price - self.last_price
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+
+        if self.count == 0:
+            self.avg_gain, self.avg_loss = gain, loss
+        else:
+            self.avg_gain += self.alpha * (gain - self.avg_gain)
+            self.avg_loss += self.alpha * (loss - self.avg_loss)
+
+        self.last_price = price
+        self.count += 1
+        return self.value()
+
+    def value(self) -> float:
+        if self.count < self.period or self.avg_loss == 0:
+            return np.nan
+        return 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+
+
+# -----------------------------------------------------------
+# 📒 LIBRO DE TRANSACCIONES COLUMNAR (STRUCT-OF-ARRAYS)
+# -----------------------------------------------------------
+class TransactionLedger:
+    """Registro de compras en columnas NumPy preasignadas (crece duplicando la capacidad).
+
+    Cada compra se escribe en su posición de cada columna, sin crear dicts por fila. Las
+    filas nuevas se vuelcan de forma incremental a `path` (.parquet = directorio de partes,
+    .arrow/.arrows = stream IPC de Arrow, .csv sin pyarrow), así una caída pierde como
+    mucho el último tramo sin volcar. Si `path` ya existe (otra sesión), el primer volcado
+    lo reemplaza en lugar de mezclar ambas sesiones.
+    """
+
+    LOG_COLUMNS = ['Tick', 'Asset', 'Type', 'Avg_Entry_Price', 'Exec_Price', 'Qty_Bought', 'USDC_Remaining', 'Asset_Total', 'Commission']
+    FIELDS = (
+        ('tick', np.int64), ('asset_id', np.int32), ('type_code', np.int16), ('avg_entry_price', np.float64),
+        ('exec_price', np.float64), ('qty', np.float64), ('usdc_remaining', np.float64),
+        ('asset_total', np.float64), ('commission', np.float64),
+    )
+
+    def __init__(self, tickers: list, capacity: int = None, path: str = None, flush_rows: int = None,
+                 flush_seconds: float = None):
+        self.tickers = list(tickers)
+        self.types = []
+        self._type_codes = {}
+        capacity = max(1, CONFIG.LEDGER_INITIAL_CAPACITY if capacity is None else capacity)
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.FIELDS}
+        self._size = 0
+        self.path = path
+        self.flush_rows = CONFIG.LEDGER_FLUSH_ROWS if flush_rows is None else flush_rows
+        self.flush_seconds = CONFIG.LEDGER_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._flushed = 0
+        self._last_flush = time.monotonic()
+        self._writer = None
+        self._parts = 0
+        self._truncate = True
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns['tick'])
+
+    def type_code(self, trade_type: str) -> int:
+        code = self._type_codes.get(trade_type)
+        if code is None:
+            code = self._type_codes[trade_type] = len(self.types)
+            self.types.append(trade_type)
+        return code
+
+    def _reserve(self, n_rows: int):
+        if self._size + n_rows <= self.capacity:
+            return
+        new_capacity = max(self.capacity * 2, self._size + n_rows)
+        for name, column in self._columns.items():
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, tick: int, asset_id: int, trade_type: str, avg_entry_price: float, exec_price: float,
+               qty: float, usdc_remaining: float, asset_total: float, commission: float):
+        self._reserve(1)
+        i = self._size
+        columns = self._columns
+        columns['tick'][i] = tick
+        columns['asset_id'][i] = asset_id
+        columns['type_code'][i] = self.type_code(trade_type)
+        columns['avg_entry_price'][i] = avg_entry_price
+        columns['exec_price'][i] = exec_price
+        columns['qty'][i] = qty
+        columns['usdc_remaining'][i] = usdc_remaining
+        columns['asset_total'][i] = asset_total
+        columns['commission'][i] = commission
+        self._size = i + 1
+        self._maybe_flush()
+
+    def append_many(self, tick: int, asset_ids: np.ndarray, trade_type: str, avg_entry_price: np.ndarray,
+                    exec_price: np.ndarray, qty: np.ndarray, usdc_remaining: np.ndarray, asset_total: np.ndarray,
+                    commission: np.ndarray):
+        """Agrega varias compras del mismo tick (motor vectorizado) con escrituras por columna."""
+        n_rows = len(asset_ids)
+        self._reserve(n_rows)
+        rows = slice(self._size, self._size + n_rows)
+        columns = self._columns
+        columns['tick'][rows] = tick
+        columns['asset_id'][rows] = asset_ids
+        columns['type_code'][rows] = self.type_code(trade_type)
+        columns['avg_entry_price'][rows] = avg_entry_price
+        columns['exec_price'][rows] = exec_price
+        columns['qty'][rows] = qty
+        columns['usdc_remaining'][rows] = usdc_remaining
+        columns['asset_total'][rows] = asset_total
+        columns['commission'][rows] = commission
+        self._size += n_rows
+        self._maybe_flush()
+
+    def column(self, name: str) -> np.ndarray:
+        """Vista (sin copia) de las filas escritas de una columna."""
+        return self._columns[name][:self._size]
+
+    def to_dataframe(self, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """Filas [start, stop) con las columnas del registro clásico (Asset y Type como texto)."""
+        stop = self._size if stop is None else min(stop, self._size)
+        start = max(0, min(start, stop))
+        columns = {name: column[start:stop] for name, column in self._columns.items()}
+        return pd.DataFrame({
+            'Tick': columns['tick'],
+            'Asset': np.array(self.tickers, dtype=object)[columns['asset_id']],
+            'Type': np.array(self.types or [''], dtype=object)[columns['type_code']],
+            'Avg_Entry_Price': columns['avg_entry_price'],
+            'Exec_Price': columns['exec_price'],
+            'Qty_Bought': columns['qty'],
+            'USDC_Remaining': columns['usdc_remaining'],
+            'Asset_Total': columns['asset_total'],
+            'Commission': columns['commission'],
+        }, columns=self.LOG_COLUMNS)
+
+    def tail(self, n: int = 10) -> pd.DataFrame:
+        return self.to_dataframe(self._size - n)
+
+    def per_asset_summary(self) -> dict:
+        """Agregados por activo con np.bincount: compras, cantidad, USDC gastado y comisiones."""
+        asset_id = self.column('asset_id')
+        n_assets = len(self.tickers)
+        qty = self.column('qty')
+        return {
+            'purchases': np.bincount(asset_id, minlength=n_assets),
+            'qty': np.bincount(asset_id, weights=qty, minlength=n_assets),
+            'spent': np.bincount(asset_id, weights=self.column('exec_price') * qty, minlength=n_assets),
+            'commission': np.bincount(asset_id, weights=self.column('commission'), minlength=n_assets),
+        }
+
+    def get_state(self) -> dict:
+        state = {name: self._columns[name][:self._size].copy() for name, _ in self.FIELDS}
+        state['types'] = list(self.types)
+        return state
+
+    def set_state(self, state: dict):
+        """Restaura las filas de un checkpoint y reescribe `path` con exactamente esas filas.
+
+        Lo volcado después del checkpoint se descarta: los ticks que se vuelven a ejecutar al
+        reanudar lo agregarían otra vez.
+        """
+        n_rows = len(state['tick'])
+        self._size = 0
+        self._reserve(n_rows)
+        for name, _ in self.FIELDS:
+            self._columns[name][:n_rows] = state[name]
+        self._size = n_rows
+        self.types = list(state['types'])
+        self._type_codes = {trade_type: code for code, trade_type in enumerate(self.types)}
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._flushed = 0
+        self._truncate = True
+        self.flush()
+
+    # --- Volcado incremental / exportación ---
+    def _maybe_flush(self):
+        if self.path is None:
+            return
+        pending = self._size - self._flushed
+        if pending >= self.flush_rows or (pending and time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Vuelca a `path` las filas agregadas desde el último volcado."""
+        self._last_flush = time.monotonic()
+        if self.path is None or self._flushed == self._size:
+            return
+        frame = self.to_dataframe(self._flushed)
+        kind = self._path_kind(self.path)
+        if self._truncate:
+            self._clear_path(kind)
+        if kind == 'parquet':
+            os.makedirs(self.path, exist_ok=True)
+            # Parte temporal oculta (con '.') para que un lector nunca vea un archivo a medias
+            tmp_path = os.path.join(self.path, f".part-{self._parts:05d}.parquet.tmp")
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, os.path.join(self.path, f"part-{self._parts:05d}.parquet"))
+            self._parts += 1
+        elif kind == 'arrow':
+            import pyarrow as pa
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pa.ipc.new_stream(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a', header=self._flushed == 0, index=False)
+        self._flushed = self._size
+
+    def _clear_path(self, kind: str):
+        """Borra lo que otra sesión dejó en `path` (solo las partes en un directorio parquet)."""
+        self._truncate = False
+        if kind == 'parquet':
+            if os.path.isdir(self.path):
+                for name in os.listdir(self.path):
+                    if name.startswith(('part-', '.part-')):
+                        os.remove(os.path.join(self.path, name))
+            self._parts = 0
+        elif kind == 'csv' and os.path.exists(self.path):
+            os.remove(self.path)
+        # El stream Arrow se crea truncando el archivo al abrir el writer
+
+    @staticmethod
+    def _path_kind(path: str) -> str:
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.parquet', '.pq', '.arrow', '.arrows', '.feather'):
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                warnings.warn(f"pyarrow no está instalado: {path} se escribe como CSV")
+                return 'csv'
+            return 'parquet' if ext in ('.parquet', '.pq') else 'arrow'
+        return 'csv'
+
+    def export(self, path: str):
+        """Escribe el registro completo en `path` (.parquet, .arrow/.feather o .csv)."""
+        frame = self.to_dataframe()
+        kind = self._path_kind(path)
+        if kind == 'parquet':
+            frame.to_parquet(path, index=False)
+        elif kind == 'arrow':
+            frame.to_feather(path)
+        else:
+            frame.to_csv(path, index=False)
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    @staticmethod
+    def read(path: str) -> pd.DataFrame:
+        """Lee un registro volcado (directorio parquet, stream Arrow o CSV), incluso tras una caída."""
+        if os.path.isdir(path):
+            return pd.read_parquet(path)
+        if path.lower().endswith(('.arrow', '.arrows', '.feather')):
+            import pyarrow as pa
+            try:
+                return pa.ipc.open_stream(path).read_pandas()
+            except pa.ArrowInvalid:
+                return pd.read_feather(path)
+        return pd.read_csv(path)
+
+
+def history_closes(history) -> np.ndarray:
+    """Columna 'Close' de un historial inicial (DataFrame o dict {'Close': array}) como array float."""
+    return np.asarray(history['Close'], dtype=float)
+
+
+# Resultado de _execute_trade cuando la compra solo quedó encolada como orden límite (sin llenado aún)
+ORDER_QUEUED = 'QUEUED'
+
+
 class TradingAsset:
     """Encapsula la lógica de trading para un solo par de activos."""
     
-    def __init__(self, ticker: str, initial_usdc: float, price_history_df: pd.DataFrame, fetcher_instance):
+    def __init__(self, ticker: str, initial_usdc: float, price_history_df: pd.DataFrame, fetcher_instance,
+                 ledger: TransactionLedger = None, asset_id: int = 0):
         self.ticker = ticker
         self.usdc_balance = initial_usdc
         self.asset_balance = 0.0
         self.buy_price_avg = 0.0 
-        self.transaction_log = []
-        self.data = price_history_df.copy()
-        self.current_tick_index = len(self.data) - 1 
+        # Registro compartido del portafolio (o uno propio si el activo se usa suelto)
+        self.ledger = TransactionLedger([ticker]) if ledger is None else ledger
+        self.asset_id = asset_id
+        self.prices = PriceRingBuffer(CONFIG.PRICE_WINDOW_SIZE)
+        self.rsi_engine = IncrementalRSI()
+        for close in history_closes(price_history_df):
+            self.prices.append(float(close), self.rsi_engine.update(float(close)))
+        self.current_tick_index = len(history_closes(price_history_df)) - 1
         self.fetcher = fetcher_instance
         self.initial_usdc_balance = initial_usdc
+        self.journal = None
+        self.order_pipeline = None
+        self.pending_order_id = None
         
         self.total_commissions = 0.0
         self.total_winning_pnl = 0.0 
@@ -283,32 +1725,20 @@ class TradingAsset:
         
     def set_new_price(self, new_price: float):
         self.current_tick_index += 1
-        self.data.loc[len(self.data)] = new_price
-        if len(self.data) > 300: 
-            self.data = self.data.iloc[-300:].reset_index(drop=True)
+        self.prices.append(new_price)
+        self.rsi_engine.update(new_price)
 
     def _calculate_indicators(self):
-        if len(self.data) < CONFIG.RSI_PERIOD:
-            self.data['RSI'] = np.nan
-            return
-
-        delta = self.data['Close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
-
-        avg_gain = gain.ewm(span=CONFIG.RSI_PERIOD, adjust=False).mean()
-        avg_loss = loss.ewm(span=CONFIG.RSI_PERIOD, adjust=False).mean()
-
-        rs = avg_gain / avg_loss.replace(0, np.nan) 
-        self.data['RSI'] = 100 - (100 / (1 + rs))
+        # El motor incremental ya incorporó el último precio: solo se publica el valor
+        self.prices.set_last_rsi(self.rsi_engine.value())
 
     def _execute_trade(self, trade_type: str, current_price: float, qty_to_trade: float):
         """Simula o ejecuta una orden de COMPRA."""
         is_live = CONFIG.LIVE_TRADING_ENABLED
-        side = 'BUY'
-        product_id = f"{self.ticker}-USD"
         
         if is_live and self.ticker != 'BRCN': 
+            if self.order_pipeline is not None:
+                return self._submit_limit_order(trade_type, current_price, qty_to_trade)
             # Implementar lógica de API de Coinbase/Binance aquí si LIVE es True
             # Nota: Esto es un placeholder, ya que no tengo acceso a tus credenciales
             # Simulación de ejecución exitosa
@@ -319,6 +1749,25 @@ class TradingAsset:
         else:
             return self._simulate_trade(trade_type, current_price, qty_to_trade)
 
+    def _submit_limit_order(self, trade_type: str, current_price: float, qty_to_trade: float):
+        """Encola una compra límite; el balance cambia recién cuando llega el llenado (apply_fill)."""
+        if self.pending_order_id is not None:
+            return current_price # Ya hay una orden en vuelo: no duplicar la señal
+        limit_price = current_price * (1 + CONFIG.LIMIT_ORDER_OFFSET_PCT)
+        if self.usdc_balance < limit_price * qty_to_trade * (1 + CONFIG.COMMISSION_PCT):
+            return current_price
+        order = self.order_pipeline.submit(self.ticker, qty_to_trade, limit_price, current_price, trade_type)
+        self.pending_order_id = order.order_id
+        return ORDER_QUEUED
+
+    def apply_fill(self, order: LimitOrder, fill: OrderFill):
+        """Reconciliación de una orden del pipeline (siempre en el hilo del loop)."""
+        if self.pending_order_id == order.order_id:
+            self.pending_order_id = None
+        if fill.qty > 0:
+            self._update_internal_state(order.trade_type, fill.price, fill.qty)
+        return fill.status
+
     def _update_internal_state(self, trade_type: str, execution_price: float, qty_executed: float):
         """Actualiza el balance interno tras una ejecución de COMPRA."""
         if qty_executed <= 0:
@@ -352,17 +1801,11 @@ class TradingAsset:
         # Registro de la transacción (Solo se registran COMPRAS)
         log_type = trade_type.replace('_MANUAL', ' (MANUAL)').replace('_INITIAL', ' (INITIAL)')
 
-        self.transaction_log.append({
-            'Tick': self.current_tick_index,
-            'Asset': self.ticker,
-            'Type': log_type,
-            'Avg_Entry_Price': self.buy_price_avg, 
-            'Exec_Price': final_price, 
-            'Qty_Bought': qty_executed,
-            'USDC_Remaining': self.usdc_balance,
-            'Asset_Total': self.asset_balance,
-            'Commission': commission_cost,
-        })
+        self.ledger.append(self.current_tick_index, self.asset_id, log_type, self.buy_price_avg, final_price,
+                           qty_executed, self.usdc_balance, self.asset_balance, commission_cost)
+        if self.journal is not None:
+            self.journal.write_fill(self.ticker, self.current_tick_index, final_price, qty_executed, commission_cost,
+                                    self.buy_price_avg, self.usdc_balance, self.asset_balance)
         return final_price
 
     def _simulate_trade(self, trade_type: str, current_price: float, qty_to_trade: float):
@@ -375,17 +1818,20 @@ class TradingAsset:
         
         return self._update_internal_state(trade_type, execution_price, qty_to_trade)
 
-    def run_tick(self, is_real_tick: bool):
-        """Ejecuta un solo paso de Live Trading (Solo COMPRA)."""
+    def run_tick(self, is_real_tick: bool, buy_signal: bool = None):
+        """Ejecuta un solo paso de Live Trading (Solo COMPRA).
+
+        `buy_signal` es la BUY_SIGNAL evaluada por el PortfolioManager; sin ella rige la regla clásica de RSI.
+        """
         
-        current_price = self.data['Close'].iloc[-1]
+        current_price = self.prices.last_close()
         self._calculate_indicators()
         
-        if len(self.data) < CONFIG.RSI_PERIOD:
+        if len(self.prices) < CONFIG.RSI_PERIOD:
             return f"{Colors.WARNING}Cargando datos históricos...{Colors.ENDC}", False
             
-        last_row = self.data.iloc[-1]
-        rsi_value = last_row['RSI'] if 'RSI' in last_row and not np.isnan(last_row['RSI']) else 50
+        last_rsi = self.prices.last_rsi()
+        rsi_value = last_rsi if not np.isnan(last_rsi) else 50
         
         bot_opinion = ""
         action_taken = False
@@ -404,7 +1850,13 @@ class TradingAsset:
 
         if is_real_tick and self.ticker != 'BRCN': 
             
-            buy_signal = rsi_value <= CONFIG.RSI_BUY_THRESHOLD
+            if buy_signal is None:
+                buy_signal = rsi_value <= CONFIG.RSI_BUY_THRESHOLD
+                signal_reason = f"RSI Sobrevendido ({rsi_value:,.2f})"
+            elif CONFIG.SIGNAL_TIMEFRAME != 'tick':
+                signal_reason = f"Señal {CONFIG.BUY_SIGNAL} al cierre de la vela de {CONFIG.SIGNAL_TIMEFRAME}"
+            else:
+                signal_reason = f"Señal {CONFIG.BUY_SIGNAL} (RSI {rsi_value:,.2f})"
             
             if self.usdc_balance > 1 and buy_signal:
                 # Compra fraccionada del 10% del capital restante asignado al activo
@@ -412,9 +1864,14 @@ class TradingAsset:
                 qty_to_buy = usdc_to_spend / current_price
                 
                 # Ejecutar la compra
-                if self._execute_trade('BUY_DCA', current_price, qty_to_buy) != current_price:
-                    opinion = f"{Colors.OKGREEN}🟢 COMPRA DCA: RSI Sobrevendido ({rsi_value:,.2f}). Ejecutando acumulación.{Colors.ENDC}"
+                result = self._execute_trade('BUY_DCA', current_price, qty_to_buy)
+                if result == ORDER_QUEUED:
+                    opinion = f"{Colors.OKCYAN}⏳ ORDEN LÍMITE ENVIADA (#{self.pending_order_id}): {signal_reason}. Esperando llenado.{Colors.ENDC}"
+                elif result != current_price:
+                    opinion = f"{Colors.OKGREEN}🟢 COMPRA DCA: {signal_reason}. Ejecutando acumulación.{Colors.ENDC}"
                     action_taken = True 
+                elif self.pending_order_id is not None:
+                    opinion = f"{Colors.OKCYAN}⏳ ORDEN LÍMITE EN CURSO (#{self.pending_order_id}). Esperando llenado.{Colors.ENDC}"
                 else:
                     opinion = f"{Colors.WARNING}Neutral: Falta de fondos para la compra fraccionada.{Colors.ENDC}"
 
@@ -423,7 +1880,7 @@ class TradingAsset:
     def execute_manual_buy(self):
         """Ejecuta una compra manual."""
         if self.usdc_balance > 1:
-            current_price = self.data['Close'].iloc[-1]
+            current_price = self.prices.last_close()
             usdc_to_spend = self.usdc_balance * CONFIG.USDC_TO_TRADE_PCT 
             qty_to_buy = usdc_to_spend / current_price
             return self._execute_trade('BUY_MANUAL', current_price, qty_to_buy)
@@ -434,7 +1891,7 @@ class TradingAsset:
         return current_value 
         
     def get_current_value(self):
-        last_price = self.data['Close'].iloc[-1]
+        last_price = self.prices.last_close()
         return self.usdc_balance + (self.asset_balance * last_price)
         
     def get_accumulated_metrics(self):
@@ -448,30 +1905,851 @@ class TradingAsset:
         }
 
 
+# -----------------------------------------------------------
+# 🧾 PIPELINE DE ÓRDENES ASÍNCRONO (LIMIT + EXCHANGE SIMULADO)
+# -----------------------------------------------------------
+LimitOrder = namedtuple('LimitOrder', ['order_id', 'ticker', 'side', 'qty', 'limit_price', 'reference_price', 'trade_type'])
+# status: FILLED, PARTIAL (el resto se cancela, IOC), UNFILLED (el límite no alcanzó), REJECTED o ERROR
+OrderFill = namedtuple('OrderFill', ['order_id', 'ticker', 'qty', 'price', 'status'])
+
+
+class MockExchange:
+    """Exchange local para medir el pipeline sin red: latencia por lote, llenados parciales y rechazos.
+
+    Cualquier exchange real se conecta implementando la misma corrutina `submit_batch`.
+    """
+
+    def __init__(self, latency: float = None, jitter: float = None, reject_rate: float = None,
+                 partial_fill_rate: float = None, slippage: float = None, seed: int = None):
+        self.latency = CONFIG.MOCK_EXCHANGE_LATENCY_SECONDS if latency is None else latency
+        self.jitter = CONFIG.MOCK_EXCHANGE_JITTER_SECONDS if jitter is None else jitter
+        self.reject_rate = CONFIG.MOCK_EXCHANGE_REJECT_RATE if reject_rate is None else reject_rate
+        self.partial_fill_rate = CONFIG.MOCK_EXCHANGE_PARTIAL_FILL_RATE if partial_fill_rate is None else partial_fill_rate
+        self.slippage = CONFIG.SLIPPAGE_PCT if slippage is None else slippage
+        self.rng = random.Random(seed)
+        self.batches = 0
+
+    async def submit_batch(self, orders: list) -> list:
+        """Un viaje de ida y vuelta por lote; retorna un OrderFill por orden, en el mismo orden."""
+        import asyncio
+        self.batches += 1
+        await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+        return [self._match(order) for order in orders]
+
+    def _match(self, order: LimitOrder) -> OrderFill:
+        rng = self.rng
+        if rng.random() < self.reject_rate:
+            return OrderFill(order.order_id, order.ticker, 0.0, order.limit_price, 'REJECTED')
+        # El precio se movió durante el viaje: compra límite, se llena solo si quedó a o bajo el límite
+        price = order.reference_price * (1 + rng.uniform(-self.slippage, self.slippage))
+        if price > order.limit_price:
+            return OrderFill(order.order_id, order.ticker, 0.0, order.limit_price, 'UNFILLED')
+        if rng.random() < self.partial_fill_rate:
+            return OrderFill(order.order_id, order.ticker, order.qty * rng.uniform(0.1, 0.9), price, 'PARTIAL')
+        return OrderFill(order.order_id, order.ticker, order.qty, price, 'FILLED')
+
+
+class AsyncOrderPipeline:
+    """Cola de órdenes límite con envío concurrente por lotes en un event loop de fondo.
+
+    El loop de trading encola con `submit` y despacha todo lo del tick con `dispatch` (un solo
+    salto de hilo); los lotes de hasta `max_batch` órdenes viajan en paralelo, con a lo sumo
+    `max_in_flight` en vuelo. Los llenados vuelven por `drain` y se aplican en el hilo del loop,
+    así los balances nunca se tocan desde el event loop.
+    """
+
+    def __init__(self, exchange, max_batch: int = None, max_in_flight: int = None):
+        import asyncio
+        import itertools
+        self.exchange = exchange
+        self.max_batch = CONFIG.ORDER_MAX_BATCH if max_batch is None else max_batch
+        self.max_in_flight = CONFIG.ORDER_MAX_IN_FLIGHT if max_in_flight is None else max_in_flight
+        self.latency = LatencyHistogram()
+        self.status_counts = {}
+        self.submitted = 0
+        self.completed = 0
+        self._ids = itertools.count(1)
+        self._outbox = []
+        self._fills = queue.SimpleQueue()
+        # Events a activar cuando llegan llenados (despiertan al loop para reconciliar)
+        self.listeners = []
+        self._tasks = set()
+        self._idle = threading.Condition()
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._thread = threading.Thread(target=self._run, name='order-pipeline', daemon=True)
+        started = threading.Event()
+        self._loop.call_soon(started.set)
+        self._thread.start()
+        started.wait()
+
+    def _run(self):
+        import asyncio
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._loop.run_forever()
+
+    def submit(self, ticker: str, qty: float, limit_price: float, reference_price: float,
+               trade_type: str = 'BUY_DCA') -> LimitOrder:
+        """Encola una compra límite (se envía en el próximo `dispatch`)."""
+        order = LimitOrder(next(self._ids), ticker, 'BUY', qty, limit_price, reference_price, trade_type)
+        self._outbox.append((order, time.perf_counter_ns()))
+        return order
+
+    def dispatch(self):
+        """Entrega al event loop todas las órdenes encoladas desde el último despacho."""
+        if not self._outbox:
+            return 0
+        pending, self._outbox = self._outbox, []
+        with self._idle:
+            self.submitted += len(pending)
+        self._loop.call_soon_threadsafe(self._start_batches, pending)
+        return len(pending)
+
+    def _start_batches(self, pending: list):
+        for start in range(0, len(pending), self.max_batch):
+            task = self._loop.create_task(self._send(pending[start:start + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list):
+        async with self._semaphore:
+            try:
+                fills = await self.exchange.submit_batch([order for order, _ in batch])
+            except Exception:
+                fills = [OrderFill(order.order_id, order.ticker, 0.0, order.limit_price, 'ERROR') for order, _ in batch]
+        now_ns = time.perf_counter_ns()
+        for (order, submitted_ns), fill in zip(batch, fills):
+            self.latency.record(now_ns - submitted_ns)
+            self.status_counts[fill.status] = self.status_counts.get(fill.status, 0) + 1
+            self._fills.put((order, fill))
+        with self._idle:
+            self.completed += len(batch)
+            self._idle.notify_all()
+        for listener in self.listeners:
+            listener.set()
+
+    def drain(self) -> list:
+        """Llenados (orden, OrderFill) recibidos desde la última llamada; no bloquea."""
+        fills = []
+        while not self._fills.empty():
+            fills.append(self._fills.get_nowait())
+        return fills
+
+    def flush(self, timeout: float = None) -> bool:
+        """Despacha lo pendiente y espera a que todas las órdenes enviadas tengan respuesta."""
+        self.dispatch()
+        with self._idle:
+            return self._idle.wait_for(lambda: self.completed >= self.submitted, timeout)
+
+    def close(self, timeout: float = 5.0):
+        self.flush(timeout)
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+        if not self._loop.is_running():
+            self._loop.close()
+
+    def stats(self) -> dict:
+        summary = self.latency.summary()
+        return {'submitted': self.submitted, 'completed': self.completed, 'status': dict(self.status_counts),
+                'latency_p50_s': summary['p50_seconds'], 'latency_p99_s': summary['p99_seconds'], 'latency_max_s': summary['max_seconds']}
+
+
+def benchmark_order_pipeline(n_ticks: int = 20, orders_per_tick: int = 30, max_batch: int = None,
+                             max_in_flight: int = None, exchange_kwargs: dict = None) -> dict:
+    """Envía `orders_per_tick` órdenes por tick contra el MockExchange y mide throughput y latencia punta a punta."""
+    exchange = MockExchange(**(exchange_kwargs or {}))
+    pipeline = AsyncOrderPipeline(exchange, max_batch, max_in_flight)
+    tickers = _bench_tickers(orders_per_tick)
+    started = time.perf_counter()
+    for _ in range(n_ticks):
+        for ticker in tickers:
+            pipeline.submit(ticker, 1.0, 100.0 * (1 + CONFIG.LIMIT_ORDER_OFFSET_PCT), 100.0)
+        pipeline.dispatch()
+        # El tick siguiente llega cuando todas las respuestas del anterior se reconciliaron
+        pipeline.flush()
+        pipeline.drain()
+    elapsed = time.perf_counter() - started
+    pipeline.close()
+    stats = pipeline.stats()
+    stats.update({'orders': n_ticks * orders_per_tick, 'batches': exchange.batches, 'seconds': elapsed,
+                  'orders_per_second': n_ticks * orders_per_tick / elapsed,
+                  'max_batch': pipeline.max_batch, 'max_in_flight': pipeline.max_in_flight})
+    return stats
+
+
+def _orders_arguments(parser):
+    # Sin valor, los parámetros salen de la configuración ya resuelta (--config/--set/BORI_*)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--orders-per-tick', type=int, default=30, help='Activos con señal en el mismo tick')
+    parser.add_argument('--batch', type=int, default=None, help='Por defecto ORDER_MAX_BATCH')
+    parser.add_argument('--in-flight', type=int, default=None, help='Por defecto ORDER_MAX_IN_FLIGHT')
+    parser.add_argument('--latency', type=float, default=None, help='Segundos por viaje al exchange (MOCK_EXCHANGE_LATENCY_SECONDS)')
+    parser.add_argument('--jitter', type=float, default=None)
+    parser.add_argument('--reject-rate', type=float, default=None)
+    parser.add_argument('--partial-rate', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--no-sequential', action='store_true', help='No medir la línea base de a una orden por viaje')
+
+
+def run_orders_cli(args) -> int:
+    # MockExchange completa con la configuración los parámetros que quedan en None
+    exchange_kwargs = {'latency': args.latency, 'jitter': args.jitter, 'reject_rate': args.reject_rate,
+                       'partial_fill_rate': args.partial_rate, 'seed': args.seed}
+    latency = CONFIG.MOCK_EXCHANGE_LATENCY_SECONDS if args.latency is None else args.latency
+    batch = CONFIG.ORDER_MAX_BATCH if args.batch is None else args.batch
+    in_flight = CONFIG.ORDER_MAX_IN_FLIGHT if args.in_flight is None else args.in_flight
+    runs = [('pipeline', batch, in_flight)]
+    if not args.no_sequential:
+        runs.append(('secuencial', 1, 1))
+
+    print(f"\n🧾 {Colors.BOLD}PIPELINE DE ÓRDENES{Colors.ENDC} | {args.ticks} ticks x {args.orders_per_tick} órdenes | latencia {latency * 1000:.0f} ms")
+    print(f"{'Modo':<12} {'Lote':>5} {'En vuelo':>9} {'Órdenes/s':>11} {'p50 ms':>9} {'p99 ms':>9} {'Lotes':>7}  Estados")
+    for label, max_batch, max_in_flight in runs:
+        stats = benchmark_order_pipeline(args.ticks, args.orders_per_tick, max_batch, max_in_flight, exchange_kwargs)
+        print(f"{label:<12} {max_batch:>5} {max_in_flight:>9} {stats['orders_per_second']:>11,.1f} "
+              f"{stats['latency_p50_s'] * 1000:>9.1f} {stats['latency_p99_s'] * 1000:>9.1f} {stats['batches']:>7}  {stats['status']}")
+    return 0
+
+# -----------------------------------------------------------
+# 🖥️ RENDER DIFERENCIAL DE TERMINAL (ANSI)
+# -----------------------------------------------------------
+class TerminalRenderer:
+    """Redibuja solo las líneas que cambiaron usando posicionamiento de cursor ANSI."""
+
+    def __init__(self, stream=None, max_fps: float = None):
+        self.stream = sys.stdout if stream is None else stream
+        self.min_frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self._previous_lines = None
+        self._last_frame_time = float('-inf')
+        self._row_cache = {}
+
+    def frame_due(self) -> bool:
+        """Indica si ya pasó el intervalo mínimo entre cuadros."""
+        return time.monotonic() - self._last_frame_time >= self.min_frame_interval
+
+    def invalidate(self):
+        """Fuerza un redibujado completo en el próximo cuadro (p. ej. tras mensajes externos)."""
+        self._previous_lines = None
+
+    def cached_row(self, key, state: tuple, formatter) -> str:
+        """Retorna la fila formateada en caché si el estado visible no cambió."""
+        cached = self._row_cache.get(key)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        row = formatter()
+        self._row_cache[key] = (state, row)
+        return row
+
+    def render(self, lines: list):
+        previous = self._previous_lines
+        out = []
+        if previous is None:
+            # Primer cuadro (o invalidado): limpiar una sola vez, sin lanzar un shell
+            out.append('\033[2J')
+            previous = []
+
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                out.append(f"\033[{row + 1};1H{line}\033[K")
+        if len(lines) < len(previous):
+            out.append(f"\033[{len(lines) + 1};1H\033[J")
+        # Dejar el cursor debajo del cuadro para que los mensajes no lo pisen
+        out.append(f"\033[{len(lines) + 1};1H")
+
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        self._previous_lines = lines
+        self._last_frame_time = time.monotonic()
+
+
+# -----------------------------------------------------------
+# 📊 INSTRUMENTACIÓN DEL LOOP (HISTOGRAMAS DE LATENCIA)
+# -----------------------------------------------------------
+class LatencyHistogram:
+    """Histograma log-lineal estilo HDR en nanosegundos: memoria fija y percentiles sin guardar muestras.
+
+    Cada potencia de 2 se divide en 2**SUB_BUCKET_BITS sub-buckets (error relativo ~3% con 5 bits).
+    `record` solo agrega a una lista; los buckets se actualizan en lote con NumPy cada FLUSH_EVERY
+    muestras, así el costo en el loop es el de un append.
+    """
+
+    SUB_BUCKET_BITS = 5
+    MAX_SHIFT = 40  # Hasta ~2**45 ns (~10 horas) por muestra
+    FLUSH_EVERY = 1024
+
+    def __init__(self):
+        self._sub_count = 1 << self.SUB_BUCKET_BITS
+        self._linear_limit = self._sub_count * 2
+        self.counts = np.zeros(self._linear_limit + self.MAX_SHIFT * self._sub_count, dtype=np.int64)
+        self.total_ns = 0
+        self.max_ns = 0
+        self._pending = []
+
+    def record(self, ns: int):
+        pending = self._pending
+        pending.append(ns)
+        if len(pending) >= self.FLUSH_EVERY:
+            self._flush()
+
+    def _bucket_counts(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.maximum(samples, 0)
+        bit_length = np.frexp(samples.astype(np.float64))[1]
+        shift = np.clip(bit_length - self.SUB_BUCKET_BITS - 1, 1, self.MAX_SHIFT)
+        log_index = (self._linear_limit + (shift - 1) * self._sub_count
+                     + np.minimum(samples >> shift, self._linear_limit - 1) - self._sub_count)
+        index = np.where(samples < self._linear_limit, samples, log_index)
+        return np.bincount(index, minlength=self.counts.size)
+
+    def _flush(self):
+        samples = np.array(self._pending, dtype=np.int64)
+        self._pending = []
+        self.counts += self._bucket_counts(samples)
+        self.total_ns += int(samples.sum())
+        self.max_ns = max(self.max_ns, int(samples.max()))
+
+    def _bucket_upper_ns(self, index: np.ndarray) -> np.ndarray:
+        offset = np.maximum(index - self._linear_limit, 0)
+        shift = offset // self._sub_count + 1
+        sub = offset % self._sub_count + self._sub_count
+        return np.where(index < self._linear_limit, index, ((sub + 1) << shift) - 1)
+
+    def summary(self) -> dict:
+        """Conteo, suma, p50/p90/p99 (cota superior del bucket) y máximo, en segundos.
+
+        No modifica el histograma: se puede llamar desde otro hilo (p. ej. el exportador HTTP).
+        """
+        pending = np.array(list(self._pending), dtype=np.int64)
+        counts = self.counts.copy()
+        total_ns, max_ns = self.total_ns, self.max_ns
+        if pending.size:
+            counts += self._bucket_counts(pending)
+            total_ns += int(pending.sum())
+            max_ns = max(max_ns, int(pending.max()))
+
+        count = int(counts.sum())
+        quantiles = {}
+        if count:
+            cumulative = np.cumsum(counts)
+            targets = np.maximum(1, np.ceil(count * np.array([0.5, 0.9, 0.99])))
+            upper = self._bucket_upper_ns(np.searchsorted(cumulative, targets))
+            quantiles = dict(zip(('p50_seconds', 'p90_seconds', 'p99_seconds'), np.minimum(upper, max_ns) / 1e9))
+        return {
+            'count': count,
+            'sum_seconds': total_ns / 1e9,
+            'p50_seconds': float(quantiles.get('p50_seconds', 0.0)),
+            'p90_seconds': float(quantiles.get('p90_seconds', 0.0)),
+            'p99_seconds': float(quantiles.get('p99_seconds', 0.0)),
+            'max_seconds': max_ns / 1e9,
+        }
+
+
+class LoopInstrumentation:
+    """Histogramas por etapa del loop (fetch, set_new_price, run_tick, suma de valor, display)."""
+
+    STAGES = ('fetch', 'stream', 'mock_prices', 'set_new_price', 'run_tick', 'value_sum', 'display_status', 'frame')
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.started = time.time()
+        self.time_to_first_tick = None
+
+    def record(self, stage: str, ns: int):
+        self.histograms[stage].record(ns)
+
+    def snapshot(self) -> dict:
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'time_to_first_tick_seconds': self.time_to_first_tick,
+            'stages': {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Formato de texto de Prometheus (un summary por etapa más el máximo)."""
+        name = 'boritracker_stage_latency_seconds'
+        lines = [f"# HELP {name} Latencia por etapa del loop de trading.", f"# TYPE {name} summary"]
+        max_lines = [f"# HELP {name}_max Latencia máxima observada por etapa.", f"# TYPE {name}_max gauge"]
+        for stage, summary in self.snapshot()['stages'].items():
+            for quantile, key in (('0.5', 'p50_seconds'), ('0.9', 'p90_seconds'), ('0.99', 'p99_seconds')):
+                lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {summary[key]:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {summary["sum_seconds"]:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {summary["count"]}')
+            max_lines.append(f'{name}_max{{stage="{stage}"}} {summary["max_seconds"]:.9f}')
+        if self.time_to_first_tick is not None:
+            max_lines += ["# HELP boritracker_time_to_first_tick_seconds Arranque del proceso hasta el primer tick.",
+                          "# TYPE boritracker_time_to_first_tick_seconds gauge",
+                          f"boritracker_time_to_first_tick_seconds {self.time_to_first_tick:.6f}"]
+        return '\n'.join(lines + max_lines) + '\n'
+
+
+class MetricsExporter:
+    """Publica la instrumentación en un archivo (.json o texto Prometheus) y/o en un puerto local.
+
+    El archivo se reescribe de forma atómica cada `interval` segundos desde el loop; el servidor
+    HTTP (si hay puerto) responde /metrics (Prometheus) y /metrics.json en un hilo aparte.
+    """
+
+    def __init__(self, instrumentation: LoopInstrumentation, path: str = None, port: int = None,
+                 interval: float = None, host: str = '127.0.0.1'):
+        self.instrumentation = instrumentation
+        self.path = path
+        self.interval = CONFIG.METRICS_EXPORT_INTERVAL_SECONDS if interval is None else interval
+        self._next_write = 0.0
+        self.server = None
+        if port is not None:
+            from http.server import ThreadingHTTPServer
+            self.server = ThreadingHTTPServer((host, port), self._make_handler())
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name='metrics-exporter', daemon=True).start()
+
+    def _make_handler(self):
+        from http.server import BaseHTTPRequestHandler
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body, content_type = exporter.instrumentation.to_json().encode(), 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body, content_type = exporter.instrumentation.to_prometheus().encode(), 'text/plain; version=0.0.4'
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def maybe_write(self):
+        """Escribe el snapshot si ya venció el intervalo (barato de llamar en cada frame)."""
+        if self.path is not None and time.monotonic() >= self._next_write:
+            self.write()
+
+    def write(self):
+        if self.path is None:
+            return
+        text = self.instrumentation.to_json() if self.path.endswith('.json') else self.instrumentation.to_prometheus()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        self._next_write = time.monotonic() + self.interval
+
+    def close(self):
+        self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+# -----------------------------------------------------------
+# 🖼️ GRÁFICO DEL REPORTE (DECIMADO Y SIN PANTALLA)
+# -----------------------------------------------------------
+def lttb_downsample(x, y, n_out: int):
+    """Largest-Triangle-Three-Buckets: `n_out` puntos que conservan picos, caídas y forma de la serie."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Área del triángulo (punto elegido anterior, candidato, promedio del bucket siguiente)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+def minmax_downsample(x, y, n_out: int):
+    """Mínimo y máximo de cada bucket (en orden temporal): envolvente exacta con 2 puntos por bucket."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_buckets = max(1, n_out // 2)
+    if len(x) <= n_out:
+        return x, y
+
+    edges = np.linspace(0, len(x), n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    lows = np.array([start + np.argmin(y[start:stop]) for start, stop in zip(starts, edges[1:])])
+    highs = np.array([start + np.argmax(y[start:stop]) for start, stop in zip(starts, edges[1:])])
+    selected = np.unique(np.concatenate([lows, highs, [0, len(x) - 1]]))
+    return x[selected], y[selected]
+
+
+def downsample_series(x, y, n_out: int, method: str = None):
+    method = CONFIG.REPORT_DOWNSAMPLE if method is None else method
+    if method == 'minmax':
+        return minmax_downsample(x, y, n_out)
+    return lttb_downsample(x, y, n_out)
+
+
+def render_report_chart(path: str, portfolio: tuple, benchmark: tuple, initial_balance: float, title: str,
+                        xlabel: str, figsize: tuple, dpi: int, show: bool = False):
+    """Dibuja el gráfico del reporte con el backend Agg (sin pantalla) y lo guarda en `path` (.png/.svg)."""
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    ax.plot(*portfolio, label='Valor Total del Portafolio (USDC)', color='blue', linewidth=2)
+    ax.plot(*benchmark, label='Benchmark del Mercado (Índice Simulado)', color='orange', linestyle='--', alpha=0.7)
+    ax.axhline(y=initial_balance, color='red', linestyle=':', label='Saldo Inicial (Punto de Equilibrio)')
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Valor en USDC')
+    ax.grid(axis='y', linestyle='-', alpha=0.5)
+    ax.legend()
+
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+    fig.savefig(tmp_path, format=ext.lstrip('.') or 'png')
+    os.replace(tmp_path, path)
+    if show:
+        plt.show()
+
+
+def save_report_chart(path: str, portfolio: tuple, benchmark: tuple, initial_balance: float, title: str,
+                      xlabel: str, background: bool = None, show: bool = None):
+    """Decima las series a un punto por píxel horizontal y guarda el gráfico.
+
+    En segundo plano el dibujo corre en otro proceso (no daemon: termina aunque el reporte ya
+    haya vuelto). Retorna ese proceso, o None si se dibujó en primer plano.
+    """
+    background = CONFIG.REPORT_BACKGROUND if background is None else background
+    show = CONFIG.REPORT_SHOW if show is None else show
+    figsize, dpi = CONFIG.REPORT_FIGSIZE, CONFIG.REPORT_DPI
+    max_points = int(figsize[0] * dpi)
+    args = (path, downsample_series(*portfolio, max_points), downsample_series(*benchmark, max_points),
+            initial_balance, title, xlabel, figsize, dpi)
+
+    if background and not show:
+        import multiprocessing
+        process = multiprocessing.get_context('spawn').Process(target=render_report_chart, args=args,
+                                                                 name='report-chart')
+        process.start()
+        return process
+    render_report_chart(*args, show=show)
+    return None
+
+
+# -----------------------------------------------------------
+# ⏰ PLANIFICADOR DEL LOOP (TIMERS POR DEADLINE + DESPERTAR POR EVENTO)
+# -----------------------------------------------------------
+class LoopScheduler:
+    """Timers periódicos en un heap de deadlines y un Event para despertar antes de tiempo.
+
+    `wait` duerme hasta el deadline más próximo o hasta que otro hilo active `wake_event`
+    (snapshot nuevo del feed, llenado de una orden): sin eventos el proceso no usa CPU.
+    """
+
+    def __init__(self, wake_event: threading.Event = None, clock=time.monotonic):
+        self.wake_event = threading.Event() if wake_event is None else wake_event
+        self.clock = clock
+        self.intervals = {}
+        self.wakeups = 0
+        self._heap = []
+        # Deadline vigente por timer: las entradas del heap con otro deadline quedan sin efecto
+        self._deadlines = {}
+
+    def add_timer(self, name: str, interval: float, first_delay: float = None):
+        """Timer periódico; `first_delay` (por defecto `interval`) fija el primer disparo."""
+        self.intervals[name] = interval
+        self.reset(name, interval if first_delay is None else first_delay)
+
+    def reset(self, name: str, delay: float = None):
+        """Re-arma `name` a `delay` segundos desde ahora (las entradas anteriores quedan sin efecto)."""
+        deadline = self.clock() + (self.intervals[name] if delay is None else delay)
+        self._deadlines[name] = deadline
+        heapq.heappush(self._heap, (deadline, name))
+
+    def time_until(self, name: str) -> float:
+        deadline = self._deadlines.get(name)
+        return float('inf') if deadline is None else max(0.0, deadline - self.clock())
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and heap[0][0] != self._deadlines.get(heap[0][1]):
+            heapq.heappop(heap)
+
+    def wait(self) -> set:
+        """Bloquea hasta el próximo evento; retorna los timers vencidos (y 'wake' si hubo despertar)."""
+        self._discard_stale()
+        timeout = max(0.0, self._heap[0][0] - self.clock()) if self._heap else None
+        due = set()
+        if self.wake_event.wait(timeout):
+            self.wake_event.clear()
+            due.add('wake')
+        self.wakeups += 1
+
+        now = self.clock()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, name = heapq.heappop(heap)
+            if deadline == self._deadlines.get(name):
+                due.add(name)
+                # Periódico sin deriva acumulada: el próximo disparo se cuenta desde ahora
+                self.reset(name)
+        return due
+
+
+def live_loop_scheduler(fetcher: LiveFetcher, *wake_sources) -> LoopScheduler:
+    """Arma los timers del loop en vivo y suscribe el feed (y otras fuentes) al despertar.
+
+    - 'logic': con feed de fondo es solo un vigía (PRICE_STALE_AFTER_SECONDS sin snapshot nuevo);
+      los ticks de lógica los dispara la llegada del snapshot. Sin feed, consulta cada TICK_INTERVAL_SECONDS.
+      Con un feed por push (streaming) vuelve a ser cada TICK_INTERVAL_SECONDS: cada snapshot es un frame
+      con precios reales y la estrategia conserva su cadencia.
+    - 'visual': micro-movimientos simulados cada DISPLAY_INTERVAL_SECONDS (0 = desactivados); no hacen
+      falta con un feed por push.
+    - 'display': redibujo del contador aunque no haya precios nuevos.
+    """
+    scheduler = LoopScheduler()
+    streaming = fetcher.feed is not None and fetcher.feed.streaming
+    if fetcher.feed is not None:
+        fetcher.feed.listeners.append(scheduler.wake_event)
+    if fetcher.feed is not None and not streaming:
+        scheduler.add_timer('logic', CONFIG.PRICE_STALE_AFTER_SECONDS, first_delay=0.0)
+    else:
+        scheduler.add_timer('logic', CONFIG.TICK_INTERVAL_SECONDS, first_delay=0.0)
+    if CONFIG.DISPLAY_INTERVAL_SECONDS > 0 and not streaming:
+        scheduler.add_timer('visual', CONFIG.DISPLAY_INTERVAL_SECONDS)
+    scheduler.add_timer('display', CONFIG.DISPLAY_REFRESH_SECONDS)
+    for source in wake_sources:
+        if source is not None:
+            source.listeners.append(scheduler.wake_event)
+    return scheduler
+
+
+def next_price_frame(events: set, scheduler: LoopScheduler, fetcher: LiveFetcher):
+    """Precios que corresponden a los eventos de `scheduler.wait()`: (precios, es_tick_real, etapa).
+
+    `precios` es None cuando el evento no trae precios (solo redibujo o llenados de órdenes).
+    """
+    streaming = fetcher.feed is not None and fetcher.feed.streaming
+    if 'logic' in events or (not streaming and fetcher.has_new_snapshot()):
+        new_prices = fetcher.fetch_latest_prices()
+        # El vigía/consulta se cuenta desde el último tick de lógica, no desde el deadline anterior
+        scheduler.reset('logic')
+        # Sin precios reales nuevos (feed viejo o snapshot repetido) no se opera: el tick queda solo como visual
+        return new_prices, fetcher.has_fresh_prices, 'fetch'
+    if streaming and fetcher.has_new_snapshot():
+        return fetcher.fetch_stream_frame(), False, 'stream'
+    if 'visual' in events:
+        return fetcher._mock_prices_only(), False, 'mock_prices'
+    return None, False, None
+
 # -----------------------------------------------------------
 # 🏢 CLASE DE GESTIÓN DEL PORTAFOLIO MULTI-ACTIVO (LIVE)
 # -----------------------------------------------------------
 
+class StreamingMetrics:
+    """Acumulador O(1) por valor: retornos (Welford), volatilidad reciente, pico, drawdown y Sharpe."""
+
+    def __init__(self, window: int = None):
+        self.recent_returns = deque(maxlen=window) if window else None
+        self.count = 0
+        self.n_returns = 0
+        self.mean_return = 0.0
+        self._m2 = 0.0
+        self.last_value = None
+        self.peak = -np.inf
+        self.max_drawdown = np.nan  # Fracción (<= 0) como (valor - pico) / pico
+
+    def update(self, value: float):
+        if self.last_value is not None:
+            ret = value / self.last_value - 1
+            self.n_returns += 1
+            delta = ret - self.mean_return
+            self.mean_return += delta / self.n_returns
+            self._m2 += delta * (ret - self.mean_return)
+            if self.recent_returns is not None:
+                self.recent_returns.append(ret)
+
+        self.last_value = value
+        self.count += 1
+        if value > self.peak:
+            self.peak = value
+        drawdown = (value - self.peak) / self.peak
+        if not drawdown >= self.max_drawdown:
+            self.max_drawdown = drawdown
+
+    def std(self) -> float:
+        """Desviación estándar muestral (ddof=1) de todos los retornos."""
+        return np.sqrt(self._m2 / (self.n_returns - 1)) if self.n_returns >= 2 else np.nan
+
+    def recent_std(self) -> float:
+        """Desviación estándar muestral de la ventana reciente (tamaño fijo, costo constante)."""
+        window = self.recent_returns
+        if window is None or len(window) < 2:
+            return np.nan
+        mean = sum(window) / len(window)
+        return np.sqrt(sum((ret - mean) ** 2 for ret in window) / (len(window) - 1))
+
+    def get_state(self) -> dict:
+        state = {key: getattr(self, key) for key in ('count', 'n_returns', 'mean_return', '_m2', 'last_value', 'peak', 'max_drawdown')}
+        if self.recent_returns is not None:
+            state['recent_returns'] = np.array(self.recent_returns, dtype=float)
+        return state
+
+    def set_state(self, state: dict):
+        for key, value in state.items():
+            if key == 'recent_returns':
+                if self.recent_returns is not None:
+                    self.recent_returns.clear()
+                    self.recent_returns.extend(value.tolist())
+            else:
+                setattr(self, key, value)
+
+    def risk_metrics(self):
+        """Mismo resultado que calculate_risk_metrics sobre la serie completa alimentada."""
+        annual_ticks = (252 * 24 * 60 * 60) / CONFIG.TICK_INTERVAL_SECONDS 
+        volatility = self.std() * np.sqrt(annual_ticks)
+        mean_return = self.mean_return if self.n_returns else np.nan
+        sharpe_ratio = mean_return / volatility * np.sqrt(annual_ticks) if volatility != 0 else np.nan
+        return volatility, sharpe_ratio, self.max_drawdown * 100
+
+
+def calculate_risk_metrics(portfolio_series: pd.Series):
+    """Retorna (volatilidad anualizada, Sharpe, drawdown máximo %) de la serie por tick de lógica."""
+    returns = portfolio_series.pct_change().dropna()
+    annual_ticks = (252 * 24 * 60 * 60) / CONFIG.TICK_INTERVAL_SECONDS 
+    volatility = returns.std() * np.sqrt(annual_ticks)
+    sharpe_ratio = returns.mean() / volatility * np.sqrt(annual_ticks) if volatility != 0 else np.nan
+
+    peak = portfolio_series.cummax() 
+    drawdown = (portfolio_series - peak) / peak 
+    max_drawdown = drawdown.min() * 100
+    return volatility, sharpe_ratio, max_drawdown
+
+
+def calculate_session_metrics(final_value: float, total_ticks: int, risk_metrics: tuple,
+                              accumulated: dict, initial_usdc_balance: float) -> dict:
+    """Calcula métricas clave de rendimiento (modo DCA); `risk_metrics` = (volatilidad, Sharpe, drawdown %)."""
+    
+    total_pnl = final_value - initial_usdc_balance
+    return_pct = (total_pnl / initial_usdc_balance) * 100
+    
+    total_commissions = accumulated['total_commissions']
+    total_invested = accumulated['total_invested']
+    total_usdc_available = accumulated['final_usdc_balance']
+    
+    unrealized_pnl = final_value - initial_usdc_balance 
+
+    volatility, sharpe_ratio, max_drawdown = risk_metrics
+        
+    return {
+        "Valor Final Total (Mercado)": f"${final_value:,.2f}",
+        "Capital Invertido Neto": f"${total_invested:,.2f}",
+        "PnL No Realizado (Total)": f"${unrealized_pnl:,.2f}",
+        "Rendimiento (%)": f"{return_pct:,.2f}%",
+        "Total Ticks (Lógica)": total_ticks,
+        "Acumulaciones Bancarias": { 
+            "Capital Invertido (Neto)": total_invested,
+            "Comisiones Totales": total_commissions,
+            "USDC Disponible": total_usdc_available
+        },
+        "Volatilidad Anualizada (%)": f"{volatility*100:,.2f}%",
+        "Drawdown Máximo (%)": f"{abs(max_drawdown):,.2f}%",
+        "Sharpe Ratio": f"{sharpe_ratio:,.2f}",
+        "Sortino Ratio": "N/A (Solo Compras)",
+        "Avg. Recompensa/Riesgo (G/P)": "N/A (Solo Compras)"
+    }
+
+
 class PortfolioManager:
     """Gestiona múltiples activos y el flujo de la simulación."""
     
     def __init__(self, history_data_map: dict, fetcher_instance):
         self.initial_usdc_balance = CONFIG.INITIAL_USDC_BALANCE
         self.assets = {}
+        self.ledger = TransactionLedger(CONFIG.ASSETS_TO_TRACK, path=CONFIG.LEDGER_PATH)
         # Inicializar cada activo con su porción de capital, pero sin posición inicial
-        for ticker in CONFIG.ASSETS_TO_TRACK:
+        for asset_id, ticker in enumerate(CONFIG.ASSETS_TO_TRACK):
             self.assets[ticker] = TradingAsset(
                 ticker=ticker,
                 initial_usdc=CONFIG.CAPITAL_PER_ASSET,
                 price_history_df=history_data_map[ticker],
-                fetcher_instance=fetcher_instance
+                fetcher_instance=fetcher_instance,
+                ledger=self.ledger,
+                asset_id=asset_id,
             )
+        history = np.column_stack([history_closes(history_data_map[ticker]) for ticker in CONFIG.ASSETS_TO_TRACK])
+        # Velas OHLC de los ticks reales; el historial inicial se vuelca con el primer tick real,
+        # espaciado TICK_INTERVAL_SECONDS hacia atrás (así la reproducción del diario da las mismas velas)
+        self.signal_timeframe = CONFIG.SIGNAL_TIMEFRAME
+        timeframes = list(CONFIG.CANDLE_TIMEFRAMES)
+        if self.signal_timeframe != 'tick' and self.signal_timeframe not in timeframes:
+            timeframes.append(self.signal_timeframe)
+        self.candles = CandleAggregator(len(self.assets), timeframes) if timeframes else None
+        self._candle_backfill = history if self.candles is not None else None
+        self._candle_buy_mask = None
+        # La regla clásica 'rsi <= RSI_BUY_THRESHOLD' por tick la evalúa cada activo con su RSI incremental;
+        # cualquier otra BUY_SIGNAL pasa por un IndicatorPipeline vectorizado sobre todos los activos,
+        # alimentado por tick o por los cierres de las velas de SIGNAL_TIMEFRAME
+        self.buy_signal = BuySignal(CONFIG.BUY_SIGNAL)
+        self.indicators = None
+        if self.signal_timeframe != 'tick':
+            self.indicators = IndicatorPipeline(len(self.assets), self.buy_signal.requirements)
+            self.signal_warmup = self.indicators.warmup(self.buy_signal.requirements)
+        elif not self.buy_signal.is_rsi_threshold(CONFIG):
+            self._rsi_key = INDICATOR_REFS['rsi'](CONFIG)
+            self.indicators = IndicatorPipeline(len(self.assets), self.buy_signal.requirements, provided=(self._rsi_key,))
+            self.indicators.load_history(history)
+            self.signal_warmup = self.indicators.warmup(self.buy_signal.requirements)
         self.sim_tick_counter = 0
         self.visual_tick_counter = 0 
         # Inicializar el historial de valor del portafolio con el valor inicial
-        self.portfolio_value_history = [self.initial_usdc_balance] * len(next(iter(history_data_map.values())))
+        self.portfolio_value_history = TieredSeries()
+        # Métricas en streaming: por frame (display) y solo con los ticks reales (reporte)
+        self.recent_metrics = StreamingMetrics(window=CONFIG.RSI_PERIOD * 2)
+        self.logic_metrics = StreamingMetrics()
+        for _ in range(len(history_closes(next(iter(history_data_map.values()))))):
+            self._record_portfolio_value(self.initial_usdc_balance, False)
+        self.logic_metrics.update(self.initial_usdc_balance)
+        self.renderer = TerminalRenderer(max_fps=CONFIG.RENDER_MAX_FPS)
         self.fetcher = fetcher_instance
+        self.journal = None
+        self.instrumentation = None
+        self.metrics_exporter = None
+        self.report_process = None
+        self.time_to_first_tick = None
+        self.order_pipeline = None
+        self.checkpointer = None
         
+    def _record_portfolio_value(self, total_value: float, is_real_tick: bool):
+        """Guarda el valor del frame y actualiza las métricas en O(1).
+
+        Las métricas del reporte (Sharpe, volatilidad, drawdown) solo ven los ticks con precios
+        reales: los frames del feed, del vigía o visuales llegan sin cadencia fija.
+        """
+        if is_real_tick:
+            self.logic_metrics.update(total_value)
+        self.portfolio_value_history.append(total_value)
+        self.recent_metrics.update(total_value)
+
     def _get_bank_details_current(self):
         """Obtiene las métricas de acumulación actuales para el display (CORREGIDO)."""
         total_commissions = 0.0
@@ -494,13 +2772,12 @@ class PortfolioManager:
         pnl = total_value - self.initial_usdc_balance
         return_pct = (pnl / self.initial_usdc_balance) * 100
         
-        market_index_value = self.fetcher.market_index_history[-1]
+        market_index_value = self.fetcher.market_index_history.last()
         market_pnl_pct = ((market_index_value / self.fetcher.initial_market_index_value) - 1) * 100
         alpha = return_pct - market_pnl_pct
         
-        portfolio_series = pd.Series(self.portfolio_value_history)
-        returns = portfolio_series.pct_change().dropna().tail(CONFIG.RSI_PERIOD * 2) 
-        recent_volatility = returns.std() * 100 if len(returns) >= 2 else 0.0
+        recent_std = self.recent_metrics.recent_std()
+        recent_volatility = recent_std * 100 if not np.isnan(recent_std) else 0.0
         
         description = f"{Colors.OKGREEN}MODO ACUMULACIÓN: Esperando puntos de entrada óptimos (RSI {CONFIG.RSI_BUY_THRESHOLD}).{Colors.ENDC}"
         action_comment = "Estrategia DCA pura. Buscando solo sobreventa."
@@ -510,7 +2787,9 @@ class PortfolioManager:
 
     def display_status(self, time_until_next_execution: float, asset_opinions: dict):
         """Muestra la interfaz de demo en vivo (Actualizada con flechas)."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # Límite de FPS independiente del tick de lógica: si no toca cuadro, no se formatea nada
+        if not self.renderer.frame_due():
+            return False
 
         total_value = sum(asset.get_current_value() for asset in self.assets.values())
         pnl_percent = ((total_value - self.initial_usdc_balance) / self.initial_usdc_balance) * 100
@@ -518,11 +2797,16 @@ class PortfolioManager:
         pnl_color = Colors.OKGREEN if pnl_percent >= 0 else Colors.FAIL
         
         mode = "LIVE DCA 🔴" if CONFIG.LIVE_TRADING_ENABLED else "SIMULACIÓN DCA 🟢"
+        feed = self.fetcher.feed
+        source = "WebSocket" if feed is not None and feed.streaming else "CoinGecko"
+        separator = f"{Colors.OKCYAN}-" * 100 + Colors.ENDC
         
-        print(f"{Colors.HEADER}="*100 + Colors.ENDC)
-        print(f"| {Colors.OKBLUE}{pd.to_datetime('now').strftime('%Y-%m-%d %H:%M:%S')}{Colors.ENDC} | Ticks Lógica Ejecutada: {self.sim_tick_counter} | Ticks Visuales: {self.visual_tick_counter}")
-        print(f"|  🤖 {Colors.BOLD}BORITRACKER V6.5 - MODO {mode}{Colors.ENDC} | Activos: {len(self.assets)} | Fuente: CoinGecko/BRCN")
-        print(f"{Colors.HEADER}="*100 + Colors.ENDC)
+        lines = [
+            f"{Colors.HEADER}="*100 + Colors.ENDC,
+            f"| {Colors.OKBLUE}{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())}{Colors.ENDC} | Ticks Lógica Ejecutada: {self.sim_tick_counter} | Ticks Visuales: {self.visual_tick_counter}",
+            f"|  🤖 {Colors.BOLD}BORITRACKER V6.5 - MODO {mode}{Colors.ENDC} | Activos: {len(self.assets)} | Fuente: {source}/BRCN",
+            f"{Colors.HEADER}="*100 + Colors.ENDC,
+        ]
         
         market_desc, action_comment, market_pnl_pct, alpha, volatility_pct = self.interpret_profit(total_value)
         
@@ -531,77 +2815,87 @@ class PortfolioManager:
         pnl_cerrado_color = Colors.OKGREEN if unrealized_pnl >= 0 else Colors.FAIL
         
         # --- SECCIÓN ACUMULACIÓN/INVERSIÓN ---
-        print(f"📈 {Colors.BOLD}RESUMEN DE RENDIMIENTO DE LA SESIÓN{Colors.ENDC}")
-        print(f"{Colors.OKCYAN}-" * 100 + Colors.ENDC)
+        lines.append(f"📈 {Colors.BOLD}RESUMEN DE RENDIMIENTO DE LA SESIÓN{Colors.ENDC}")
+        lines.append(separator)
         
         # VALORES CLAVE AJUSTADOS
-        print(f"💰 {Colors.BOLD}PORTAFOLIO VALOR TOTAL:{Colors.ENDC} ${total_value:,.2f}")
-        print(f"💵 {Colors.BOLD}INVERSIÓN TOTAL ACUMULADA (GASTADO):{Colors.ENDC} ${total_invested:,.4f}")
-        print(f"💸 {Colors.BOLD}USDC RESTANTE (DISPONIBLE):{Colors.ENDC} ${usdc_remaining:,.4f}")
-        print(f"  --- PNL NO REALIZADO (VALOR DE MERCADO) ---")
-        print(f"  💸 {Colors.BOLD}PNL NO REALIZADO (UNREALIZED PNL):{Colors.ENDC} {pnl_cerrado_color}${unrealized_pnl:,.4f}{Colors.ENDC}")
-        print(f"  📊 {Colors.BOLD}RENDIMIENTO NETO (Sesión):{Colors.ENDC} {pnl_color}{pnl_percent:,.2f}%{Colors.ENDC} (vs. Inicial: ${self.initial_usdc_balance:,.2f})")
+        lines.append(f"💰 {Colors.BOLD}PORTAFOLIO VALOR TOTAL:{Colors.ENDC} ${total_value:,.2f}")
+        lines.append(f"💵 {Colors.BOLD}INVERSIÓN TOTAL ACUMULADA (GASTADO):{Colors.ENDC} ${total_invested:,.4f}")
+        lines.append(f"💸 {Colors.BOLD}USDC RESTANTE (DISPONIBLE):{Colors.ENDC} ${usdc_remaining:,.4f}")
+        lines.append(f"  --- PNL NO REALIZADO (VALOR DE MERCADO) ---")
+        lines.append(f"  💸 {Colors.BOLD}PNL NO REALIZADO (UNREALIZED PNL):{Colors.ENDC} {pnl_cerrado_color}${unrealized_pnl:,.4f}{Colors.ENDC}")
+        lines.append(f"  📊 {Colors.BOLD}RENDIMIENTO NETO (Sesión):{Colors.ENDC} {pnl_color}{pnl_percent:,.2f}%{Colors.ENDC} (vs. Inicial: ${self.initial_usdc_balance:,.2f})")
         
         # 2. Comparación con el Benchmark
         pnl_color_market = Colors.OKGREEN if market_pnl_pct >= 0 else Colors.FAIL
         alpha_color = Colors.OKGREEN if alpha >= 0 else Colors.FAIL
-        print(f"🌐 {Colors.BOLD}BENCHMARK del Mercado (Índice):{Colors.ENDC} {pnl_color_market}{market_pnl_pct:,.2f}%{Colors.ENDC}")
-        print(f"⭐ {Colors.BOLD}ALPHA (Valor Agregado):{Colors.ENDC} {alpha_color}{alpha:,.2f}%{Colors.ENDC}")
+        lines.append(f"🌐 {Colors.BOLD}BENCHMARK del Mercado (Índice):{Colors.ENDC} {pnl_color_market}{market_pnl_pct:,.2f}%{Colors.ENDC}")
+        lines.append(f"⭐ {Colors.BOLD}ALPHA (Valor Agregado):{Colors.ENDC} {alpha_color}{alpha:,.2f}%{Colors.ENDC}")
         
         # 3. Drawdown de la Sesión (Riesgo Actual)
-        portfolio_series = pd.Series(self.portfolio_value_history)
-        peak_value = portfolio_series.max()
+        peak_value = max(self.recent_metrics.peak, total_value)
         drawdown_pct = ((peak_value - total_value) / peak_value) * 100 if peak_value > 0 else 0
         drawdown_color = Colors.FAIL if drawdown_pct >= 0.5 else Colors.WARNING
-        print(f"🛡️ {Colors.BOLD}DRAWDOWN ACTUAL (No Realizado):{Colors.ENDC} {drawdown_color}-{drawdown_pct:,.2f}%{Colors.ENDC} (Máxima caída temporal desde el pico: ${peak_value:,.2f})")
+        lines.append(f"🛡️ {Colors.BOLD}DRAWDOWN ACTUAL (No Realizado):{Colors.ENDC} {drawdown_color}-{drawdown_pct:,.2f}%{Colors.ENDC} (Máxima caída temporal desde el pico: ${peak_value:,.2f})")
         
-        print(f"{Colors.OKCYAN}-" * 100 + Colors.ENDC)
+        lines.append(separator)
 
         # Análisis Global
-        print(f"  🧠 {Colors.BOLD}ANÁLISIS DE RIESGO Y ESTRATEGIA (DCA):{Colors.ENDC}")
-        print(f"  > 📉 **Volatilidad Reciente (Riesgo):** {self._format_risk_assessment(volatility_pct, market_desc)}{Colors.ENDC}") 
-        print(f"  > 🚀 **Rendimiento General (Beta/Alpha):** {market_desc}")
-        print(f"  🎯 {Colors.BOLD}DECISIÓN ESTRATÉGICA (Recomendación):{Colors.ENDC} **{action_comment}**")
-        print(f"{Colors.OKCYAN}-" * 100 + Colors.ENDC)
-        
-        print(f"  📊 {Colors.BOLD}DETALLE DE ACTIVOS Y SEÑALES EN TIEMPO REAL{Colors.ENDC}")
+        lines.append(f"  🧠 {Colors.BOLD}ANÁLISIS DE RIESGO Y ESTRATEGIA (DCA):{Colors.ENDC}")
+        lines.append(f"  > 📉 **Volatilidad Reciente (Riesgo):** {self._format_risk_assessment(volatility_pct, market_desc)}{Colors.ENDC}") 
+        lines.append(f"  > 🚀 **Rendimiento General (Beta/Alpha):** {market_desc}")
+        lines.append(f"  🎯 {Colors.BOLD}DECISIÓN ESTRATÉGICA (Recomendación):{Colors.ENDC} **{action_comment}**")
+        lines.append(separator)
         
-        static_assets = [(ticker, self.assets[ticker]) for ticker in CONFIG.ASSETS_TO_TRACK]
+        lines.append(f"  📊 {Colors.BOLD}DETALLE DE ACTIVOS Y SEÑALES EN TIEMPO REAL{Colors.ENDC}")
         
         # Encabezado de la tabla
-        print(f"{'Activo':<8} | {'Precio (Tendencia)':<20} | {'RSI':<6} | {'Qty Acumulada':<13} | {'Avg. Entrada':<12} | {'Opinión/Decisión del Bot (Señal)':<50}")
-        print(f"{Colors.OKCYAN}-" * 100 + Colors.ENDC)
-
-        for ticker, asset in static_assets: 
-            current_price = asset.data['Close'].iloc[-1]
-            last_rsi = asset.data['RSI'].iloc[-1] if not asset.data.empty and 'RSI' in asset.data.columns else np.nan
-            
-            rsi_color = Colors.OKGREEN if (not np.isnan(last_rsi) and last_rsi <= CONFIG.RSI_BUY_THRESHOLD) else (Colors.FAIL if (not np.isnan(last_rsi) and last_rsi >= CONFIG.RSI_SELL_THRESHOLD) else Colors.ENDC)
-            rsi_display = f"{last_rsi:,.2f}" if not np.isnan(last_rsi) else "N/A"
-            
-            qty_display = f"{asset.asset_balance:,.4f}"
-            avg_entry_display = f"${asset.buy_price_avg:,.4f}" if asset.asset_balance > 0 else "---"
+        lines.append(f"{'Activo':<8} | {'Precio (Tendencia)':<20} | {'RSI':<6} | {'Qty Acumulada':<13} | {'Avg. Entrada':<12} | {'Opinión/Decisión del Bot (Señal)':<50}")
+        lines.append(separator)
 
+        for ticker in CONFIG.ASSETS_TO_TRACK: 
+            asset = self.assets[ticker]
             opinion = asset_opinions.get(ticker, f"{Colors.WARNING}Esperando datos...{Colors.ENDC}")
+            state = (
+                asset.prices.last_close(), asset.prices.last_rsi(), asset.asset_balance, asset.buy_price_avg,
+                self.fetcher.current_prices.get(ticker, 0), self.fetcher.previous_prices.get(ticker), opinion,
+            )
+            lines.append(self.renderer.cached_row(ticker, state, lambda: self._format_asset_row(ticker, asset, opinion)))
             
-            if ticker == 'BRCN':
-                 ticker_display = f"{Colors.BOLD}{Colors.OKGREEN}BRCN{Colors.ENDC}"
-            else:
-                 ticker_display = ticker
+        lines.append(separator)
+        
+        time_until_next_execution_display = max(0, time_until_next_execution)
+        stale_note = f" {Colors.WARNING}(Precios desactualizados: lógica en pausa){Colors.ENDC}" if self.fetcher.is_stale else ""
+        feed_error = getattr(self.fetcher.feed, 'last_error', None)
+        if self.fetcher.is_stale and feed_error is not None:
+            stale_note += f" {Colors.FAIL}Último error del feed: {type(feed_error).__name__}: {feed_error}{Colors.ENDC}"
+        lines.append(f"[{Colors.OKBLUE}INFO{Colors.ENDC}] Próxima EJECUCIÓN de API/Lógica en: {time_until_next_execution_display:.1f} segundos.{stale_note}")
+        lines.append(f"🕹️ {Colors.BOLD}CONTROLES MANUALES:{Colors.ENDC} Usa **Ctrl+C** para detener la simulación y generar el reporte final.")
 
-            # MEJORA: Indicador de precio con flechas
-            price_indicator = self.fetcher.get_price_indicator(ticker)
-            price_display = f"${current_price:,.4f} {price_indicator}"
+        self.renderer.render(lines)
+        return True
 
+    def _format_asset_row(self, ticker: str, asset, opinion: str) -> str:
+        """Formatea la fila de un activo en la tabla de señales."""
+        current_price = asset.prices.last_close()
+        last_rsi = asset.prices.last_rsi()
+        
+        rsi_color = Colors.OKGREEN if (not np.isnan(last_rsi) and last_rsi <= CONFIG.RSI_BUY_THRESHOLD) else (Colors.FAIL if (not np.isnan(last_rsi) and last_rsi >= CONFIG.RSI_SELL_THRESHOLD) else Colors.ENDC)
+        rsi_display = f"{last_rsi:,.2f}" if not np.isnan(last_rsi) else "N/A"
+        
+        qty_display = f"{asset.asset_balance:,.4f}"
+        avg_entry_display = f"${asset.buy_price_avg:,.4f}" if asset.asset_balance > 0 else "---"
+        
+        if ticker == 'BRCN':
+             ticker_display = f"{Colors.BOLD}{Colors.OKGREEN}BRCN{Colors.ENDC}"
+        else:
+             ticker_display = ticker
 
-            print(f"{ticker_display:<8} | {price_display:<20} | {rsi_color}{rsi_display}{Colors.ENDC} | {qty_display:<13} | {avg_entry_display:<12} | {opinion}")
+        # MEJORA: Indicador de precio con flechas
+        price_indicator = self.fetcher.get_price_indicator(ticker)
+        price_display = f"${current_price:,.4f} {price_indicator}"
 
-            
-        print(f"{Colors.OKCYAN}-" * 100 + Colors.ENDC)
-        
-        time_until_next_execution_display = max(0, time_until_next_execution)
-        print(f"[{Colors.OKBLUE}INFO{Colors.ENDC}] Próxima EJECUCIÓN de API/Lógica en: {time_until_next_execution_display:.1f} segundos.")
-        print(f"🕹️ {Colors.BOLD}CONTROLES MANUALES:{Colors.ENDC} Usa **Ctrl+C** para detener la simulación y generar el reporte final.")
+        return f"{ticker_display:<8} | {price_display:<20} | {rsi_color}{rsi_display}{Colors.ENDC} | {qty_display:<13} | {avg_entry_display:<12} | {opinion}"
 
     def _format_risk_assessment(self, volatility_pct, market_desc):
         if volatility_pct > 0.5:
@@ -616,111 +2910,289 @@ class PortfolioManager:
         return None
 
     def run_trading_loop(self):
-        """Función principal para el loop de trading."""
+        """Función principal para el loop de trading: duerme hasta el próximo evento (timer, snapshot o llenado)."""
         
-        final_log = []
-        last_execution_time = time.time() - CONFIG.TICK_INTERVAL_SECONDS 
+        scheduler = live_loop_scheduler(self.fetcher, self.order_pipeline)
+        if self.checkpointer is not None:
+            scheduler.add_timer('checkpoint', CONFIG.CHECKPOINT_INTERVAL_SECONDS)
+        if self.ledger.path is not None and self.ledger.flush_seconds > 0:
+            # Sin este timer una compra aislada esperaría en memoria hasta la siguiente compra
+            scheduler.add_timer('ledger_flush', self.ledger.flush_seconds)
+        asset_opinions = {}
         
         try:
             while True: 
                 
-                start_time = time.time()
-                asset_opinions = {}
+                events = scheduler.wait()
+                if 'checkpoint' in events:
+                    # Solo se copian arrays aquí; serializar y escribir corre en el hilo del CheckpointWriter
+                    self.checkpointer.submit(self.capture_state())
+                if 'ledger_flush' in events:
+                    self.ledger.flush()
+                instrumentation = self.instrumentation
+                if instrumentation is not None:
+                    frame_start_ns = time.perf_counter_ns()
                 
-                is_real_tick = (time.time() - last_execution_time) >= CONFIG.TICK_INTERVAL_SECONDS
+                new_prices, is_real_tick, fetch_stage = next_price_frame(events, scheduler, self.fetcher)
+                if fetch_stage == 'fetch':
+                    # La consulta a la API puede imprimir avisos: redibujar todo el próximo cuadro
+                    self.renderer.invalidate()
+                if self.order_pipeline is not None:
+                    self._reconcile_fills()
                 
-                if is_real_tick:
-                    new_prices = self.fetcher.fetch_latest_prices()
-                    self.sim_tick_counter += 1
-                    last_execution_time = time.time()
-                else:
-                    new_prices = self.fetcher._mock_prices_only()
-                
-                self.visual_tick_counter += 1
-                
-                for ticker, asset in self.assets.items():
-                    asset.set_new_price(new_prices[ticker])
-                    opinion, _ = asset.run_tick(is_real_tick) 
-                    asset_opinions[ticker] = opinion
-
-                total_value = sum(asset.get_current_value() for asset in self.assets.values())
-                self.portfolio_value_history.append(total_value)
+                if new_prices is not None:
+                    if instrumentation is not None:
+                        instrumentation.record(fetch_stage, time.perf_counter_ns() - frame_start_ns)
+                    asset_opinions = self._process_frame(new_prices, is_real_tick)
+                    if self.order_pipeline is not None:
+                        self.order_pipeline.dispatch()
+                    if self.time_to_first_tick is None:
+                        # Desde el arranque del proceso (antes de importar NumPy) hasta el primer frame procesado
+                        self.time_to_first_tick = time.perf_counter() - STARTUP_PERF_COUNTER
+                        if instrumentation is not None:
+                            instrumentation.time_to_first_tick = self.time_to_first_tick
+                elif 'display' not in events:
+                    continue
                 
-                time_until_next_execution = CONFIG.TICK_INTERVAL_SECONDS - (time.time() - last_execution_time)
+                time_until_next_execution = max(0.0, CONFIG.TICK_INTERVAL_SECONDS - (time.time() - self.fetcher.last_api_call_time))
                 
-                self.display_status(time_until_next_execution, asset_opinions) 
+                if instrumentation is None:
+                    self.display_status(time_until_next_execution, asset_opinions) 
+                else:
+                    display_start_ns = time.perf_counter_ns()
+                    if self.display_status(time_until_next_execution, asset_opinions):
+                        instrumentation.record('display_status', time.perf_counter_ns() - display_start_ns)
+                    instrumentation.record('frame', time.perf_counter_ns() - frame_start_ns)
+                    if self.metrics_exporter is not None:
+                        self.metrics_exporter.maybe_write()
                 
                 self. _handle_input()
-                
-                time.sleep(CONFIG.DISPLAY_INTERVAL_SECONDS)
+                if CONFIG.MAX_SIMULATION_TICKS and self.sim_tick_counter >= CONFIG.MAX_SIMULATION_TICKS:
+                    print(f"\n\n>>> 🏁 LÍMITE DE TICKS ALCANZADO ({CONFIG.MAX_SIMULATION_TICKS}). Generando reporte final...")
+                    break
                 
         except KeyboardInterrupt:
             print("\n\n>>> 🛑 SIMULACIÓN DETENIDA: Solicitud de interrupción del usuario (Ctrl+C). Generando reporte final...")
             
+        self.fetcher.stop_background_feed()
+        if self.order_pipeline is not None:
+            # Las órdenes en vuelo se esperan (con tope) para que el reporte refleje sus llenados
+            self.order_pipeline.close(CONFIG.ORDER_FLUSH_TIMEOUT_SECONDS)
+            self._reconcile_fills()
+        if self.checkpointer is not None:
+            # Cierre ordenado: el último checkpoint refleja el final exacto de la sesión
+            self.checkpointer.submit(self.capture_state())
+            self.checkpointer.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+        return self._finalize_session()
+
+    def _process_frame(self, new_prices: dict, is_real_tick: bool, timestamp: float = None) -> dict:
+        """Aplica un snapshot de precios a todos los activos y registra el valor del portafolio."""
+        timestamp = time.time() if timestamp is None else timestamp
+        self.visual_tick_counter += 1
+        if is_real_tick:
+            self.sim_tick_counter += 1
+        if self.journal is not None:
+            self.journal.write_frame(is_real_tick, self.visual_tick_counter, new_prices,
+                                     self.fetcher.market_index_history.last(), timestamp)
+        if is_real_tick and self.candles is not None:
+            # Solo precios reales: los micro-movimientos de los ticks visuales no entran en las velas
+            self._update_candles(new_prices, timestamp)
+
+        if self.instrumentation is not None:
+            return self._process_frame_instrumented(new_prices, is_real_tick)
+
+        asset_opinions = {}
+        if self.indicators is None:
+            for ticker, asset in self.assets.items():
+                asset.set_new_price(new_prices[ticker])
+                opinion, _ = asset.run_tick(is_real_tick) 
+                asset_opinions[ticker] = opinion
+        else:
+            for ticker, asset in self.assets.items():
+                asset.set_new_price(new_prices[ticker])
+            buy_mask = self._evaluate_buy_signal(new_prices)
+            for (ticker, asset), buy in zip(self.assets.items(), buy_mask.tolist()):
+                asset_opinions[ticker] = asset.run_tick(is_real_tick, buy)[0]
+
+        total_value = sum(asset.get_current_value() for asset in self.assets.values())
+        self._record_portfolio_value(total_value, is_real_tick)
+        return asset_opinions
+
+    def _process_frame_instrumented(self, new_prices: dict, is_real_tick: bool) -> dict:
+        """Igual que _process_frame, con una pasada por etapa para medir cada una por separado."""
+        record = self.instrumentation.record
+        perf_counter_ns = time.perf_counter_ns
+        assets = self.assets
+
+        t0 = perf_counter_ns()
+        for ticker, asset in assets.items():
+            asset.set_new_price(new_prices[ticker])
+        t1 = perf_counter_ns()
+        if self.indicators is None:
+            asset_opinions = {ticker: asset.run_tick(is_real_tick)[0] for ticker, asset in assets.items()}
+        else:
+            buy_mask = self._evaluate_buy_signal(new_prices).tolist()
+            asset_opinions = {ticker: asset.run_tick(is_real_tick, buy)[0]
+                              for (ticker, asset), buy in zip(assets.items(), buy_mask)}
+        t2 = perf_counter_ns()
+        total_value = sum(asset.get_current_value() for asset in assets.values())
+        self._record_portfolio_value(total_value, is_real_tick)
+        t3 = perf_counter_ns()
+
+        record('set_new_price', t1 - t0)
+        record('run_tick', t2 - t1)
+        record('value_sum', t3 - t2)
+        return asset_opinions
+
+    def _update_candles(self, new_prices: dict, timestamp: float):
+        """Vuelca un tick real a las velas; al cerrar una vela de SIGNAL_TIMEFRAME evalúa la señal sobre su cierre."""
+        if self._candle_backfill is not None:
+            history, self._candle_backfill = self._candle_backfill, None
+            for i, row in enumerate(history):
+                self._feed_candles(row, timestamp - (len(history) - i) * CONFIG.TICK_INTERVAL_SECONDS)
+            self._candle_buy_mask = None  # El historial calienta los indicadores, no dispara compras
+        n_assets = len(self.assets)
+        self._feed_candles(np.fromiter((new_prices[ticker] for ticker in self.assets), float, n_assets), timestamp)
+
+    def _feed_candles(self, prices: np.ndarray, timestamp: float):
+        closed = self.candles.update(prices, timestamp)
+        if self.signal_timeframe in closed:
+            values = self.indicators.update(self.candles.series[self.signal_timeframe].last_closed())
+            if self.indicators.count >= self.signal_warmup:
+                self._candle_buy_mask = self.buy_signal.evaluate(values)
+
+    def _evaluate_buy_signal(self, new_prices: dict) -> np.ndarray:
+        """Una pasada del pipeline para todos los activos (el RSI lo aportan los motores incrementales).
+
+        Con SIGNAL_TIMEFRAME la señal ya se evaluó al cerrar la vela: solo ese tick puede comprar.
+        """
+        n_assets = len(self.assets)
+        if self.signal_timeframe != 'tick':
+            buy_mask, self._candle_buy_mask = self._candle_buy_mask, None
+            return np.zeros(n_assets, dtype=bool) if buy_mask is None else buy_mask
+        prices = np.fromiter((new_prices[ticker] for ticker in self.assets), float, n_assets)
+        rsi = np.fromiter((asset.rsi_engine.value() for asset in self.assets.values()), float, n_assets)
+        values = self.indicators.update(prices, {self._rsi_key: rsi})
+        if self.indicators.count < self.signal_warmup:
+            return np.zeros(n_assets, dtype=bool)
+        return self.buy_signal.evaluate(values)
+
+    def enable_instrumentation(self, path: str = None, port: int = None):
+        """Activa los histogramas por etapa y, si se indica, su exportación a archivo/puerto."""
+        self.instrumentation = LoopInstrumentation()
+        if path is not None or port is not None:
+            self.metrics_exporter = MetricsExporter(self.instrumentation, path=path, port=port)
+        return self.instrumentation
+
+    def attach_journal(self, journal):
+        """Graba en `journal` cada frame y cada compra de la sesión."""
+        self.journal = journal
+        for asset in self.assets.values():
+            asset.journal = journal
+
+    def attach_order_pipeline(self, pipeline: AsyncOrderPipeline):
+        """En modo live, las compras salen como órdenes límite por `pipeline` en lugar de llenarse al instante."""
+        self.order_pipeline = pipeline
+        for asset in self.assets.values():
+            asset.order_pipeline = pipeline
+
+    ASSET_STATE_FIELDS = ('usdc_balance', 'asset_balance', 'buy_price_avg', 'total_commissions', 'total_winning_pnl',
+                          'total_losing_pnl', 'trades_closed', 'current_tick_index', 'initial_usdc_balance')
+
+    def enable_checkpoints(self, path: str):
+        """Checkpoint cada CHECKPOINT_INTERVAL_SECONDS (entre frames, nunca dentro de un tick de lógica)."""
+        self.checkpointer = CheckpointWriter(path)
+        return self.checkpointer
+
+    def capture_state(self) -> dict:
+        """Estado completo de la sesión como arrays (columnas por activo); la escritura va en CheckpointWriter."""
+        assets = list(self.assets.values())
+        asset_state = {field: np.array([getattr(asset, field) for asset in assets]) for field in self.ASSET_STATE_FIELDS}
+        asset_state.update({
+            'rsi_avg_gain': np.array([asset.rsi_engine.avg_gain for asset in assets], dtype=float),
+            'rsi_avg_loss': np.array([asset.rsi_engine.avg_loss for asset in assets], dtype=float),
+            'rsi_last_price': np.array([np.nan if asset.rsi_engine.last_price is None else asset.rsi_engine.last_price
+                                        for asset in assets], dtype=float),
+            'rsi_count': np.array([asset.rsi_engine.count for asset in assets]),
+            'close_window': np.stack([asset.prices.close_window() for asset in assets]),
+            'rsi_window': np.stack([asset.prices.rsi_window() for asset in assets]),
+        })
+        return {
+            'saved_at': time.time(),
+            'tickers': list(self.assets),
+            'initial_usdc_balance': self.initial_usdc_balance,
+            'sim_tick_counter': self.sim_tick_counter,
+            'visual_tick_counter': self.visual_tick_counter,
+            'assets': asset_state,
+            'portfolio_value_history': self.portfolio_value_history.get_state(),
+            'recent_metrics': self.recent_metrics.get_state(),
+            'logic_metrics': self.logic_metrics.get_state(),
+            'ledger': self.ledger.get_state(),
+            'fetcher': self.fetcher.get_state(),
+            'indicators': {} if self.indicators is None else self.indicators.get_state(),
+            'candles': {} if self.candles is None else self.candles.get_state(),
+            'candle_backfill_pending': self._candle_backfill is not None,
+        }
+
+    def restore_state(self, state: dict):
+        """Continúa la sesión de un checkpoint (mismos activos, en el mismo orden)."""
+        if state['tickers'] != list(self.assets):
+            raise ValueError("El checkpoint es de otro conjunto de activos (ASSETS_TO_TRACK distinto)")
+        asset_state = state['assets']
+        for i, asset in enumerate(self.assets.values()):
+            for field in self.ASSET_STATE_FIELDS:
+                setattr(asset, field, asset_state[field][i].item())
+            rsi_engine = asset.rsi_engine
+            rsi_engine.avg_gain = asset_state['rsi_avg_gain'][i].item()
+            rsi_engine.avg_loss = asset_state['rsi_avg_loss'][i].item()
+            last_price = asset_state['rsi_last_price'][i].item()
+            rsi_engine.last_price = None if np.isnan(last_price) else last_price
+            rsi_engine.count = asset_state['rsi_count'][i].item()
+            asset.prices.load_window(asset_state['close_window'][i], asset_state['rsi_window'][i])
+
+        self.initial_usdc_balance = state['initial_usdc_balance']
+        self.sim_tick_counter = state['sim_tick_counter']
+        self.visual_tick_counter = state['visual_tick_counter']
+        self.portfolio_value_history.set_state(state['portfolio_value_history'])
+        self.recent_metrics.set_state(state['recent_metrics'])
+        self.logic_metrics.set_state(state['logic_metrics'])
+        self.ledger.set_state(state['ledger'])
+        self.fetcher.set_state(state['fetcher'])
+        if self.indicators is not None and state.get('indicators'):
+            self.indicators.set_state(state['indicators'])
+        if self.candles is not None and state.get('candles'):
+            self.candles.set_state(state['candles'])
+            if not state.get('candle_backfill_pending', False):
+                self._candle_backfill = None
+        self.renderer.invalidate()
+
+    def _reconcile_fills(self):
+        for order, fill in self.order_pipeline.drain():
+            self.assets[order.ticker].apply_fill(order, fill)
+
+    def _finalize_session(self):
+        """Valor final y registro consolidado de transacciones de la sesión."""
         final_prices = self.fetcher.current_prices 
         final_value = sum(asset.usdc_balance + (asset.asset_balance * final_prices[ticker]) for ticker, asset in self.assets.items())
         
-        for asset in self.assets.values(): 
-            final_log.extend(asset.transaction_log)
-
-        if final_log:
-            final_df = pd.DataFrame(final_log)
-        else:
-            final_df = pd.DataFrame(columns=['Tick', 'Asset', 'Type', 'Avg_Entry_Price', 'Exec_Price', 'Qty_Bought', 'USDC_Remaining', 'Asset_Total', 'Commission'])
-            
-        return final_df, self.sim_tick_counter, final_value
+        self.ledger.close()
+        return self.ledger.to_dataframe(), self.sim_tick_counter, final_value
     
     def _calculate_metrics(self, final_value: float, total_ticks: int) -> dict:
         """Calcula métricas clave de rendimiento para el modo DCA."""
         
-        total_pnl = final_value - self.initial_usdc_balance
-        return_pct = (total_pnl / self.initial_usdc_balance) * 100
-        
-        total_commissions = 0.0
-        total_invested = 0.0
-        total_usdc_available = 0.0
-        
+        accumulated = {'total_commissions': 0.0, 'total_invested': 0.0, 'final_usdc_balance': 0.0}
         for asset in self.assets.values():
             metrics = asset.get_accumulated_metrics()
-            total_commissions += metrics['total_commissions']
-            total_invested += metrics['total_invested']
-            total_usdc_available += metrics['final_usdc_balance']
-        
-        unrealized_pnl = final_value - self.initial_usdc_balance 
+            for key in accumulated:
+                accumulated[key] += metrics[key]
 
-        logic_tick_step = int(CONFIG.TICK_INTERVAL_SECONDS / CONFIG.DISPLAY_INTERVAL_SECONDS)
-        portfolio_series = pd.Series([
-            self.portfolio_value_history[i] 
-            for i in range(len(self.portfolio_value_history)) 
-            if i % logic_tick_step == 0 or i == 0
-        ])
-        
-        returns = portfolio_series.pct_change().dropna()
-        annual_ticks = (252 * 24 * 60 * 60) / CONFIG.TICK_INTERVAL_SECONDS 
-        volatility = returns.std() * np.sqrt(annual_ticks)
-        sharpe_ratio = returns.mean() / volatility * np.sqrt(annual_ticks) if volatility != 0 else np.nan
-
-        peak = portfolio_series.cummax() 
-        drawdown = (portfolio_series - peak) / peak 
-        max_drawdown = drawdown.min() * 100
-            
-        return {
-            "Valor Final Total (Mercado)": f"${final_value:,.2f}",
-            "Capital Invertido Neto": f"${total_invested:,.2f}",
-            "PnL No Realizado (Total)": f"${unrealized_pnl:,.2f}",
-            "Rendimiento (%)": f"{return_pct:,.2f}%",
-            "Total Ticks (Lógica)": total_ticks,
-            "Acumulaciones Bancarias": { 
-                "Capital Invertido (Neto)": total_invested,
-                "Comisiones Totales": total_commissions,
-                "USDC Disponible": total_usdc_available
-            },
-            "Volatilidad Anualizada (%)": f"{volatility*100:,.2f}%",
-            "Drawdown Máximo (%)": f"{abs(max_drawdown):,.2f}%",
-            "Sharpe Ratio": f"{sharpe_ratio:,.2f}",
-            "Sortino Ratio": "N/A (Solo Compras)",
-            "Avg. Recompensa/Riesgo (G/P)": "N/A (Solo Compras)"
-        }
+        return calculate_session_metrics(final_value, total_ticks, self.logic_metrics.risk_metrics(),
+                                         accumulated, self.initial_usdc_balance)
 
     def generate_report(self, log_df: pd.DataFrame, final_value: float, total_ticks: int):
         """Genera el reporte final para el modo DCA."""
@@ -731,6 +3203,12 @@ class PortfolioManager:
         print("\n\n" + f"{Colors.HEADER}="*60 + Colors.ENDC)
         print(f"📊 {Colors.BOLD}REPORTE FINAL DE ACUMULACIÓN (DCA Pura){Colors.ENDC}")
         print(f"Fuente: CoinGecko/Mock | Ticks de Lógica: {total_ticks} | Ticks Visuales: {self.visual_tick_counter}")
+        if self.time_to_first_tick is not None:
+            print(f"Arranque hasta el primer tick: {self.time_to_first_tick:.3f}s")
+        if self.order_pipeline is not None:
+            order_stats = self.order_pipeline.stats()
+            print(f"Órdenes límite: {order_stats['submitted']} enviadas | {order_stats['status']} | "
+                  f"latencia p50 {order_stats['latency_p50_s'] * 1000:.1f} ms, p99 {order_stats['latency_p99_s'] * 1000:.1f} ms")
         print(f"{Colors.HEADER}="*60 + Colors.ENDC)
         
         # --- SECCIÓN CLAVE: DETALLE BANCARIO DESGLOSADO ---
@@ -761,16 +3239,19 @@ class PortfolioManager:
         
         print(f"\n📈 {Colors.BOLD}RESUMEN DE ACUMULACIÓN POR ACTIVO:{Colors.ENDC}")
         asset_summary = []
+        ledger_summary = self.ledger.per_asset_summary()
         for ticker, asset in self.assets.items():
-            final_price = asset.data['Close'].iloc[-1]
+            final_price = asset.prices.last_close()
             current_value = asset.usdc_balance + (asset.asset_balance * final_price)
             pnl_unrealized = current_value - CONFIG.CAPITAL_PER_ASSET
             pct = (pnl_unrealized / CONFIG.CAPITAL_PER_ASSET) * 100
             
             asset_summary.append({
                 'Activo': ticker,
+                'Compras': int(ledger_summary['purchases'][asset.asset_id]),
                 'Qty Acumulada': asset.asset_balance,
                 'Avg. Entrada': asset.buy_price_avg,
+                'Comisiones': ledger_summary['commission'][asset.asset_id],
                 'PnL No Realizado': pnl_unrealized,
                 'Rendimiento (%)': pct,
             })
@@ -798,65 +3279,2179 @@ class PortfolioManager:
             print("--- NO HAY COMPRAS REGISTRADAS EN ESTA SIMULACIÓN ---")
         
         # --- Generar Gráfico de PnL ---
-        plt.figure(figsize=(12, 6))
-        plot_data = pd.Series(self.portfolio_value_history).reset_index(drop=True) 
-        
-        plt.plot(plot_data.index, plot_data.values, label='Valor Total del Portafolio (USDC)', color='blue', linewidth=2)
-        
-        benchmark_series = pd.Series(self.fetcher.market_index_history).reset_index(drop=True)
-        if len(benchmark_series) > len(plot_data):
-            benchmark_series = benchmark_series.iloc[:len(plot_data)]
+        plot_x, plot_y = self.portfolio_value_history.series()
+        benchmark_x, benchmark_y = self.fetcher.market_index_history.series()
+        in_range = benchmark_x < len(self.portfolio_value_history)
 
-        plt.plot(benchmark_series.index, benchmark_series.values, 
-                 label='Benchmark del Mercado (Índice Simulado)', color='orange', linestyle='--', alpha=0.7)
+        chart_path = CONFIG.REPORT_CHART_PATH
+        self.report_process = save_report_chart(
+            chart_path, (plot_x, plot_y), (benchmark_x[in_range], benchmark_y[in_range]), self.initial_usdc_balance,
+            f'Evolución del Valor del Portafolio - {total_ticks} Ticks de Lógica (MODO DCA)',
+            f'Visual Ticks (Actualización cada {CONFIG.DISPLAY_INTERVAL_SECONDS}s)',
+        )
+        pending = " (generándose en segundo plano)" if self.report_process is not None else ""
+        print(f"\n🖼️ {Colors.BOLD}Gráfico del portafolio:{Colors.ENDC} {os.path.abspath(chart_path)}{pending}")
+        return chart_path
 
-        plt.axhline(y=self.initial_usdc_balance, color='red', linestyle=':', label='Saldo Inicial (Punto de Equilibrio)')
-        plt.title(f'Evolución del Valor del Portafolio - {total_ticks} Ticks de Lógica (MODO DCA)')
-        plt.xlabel(f'Visual Ticks (Actualización cada {CONFIG.DISPLAY_INTERVAL_SECONDS}s)')
-        plt.ylabel('Valor en USDC')
-        plt.grid(axis='y', linestyle='-', alpha=0.5)
-        plt.legend()
-        plt.show()
+# -----------------------------------------------------------
+# 🧠 PIPELINE DE INDICADORES (DAG DEDUPLICADO Y SEÑALES COMPUESTAS)
+# -----------------------------------------------------------
+# Cada indicador es un nodo identificado por una llave canónica (tupla); dos referencias que
+# resuelven a la misma llave (p. ej. ema(12) y la EMA rápida de macd(12, 26)) son un solo nodo.
+CLOSE = ('close',)
+DELTA = ('delta',)
 
-# --- PUNTO DE ENTRADA ---
-if __name__ == '__main__':
-    
-    print(f"\n{Colors.HEADER}====================================================={Colors.ENDC}")
-    print(f"  {Colors.BOLD}BORITRACKER V6.5 - MODO ACUMULACIÓN (DCA){Colors.ENDC}")
-    print(f"  {Colors.WARNING}Solo Compras en RSI bajo | No hay Ventas (SL/TP desactivados){Colors.ENDC}")
-    print(f"{Colors.HEADER}====================================================={Colors.ENDC}")
-    
-    # Menú de selección
-    print(f"\nSeleccione el modo de operación:")
-    print(f"1. {Colors.OKCYAN}Modo SIMULACIÓN{Colors.ENDC} (Recomendado para pruebas)")
-    print(f"2. {Colors.FAIL}Modo LIVE TRADING{Colors.ENDC} (Requiere API Key real y opera en Coinbase)")
-    
-    mode_choice = input(f"\nSeleccione un modo (1 o 2) y presione Enter: ")
-    
-    if mode_choice == '2':
-        confirm = input(f"{Colors.FAIL}ADVERTENCIA:{Colors.ENDC} ¿Está seguro que desea activar el **LIVE TRADING**? (S/N): ").lower()
-        if confirm == 's':
-            CONFIG.LIVE_TRADING_ENABLED = True
-            print(f"{Colors.OKGREEN}Modo LIVE TRADING ACTIVADO.{Colors.ENDC} ¡Operaciones reales en camino!")
+
+class IndicatorNode(abc.ABC):
+    """Nodo del DAG: recibe los valores de `inputs` (un array por activo) y retorna el suyo."""
+
+    inputs = ()
+
+    def __init__(self, key: tuple, n_assets: int):
+        self.key = key
+        self.n_assets = n_assets
+
+    def warmup(self, input_warmups: list) -> int:
+        """Ticks necesarios para que el valor sea utilizable."""
+        return max(input_warmups, default=1)
+
+    @abc.abstractmethod
+    def update(self, *values) -> np.ndarray:
+        """Incorpora una fila (un array por entrada) y retorna el valor por activo."""
+
+    def update_block(self, *blocks) -> np.ndarray:
+        """Bloque (ticks x activos); por defecto fila por fila."""
+        return np.array([self.update(*row) for row in zip(*blocks)])
+
+    def get_state(self) -> dict:
+        return {}
+
+    def set_state(self, state: dict):
+        pass
+
+
+class MapNode(IndicatorNode):
+    """Nodo sin estado: una función elemento a elemento de sus entradas."""
+
+    def __init__(self, key: tuple, n_assets: int):
+        super().__init__(key, n_assets)
+        name = key[0]
+        if name == 'gain':
+            self.inputs, self.function = (DELTA,), lambda delta: np.maximum(delta, 0.0)
+        elif name == 'loss':
+            self.inputs, self.function = (DELTA,), lambda delta: np.maximum(-delta, 0.0)
+        elif name == 'square':
+            self.inputs, self.function = (CLOSE,), np.square
+        elif name == 'sub':
+            self.inputs, self.function = key[1:3], np.subtract
+        elif name == 'affine':
+            k = key[3]
+            self.inputs, self.function = key[1:3], lambda base, scale: base + k * scale
+        elif name == 'std':
+            # Desviación poblacional a partir de E[x] y E[x^2] de la misma ventana
+            n = key[1]
+            self.inputs = (('sma', CLOSE, n), ('sma', ('square',), n))
+            self.function = lambda mean, mean_sq: np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
         else:
-            print(f"{Colors.WARNING}Volviendo al Modo Simulación. Analicemos primero la estrategia.{Colors.ENDC}")
-            
-    current_mode = "LIVE DCA" if CONFIG.LIVE_TRADING_ENABLED else "SIMULACIÓN DCA"
-    CONFIG.display_options(current_mode)
+            raise ValueError(f"Nodo desconocido: {key!r}")
 
-    # 1. Carga Inicial
-    temp_fetcher = LiveFetcher(CONFIG.ASSETS_TO_TRACK) 
-    # La corrección está aquí: la función fetch_initial_history ya está en LiveFetcher
-    initial_history_data = temp_fetcher.fetch_initial_history()
+    def update(self, *values):
+        return self.function(*values)
 
-    # 2. Inicializar el Manager
-    manager = PortfolioManager(
-        history_data_map=initial_history_data,
-        fetcher_instance=temp_fetcher
-    ) 
+    def update_block(self, *blocks):
+        return self.function(*blocks)
+
+
+class DeltaNode(IndicatorNode):
+    """Cambio contra el tick anterior; el primero vale 0 (como diff() con NaN tratado como 0)."""
+
+    inputs = (CLOSE,)
+
+    def __init__(self, key: tuple, n_assets: int):
+        super().__init__(key, n_assets)
+        self.last = None
+
+    def update(self, close):
+        delta = np.zeros(self.n_assets) if self.last is None else close - self.last
+        self.last = np.array(close, dtype=float)
+        return delta
+
+    def update_block(self, close):
+        prev = close[:1] if self.last is None else self.last[None, :]
+        delta = np.diff(close, axis=0, prepend=prev)
+        self.last = close[-1].copy()
+        return delta
+
+    def get_state(self):
+        return {'last': np.empty(0) if self.last is None else self.last}
+
+    def set_state(self, state):
+        self.last = None if state['last'].size == 0 else state['last'].copy()
+
+
+class EwmNode(IndicatorNode):
+    """Media exponencial (ewm adjust=False) de otro nodo: ('ewm', entrada, alpha)."""
+
+    def __init__(self, key: tuple, n_assets: int):
+        super().__init__(key, n_assets)
+        self.inputs = (key[1],)
+        self.alpha = key[2]
+        self.value = None
+
+    def warmup(self, input_warmups):
+        return input_warmups[0] + max(0, round(2.0 / self.alpha - 1.0) - 1)
+
+    def update(self, x):
+        if self.value is None:
+            self.value = np.array(x, dtype=float)
+        else:
+            self.value = self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def update_block(self, x):
+        # Se antepone el promedio acumulado como semilla para continuar la recursión de `update`
+        n_rows = len(x)
+        seeded = x if self.value is None else np.vstack([self.value, x])
+        out = pd.DataFrame(seeded).ewm(alpha=self.alpha, adjust=False).mean().to_numpy()[-n_rows:]
+        self.value = out[-1].copy()
+        return out
+
+    def get_state(self):
+        return {'value': np.empty(0) if self.value is None else self.value}
+
+    def set_state(self, state):
+        self.value = None if state['value'].size == 0 else state['value'].copy()
+
+
+class RSINode(IndicatorNode):
+    """RSI a partir de las medias de ganancia/pérdida (equivalente vectorizado de IncrementalRSI)."""
+
+    def __init__(self, key: tuple, n_assets: int):
+        super().__init__(key, n_assets)
+        _, self.period, smoothing = key
+        alpha = rsi_smoothing_alpha(self.period, smoothing)
+        self.inputs = (('ewm', ('gain',), alpha), ('ewm', ('loss',), alpha))
+        self.count = 0
+
+    def warmup(self, input_warmups):
+        return self.period
+
+    def update(self, avg_gain, avg_loss):
+        self.count += 1
+        rsi = np.full(self.n_assets, np.nan)
+        if self.count < self.period:
+            return rsi
+        valid = avg_loss != 0
+        rsi[valid] = 100 - (100 / (1 + avg_gain[valid] / avg_loss[valid]))
+        return rsi
+
+    def update_block(self, avg_gain, avg_loss):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss != 0, 100 - (100 / (1 + avg_gain / avg_loss)), np.nan)
+        warmup_rows = self.period - self.count - 1
+        if warmup_rows > 0:
+            rsi[:warmup_rows] = np.nan
+        self.count += len(rsi)
+        return rsi
+
+    def get_state(self):
+        return {'count': self.count}
+
+    def set_state(self, state):
+        self.count = state['count']
+
+
+class RollingMeanNode(IndicatorNode):
+    """Media móvil simple de otro nodo: ('sma', entrada, n). NaN hasta llenar la ventana."""
+
+    def __init__(self, key: tuple, n_assets: int):
+        super().__init__(key, n_assets)
+        self.inputs = (key[1],)
+        self.length = key[2]
+        self.window = np.full((self.length, n_assets), np.nan)
+
+    def warmup(self, input_warmups):
+        return input_warmups[0] + self.length - 1
+
+    def update(self, x):
+        self.window[:-1] = self.window[1:]
+        self.window[-1] = x
+        return self.window.mean(axis=0)
+
+    def update_block(self, x):
+        n_rows = len(x)
+        extended = np.vstack([self.window[1:], x])
+        out = pd.DataFrame(extended).rolling(self.length).mean().to_numpy()[-n_rows:]
+        self.window = extended[-self.length:].copy()
+        return out
+
+    def get_state(self):
+        return {'window': self.window}
+
+    def set_state(self, state):
+        self.window = state['window'].copy()
+
+
+INDICATOR_NODES = {
+    'delta': DeltaNode, 'gain': MapNode, 'loss': MapNode, 'square': MapNode, 'sub': MapNode, 'affine': MapNode,
+    'std': MapNode, 'ewm': EwmNode, 'rsi': RSINode, 'sma': RollingMeanNode,
+}
+
+
+def _ema_key(source: tuple, span) -> tuple:
+    return ('ewm', source, 2.0 / (int(span) + 1.0))
+
+
+def _macd_keys(fast=12, slow=26, signal=9) -> tuple:
+    macd = ('sub', _ema_key(CLOSE, fast), _ema_key(CLOSE, slow))
+    macd_signal = _ema_key(macd, signal)
+    return macd, macd_signal, ('sub', macd, macd_signal)
+
+
+# Referencias que admiten las señales: nombre(args) -> llave canónica del nodo
+INDICATOR_REFS = {
+    'close': lambda config: CLOSE,
+    'rsi': lambda config, period=None, smoothing=None: (
+        'rsi', int(config.RSI_PERIOD if period is None else period), config.RSI_SMOOTHING if smoothing is None else smoothing),
+    'ema': lambda config, span: _ema_key(CLOSE, span),
+    'sma': lambda config, n=20: ('sma', CLOSE, int(n)),
+    'std': lambda config, n=20: ('std', int(n)),
+    'macd': lambda config, *args: _macd_keys(*args)[0],
+    'macd_signal': lambda config, *args: _macd_keys(*args)[1],
+    'macd_hist': lambda config, *args: _macd_keys(*args)[2],
+    'bb_upper': lambda config, n=20, k=2.0: ('affine', ('sma', CLOSE, int(n)), ('std', int(n)), float(k)),
+    'bb_lower': lambda config, n=20, k=2.0: ('affine', ('sma', CLOSE, int(n)), ('std', int(n)), -float(k)),
+}
+# Valor con el que se evalúa un indicador todavía indefinido (el RSI sin datos cuenta como neutral)
+NEUTRAL_VALUES = {'rsi': 50.0}
+
+
+class IndicatorPipeline:
+    """Calcula una vez por tick cada nodo distinto que piden las señales, vectorizado por activo.
+
+    Solo se instancian los nodos alcanzables desde `requirements`, en orden topológico. Las llaves
+    de `provided` las entrega quien llama en `update` (p. ej. el RSI incremental de cada activo).
+    """
+
+    def __init__(self, n_assets: int, requirements, provided=()):
+        self.n_assets = n_assets
+        self.provided = set(provided)
+        self.nodes = {}
+        self._warmups = {CLOSE: 1}
+        for key in requirements:
+            self._add(key)
+        self.count = 0
+
+    def _add(self, key: tuple):
+        if key in self._warmups:
+            return
+        if key in self.provided:
+            self._warmups[key] = 1
+            return
+        if key[0] not in INDICATOR_NODES:
+            raise ValueError(f"Indicador desconocido: {key!r}")
+        node = INDICATOR_NODES[key[0]](key, self.n_assets)
+        for dependency in node.inputs:
+            self._add(dependency)
+        self._warmups[key] = node.warmup([self._warmups[dependency] for dependency in node.inputs])
+        self.nodes[key] = node
+
+    def warmup(self, keys) -> int:
+        return max((self._warmups[key] for key in keys), default=1)
+
+    def update(self, prices: np.ndarray, provided: dict = None) -> dict:
+        """Incorpora una fila de precios y retorna {llave: array por activo} de todos los nodos."""
+        values = {CLOSE: prices}
+        if provided:
+            values.update(provided)
+        for key, node in self.nodes.items():
+            values[key] = node.update(*[values[dependency] for dependency in node.inputs])
+        self.count += 1
+        return values
+
+    def update_block(self, prices_block: np.ndarray) -> dict:
+        """Incorpora un bloque (ticks x activos) y retorna {llave: bloque} de todos los nodos."""
+        values = {CLOSE: prices_block}
+        if len(prices_block) == 0:
+            return {key: np.empty((0, self.n_assets)) for key in (CLOSE, *self.nodes)}
+        for key, node in self.nodes.items():
+            values[key] = node.update_block(*[values[dependency] for dependency in node.inputs])
+        self.count += len(prices_block)
+        return values
+
+    def load_history(self, history: np.ndarray) -> dict:
+        """Precarga el historial fila por fila y retorna los valores de la última."""
+        values = {}
+        for row in np.asarray(history, dtype=float):
+            values = self.update(row)
+        return values
+
+    def get_state(self) -> dict:
+        return {'count': self.count, 'nodes': {str(i): node.get_state() for i, node in enumerate(self.nodes.values())}}
+
+    def set_state(self, state: dict):
+        self.count = state['count']
+        node_states = state.get('nodes', {})
+        for i, node in enumerate(self.nodes.values()):
+            node.set_state(node_states.get(str(i), {}))
+
+
+class BuySignal:
+    """Señal de compra declarativa sobre el pipeline: 'ref op valor' unidas con & (y) y | (o).
+
+    Las referencias son indicadores de INDICATOR_REFS (`rsi`, `ema(12)`, `bb_lower(20, 2)`...),
+    números o parámetros de la configuración en mayúsculas. & se evalúa antes que |, sin paréntesis.
+    Ej.: 'rsi <= RSI_BUY_THRESHOLD & close < bb_lower(20, 2) | rsi(14) < 10'.
+    """
+
+    OPERATORS = {'<=': np.less_equal, '>=': np.greater_equal, '<': np.less, '>': np.greater}
+    _CONDITION = re.compile(r'^(.+?)\s*(<=|>=|<|>)\s*(.+)$')
+    _REF = re.compile(r'^([a-z_]+)\s*(?:\((.*)\))?$')
+    _PARAM = re.compile(r'^[A-Z][A-Z0-9_]*$')
+
+    def __init__(self, expression: str, config: BotConfiguration = None):
+        config = CONFIG if config is None else config
+        self.expression = expression
+        self.clauses = [[self._parse_condition(condition.strip(), config) for condition in clause.split('&')]
+                        for clause in expression.split('|')]
+        self.requirements = list(dict.fromkeys(
+            term for clause in self.clauses for lhs, _, rhs in clause for term in (lhs, rhs) if isinstance(term, tuple)))
+
+    def _parse_condition(self, text: str, config: BotConfiguration) -> tuple:
+        match = self._CONDITION.match(text)
+        if not match:
+            raise ValueError(f"Condición inválida en BUY_SIGNAL: {text!r} (use 'indicador <= valor')")
+        lhs, operator, rhs = match.groups()
+        return self._parse_term(lhs.strip(), config), operator, self._parse_term(rhs.strip(), config)
+
+    def _parse_term(self, text: str, config: BotConfiguration):
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        if self._PARAM.match(text):
+            if not hasattr(config, text):
+                raise ValueError(f"Parámetro desconocido en BUY_SIGNAL: {text}")
+            return float(getattr(config, text))
+        match = self._REF.match(text)
+        if not match or match.group(1) not in INDICATOR_REFS:
+            raise ValueError(f"Indicador desconocido en BUY_SIGNAL: {text!r} (disponibles: {', '.join(INDICATOR_REFS)})")
+        args = [self._parse_arg(arg.strip()) for arg in (match.group(2) or '').split(',') if arg.strip()]
+        try:
+            return INDICATOR_REFS[match.group(1)](config, *args)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Argumentos inválidos en BUY_SIGNAL: {text!r} ({e})") from None
+
+    @staticmethod
+    def _parse_arg(text: str):
+        for kind in (int, float):
+            try:
+                return kind(text)
+            except ValueError:
+                pass
+        return text
+
+    def is_rsi_threshold(self, config: BotConfiguration) -> bool:
+        """La señal es la regla clásica 'rsi <= RSI_BUY_THRESHOLD' (la que evalúa TradingAsset.run_tick)."""
+        rsi_key = INDICATOR_REFS['rsi'](config)
+        return self.clauses == [[(rsi_key, '<=', float(config.RSI_BUY_THRESHOLD))]]
+
+    @staticmethod
+    def _term_value(term, values: dict):
+        if not isinstance(term, tuple):
+            return term
+        neutral = NEUTRAL_VALUES.get(term[0])
+        if neutral is None:
+            return values[term]
+        # El relleno se guarda en el mismo dict: las demás señales del tick lo reutilizan
+        filled_key = ('neutral', term)
+        filled = values.get(filled_key)
+        if filled is None:
+            value = values[term]
+            filled = values[filled_key] = np.where(np.isnan(value), neutral, value)
+        return filled
+
+    def evaluate(self, values: dict) -> np.ndarray:
+        """Máscara de compra (por activo, o ticks x activos con valores de bloque)."""
+        result = None
+        for clause in self.clauses:
+            clause_mask = None
+            for lhs, operator, rhs in clause:
+                mask = self.OPERATORS[operator](self._term_value(lhs, values), self._term_value(rhs, values))
+                clause_mask = mask if clause_mask is None else clause_mask & mask
+            result = clause_mask if result is None else result | clause_mask
+        return result
+
+
+# -----------------------------------------------------------
+# 🕯️ VELAS OHLC MULTI-TEMPORALIDAD (INCREMENTALES Y ACOTADAS)
+# -----------------------------------------------------------
+TIMEFRAME_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': 86400}
+
+
+class CandleSeries:
+    """Velas OHLC de una temporalidad para todos los activos, en anillos de `window` velas.
+
+    Cada tick actualiza la vela en curso en sitio (O(activos)); al entrar en un intervalo nuevo
+    la vela anterior queda cerrada. Los intervalos sin ticks no generan velas vacías.
+    """
+
+    def __init__(self, seconds: int, n_assets: int, window: int):
+        self.seconds = seconds
+        self.window = window
+        self.open = np.full((window, n_assets), np.nan)
+        self.high = np.full((window, n_assets), np.nan)
+        self.low = np.full((window, n_assets), np.nan)
+        self.close = np.full((window, n_assets), np.nan)
+        self.start = np.full(window, np.nan)  # Inicio (epoch) de cada vela
+        self.count = 0  # Velas creadas, incluida la que está en curso
+        self.bucket = None
+
+    def update(self, prices: np.ndarray, timestamp: float) -> bool:
+        """Incorpora un tick; retorna True si cerró la vela anterior."""
+        bucket = int(timestamp // self.seconds)
+        if self.bucket is not None and bucket <= self.bucket:
+            # Mismo intervalo (o tick atrasado): la vela en curso se actualiza en sitio
+            i = (self.count - 1) % self.window
+            np.maximum(self.high[i], prices, out=self.high[i])
+            np.minimum(self.low[i], prices, out=self.low[i])
+            self.close[i] = prices
+            return False
+
+        closed = self.bucket is not None
+        i = self.count % self.window
+        self.open[i] = self.high[i] = self.low[i] = self.close[i] = prices
+        self.start[i] = bucket * self.seconds
+        self.bucket = bucket
+        self.count += 1
+        return closed
+
+    def last_closed(self) -> np.ndarray:
+        """Cierre de la última vela cerrada (una fila por activo)."""
+        return self.close[(self.count - 2) % self.window]
+
+    def to_frame(self, asset: int, include_current: bool = True) -> pd.DataFrame:
+        """Velas de un activo en orden cronológico (Open/High/Low/Close indexadas por inicio)."""
+        n = min(self.count, self.window)
+        order = (np.arange(self.count - n, self.count) % self.window)
+        if not include_current:
+            order = order[:-1]
+        return pd.DataFrame({'Open': self.open[order, asset], 'High': self.high[order, asset],
+                             'Low': self.low[order, asset], 'Close': self.close[order, asset]},
+                            index=pd.to_datetime(self.start[order], unit='s'))
+
+    def get_state(self) -> dict:
+        return {'open': self.open, 'high': self.high, 'low': self.low, 'close': self.close, 'start': self.start,
+                'count': self.count, 'bucket': -1 if self.bucket is None else self.bucket}
+
+    def set_state(self, state: dict):
+        for field in ('open', 'high', 'low', 'close', 'start'):
+            setattr(self, field, state[field].copy())
+        self.count = state['count']
+        self.bucket = None if state['bucket'] < 0 else state['bucket']
+
+
+class CandleAggregator:
+    """Construye en paralelo las velas de varias temporalidades a partir de los ticks reales."""
+
+    def __init__(self, n_assets: int, timeframes=None, window: int = None):
+        timeframes = CONFIG.CANDLE_TIMEFRAMES if timeframes is None else timeframes
+        window = CONFIG.CANDLE_WINDOW if window is None else window
+        unknown = [tf for tf in timeframes if tf not in TIMEFRAME_SECONDS]
+        if unknown:
+            raise ValueError(f"Temporalidad desconocida: {', '.join(unknown)} (use {', '.join(TIMEFRAME_SECONDS)})")
+        self.series = {tf: CandleSeries(TIMEFRAME_SECONDS[tf], n_assets, window) for tf in timeframes}
+
+    def update(self, prices: np.ndarray, timestamp: float) -> list:
+        """Incorpora un tick en todas las temporalidades; retorna las que cerraron una vela."""
+        return [tf for tf, series in self.series.items() if series.update(prices, timestamp)]
+
+    def get_state(self) -> dict:
+        return {tf: series.get_state() for tf, series in self.series.items()}
+
+    def set_state(self, state: dict):
+        for tf, series in self.series.items():
+            if tf in state:
+                series.set_state(state[tf])
+
+
+# -----------------------------------------------------------
+# ⚡ MOTOR VECTORIZADO DEL PORTAFOLIO (UNA FILA POR ACTIVO)
+# -----------------------------------------------------------
+class VectorizedPortfolioEngine:
+    """Motor alternativo a PortfolioManager: precios, indicadores y balances como arrays alineados.
+
+    La señal de compra es BUY_SIGNAL de la configuración; sus indicadores salen de un IndicatorPipeline
+    propio o del compartido que se pase en `indicators` (MultiPortfolioEngine, barrido). El compartido
+    lo alimenta quien lo comparte, y sus valores llegan en `step`/`run_block`.
+    """
+
+    LOG_COLUMNS = TransactionLedger.LOG_COLUMNS
+
+    def __init__(self, tickers: list, initial_usdc_per_asset: float = None, config: BotConfiguration = None,
+                 indicators: IndicatorPipeline = None):
+        self.config = CONFIG if config is None else config
+        self.tickers = list(tickers)
+        n_assets = len(self.tickers)
+        if initial_usdc_per_asset is None:
+            initial_usdc_per_asset = self.config.INITIAL_USDC_BALANCE / n_assets
+
+        self.initial_usdc_per_asset = initial_usdc_per_asset
+        self.initial_usdc_balance = initial_usdc_per_asset * n_assets
+        self.usdc_balance = np.full(n_assets, initial_usdc_per_asset, dtype=float)
+        self.asset_balance = np.zeros(n_assets)
+        self.buy_price_avg = np.zeros(n_assets)
+        self.total_commissions = np.zeros(n_assets)
+        self.last_prices = np.full(n_assets, np.nan)
+        self.last_values = {}
+        # BRCN solo se monitorea, nunca se compra (igual que TradingAsset.run_tick)
+        self.tradable = np.array([ticker != 'BRCN' for ticker in self.tickers])
+
+        if self.config.SIGNAL_TIMEFRAME != 'tick':
+            raise ValueError("SIGNAL_TIMEFRAME solo aplica al loop en vivo (las filas del motor vectorizado no tienen hora)")
+        self.signal = BuySignal(self.config.BUY_SIGNAL, self.config)
+        self.shared_indicators = indicators is not None
+        self.indicators = IndicatorPipeline(n_assets, self.signal.requirements) if indicators is None else indicators
+        self.warmup = self.indicators.warmup(self.signal.requirements)
+        self.current_tick_index = -1
+        self.ledger = TransactionLedger(self.tickers)
+
+    @classmethod
+    def from_history_map(cls, history_data_map: dict, tickers: list = None, config: BotConfiguration = None):
+        """Construye el motor con el mismo historial inicial que recibe PortfolioManager."""
+        tickers = list(history_data_map) if tickers is None else tickers
+        engine = cls(tickers, config=config)
+        history = np.column_stack([history_closes(history_data_map[ticker]) for ticker in tickers])
+        engine.load_history(history)
+        return engine
+
+    def load_history(self, history: np.ndarray):
+        """Precarga el historial (ticks x activos) sin ejecutar lógica de trading.
+
+        Con un pipeline compartido solo avanza precios y ticks: el historial lo carga su dueño.
+        """
+        if len(history):
+            self.last_prices = np.asarray(history[-1], dtype=float)
+            if not self.shared_indicators:
+                self.last_values = self.indicators.load_history(history)
+        self.current_tick_index += len(history)
+
+    def step(self, prices: np.ndarray, is_real_tick: bool = True, values: dict = None) -> np.ndarray:
+        """Procesa un tick para todos los activos y retorna la máscara de compras ejecutadas.
+
+        Si se pasan `values` (salida de un IndicatorPipeline compartido), se usan en lugar de
+        actualizar el pipeline propio; quien los pasa decide si el tick ya puede operar.
+        """
+        self.current_tick_index += 1
+        self.last_prices = np.asarray(prices, dtype=float)
+        self.last_values = self.indicators.update(self.last_prices) if values is None else values
+
+        if not is_real_tick or (values is None and self.indicators.count < self.warmup):
+            return np.zeros(len(self.tickers), dtype=bool)
+        return self._execute_buys()
+
+    def _execute_buys(self) -> np.ndarray:
+        """Evalúa BUY_SIGNAL sobre last_prices/last_values y aplica las compras."""
+        cfg = self.config
+        executed = np.zeros(len(self.tickers), dtype=bool)
+        buy_signal = self.tradable & (self.usdc_balance > 1) & self.signal.evaluate(self.last_values)
+        idx = np.flatnonzero(buy_signal)
+        if idx.size == 0:
+            return executed
+
+        # Misma aritmética (y orden de operaciones) que run_tick/_simulate_trade/_update_internal_state
+        current_price = self.last_prices[idx]
+        usdc = self.usdc_balance[idx]
+        qty = usdc * cfg.USDC_TO_TRADE_PCT / 10 / current_price
+        exec_price = current_price * (1 + cfg.SLIPPAGE_PCT)
+        cost = exec_price * qty
+        commission = cost * cfg.COMMISSION_PCT
+
+        ok = (qty > 0) & ~(usdc < cost + commission)
+        if not cfg.LIVE_TRADING_ENABLED:
+            ok &= ~(usdc < exec_price * qty * (1 + cfg.COMMISSION_PCT))
+        if not ok.any():
+            return executed
+
+        idx, exec_price, qty, cost, commission = idx[ok], exec_price[ok], qty[ok], cost[ok], commission[ok]
+        total_cost_nuevo = self.buy_price_avg[idx] * self.asset_balance[idx] + cost
+        self.asset_balance[idx] += qty
+        self.usdc_balance[idx] -= (cost + commission)
+        self.buy_price_avg[idx] = total_cost_nuevo / self.asset_balance[idx]
+        self.total_commissions[idx] += commission
+
+        self.ledger.append_many(self.current_tick_index, idx, 'BUY_DCA', self.buy_price_avg[idx], exec_price, qty,
+                                self.usdc_balance[idx], self.asset_balance[idx], commission)
+        executed[idx] = True
+        return executed
+
+    def run_block(self, prices_block: np.ndarray, values_block: dict = None, warmup_rows: int = 0) -> np.ndarray:
+        """Procesa un bloque de ticks reales (ticks x activos) y retorna el valor del portafolio por fila.
+
+        Solo las filas con alguna señal de compra se recorren en Python; entre compras los
+        balances son constantes y el valor se calcula con un producto matricial por segmento.
+        Con `values_block` precomputado, las primeras `warmup_rows` filas no operan.
+        """
+        prices_block = np.asarray(prices_block, dtype=float)
+        n_rows = len(prices_block)
+        values = np.empty(n_rows)
+        if n_rows == 0:
+            return values
+
+        first_tick = self.current_tick_index + 1
+        if values_block is None:
+            warmup_rows = max(0, self.warmup - self.indicators.count - 1)
+            values_block = self.indicators.update_block(prices_block)
+
+        candidates = self.signal.evaluate(values_block) & self.tradable
+        candidates[:warmup_rows] = False
+
+        # Un activo sin USDC (<= 1) ya no puede comprar: las filas candidatas solo se
+        # recalculan cuando cambia el conjunto de activos con fondos.
+        active = self.tradable & (self.usdc_balance > 1)
+        rows = np.flatnonzero((candidates & active).any(axis=1))
+        segment_start = 0
+        i = 0
+        while i < len(rows):
+            row = rows[i]
+            values[segment_start:row] = self.usdc_balance.sum() + prices_block[segment_start:row] @ self.asset_balance
+            self.current_tick_index = first_tick + row
+            self.last_prices = prices_block[row]
+            self.last_values = {key: block[row] for key, block in values_block.items()}
+            self._execute_buys()
+            segment_start = row
+
+            still_active = self.tradable & (self.usdc_balance > 1)
+            if (still_active != active).any():
+                active = still_active
+                rows = row + 1 + np.flatnonzero((candidates[row + 1:] & active).any(axis=1))
+                i = 0
+            else:
+                i += 1
+        values[segment_start:] = self.usdc_balance.sum() + prices_block[segment_start:] @ self.asset_balance
+
+        self.current_tick_index = first_tick + n_rows - 1
+        self.last_prices = prices_block[-1]
+        self.last_values = {key: block[-1] for key, block in values_block.items()}
+        return values
+
+    def get_asset_values(self) -> np.ndarray:
+        return self.usdc_balance + self.asset_balance * self.last_prices
+
+    def portfolio_value(self) -> float:
+        return float(self.get_asset_values().sum())
+
+    def get_accumulated_metrics(self) -> dict:
+        """Equivalente agregado de TradingAsset.get_accumulated_metrics."""
+        return {
+            'total_commissions': float(self.total_commissions.sum()),
+            'final_usdc_balance': float(self.usdc_balance.sum()),
+            'final_asset_balance': float(self.asset_balance.sum()),
+            'total_invested': float((self.initial_usdc_per_asset - self.usdc_balance).sum()),
+        }
+
+    def transaction_log(self) -> pd.DataFrame:
+        """Registro de compras con las mismas columnas que el loop por objeto."""
+        return self.ledger.to_dataframe()
+
+# -----------------------------------------------------------
+# 🧩 MOTOR MULTI-PORTAFOLIO (UN FEED, UN PIPELINE DE INDICADORES)
+# -----------------------------------------------------------
+class MultiPortfolioEngine:
+    """Aloja N portafolios independientes en un proceso sobre un mismo snapshot de precios.
+
+    Un solo IndicatorPipeline calcula la unión de los indicadores que piden las BUY_SIGNAL de
+    todos los portafolios (cada nodo distinto una vez por tick, p. ej. un RSI por RSI_PERIOD);
+    cada portafolio conserva solo sus balances, su ledger y sus métricas.
+    """
+
+    # Parámetros del feed y del universo: iguales para todos los portafolios del proceso
+    SHARED_KEYS = ('ASSETS_TO_TRACK', 'INITIAL_PRICES', 'TICK_INTERVAL_SECONDS', 'DISPLAY_INTERVAL_SECONDS',
+                   'PRICE_STALE_AFTER_SECONDS', 'INITIAL_HISTORY_TICKS')
+
+    def __init__(self, tickers: list, portfolios: dict, config: BotConfiguration = None):
+        base_config = CONFIG if config is None else config
+        self.tickers = list(tickers)
+        configs = {}
+        for name, spec in portfolios.items():
+            if isinstance(spec, BotConfiguration):
+                configs[name] = spec
+                continue
+            shared = [key for key in spec if key.upper() in self.SHARED_KEYS]
+            if shared:
+                raise ValueError(f"El portafolio {name!r} no puede cambiar parámetros del feed: {', '.join(shared)}")
+            configs[name] = copy.copy(base_config)
+            configs[name].apply_overrides(spec)
+
+        requirements = [key for portfolio_config in configs.values()
+                        for key in BuySignal(portfolio_config.BUY_SIGNAL, portfolio_config).requirements]
+        self.indicators = IndicatorPipeline(len(self.tickers), requirements)
+        # Cada motor lee el pipeline compartido (solo lectura): nunca instancia ni actualiza uno propio
+        self.engines = {name: VectorizedPortfolioEngine(self.tickers, config=portfolio_config, indicators=self.indicators)
+                        for name, portfolio_config in configs.items()}
+        self.metrics = {name: StreamingMetrics() for name in configs}
+        self.sim_tick_counter = 0
+        self.visual_tick_counter = 0
+
+    @classmethod
+    def from_history_map(cls, history_data_map: dict, portfolios: dict, tickers: list = None,
+                         config: BotConfiguration = None):
+        """Construye el motor con el mismo historial inicial que recibe PortfolioManager."""
+        tickers = list(history_data_map) if tickers is None else tickers
+        engine = cls(tickers, portfolios, config=config)
+        engine.load_history(np.column_stack([history_closes(history_data_map[ticker]) for ticker in tickers]))
+        return engine
+
+    def load_history(self, history: np.ndarray):
+        """Precarga el historial (ticks x activos) en el pipeline compartido, sin lógica de trading."""
+        history = np.asarray(history, dtype=float)
+        values = self.indicators.load_history(history)
+        for engine in self.engines.values():
+            engine.load_history(history)
+            engine.last_values = values
+
+    def step(self, prices: np.ndarray, is_real_tick: bool = True) -> dict:
+        """Aplica un snapshot (array alineado con `tickers`) a todos los portafolios.
+
+        Retorna {portafolio: máscara de compras ejecutadas}.
+        """
+        prices = np.asarray(prices, dtype=float)
+        self.visual_tick_counter += 1
+        if is_real_tick:
+            self.sim_tick_counter += 1
+        executed = {}
+        values = self.indicators.update(prices)
+        for name, engine in self.engines.items():
+            tradable_tick = is_real_tick and self.indicators.count >= engine.warmup
+            executed[name] = engine.step(prices, tradable_tick, values)
+            if is_real_tick:
+                self.metrics[name].update(engine.portfolio_value())
+        return executed
+
+    def step_snapshot(self, new_prices: dict, is_real_tick: bool = True) -> dict:
+        """Igual que `step`, con el dict ticker -> precio que entrega LiveFetcher."""
+        return self.step(np.fromiter((new_prices[ticker] for ticker in self.tickers), float, len(self.tickers)),
+                         is_real_tick)
+
+    def summary(self) -> pd.DataFrame:
+        """Una fila por portafolio con rendimiento, compras y riesgo."""
+        rows = []
+        for name, engine in self.engines.items():
+            final_value = engine.portfolio_value()
+            accumulated = engine.get_accumulated_metrics()
+            volatility, sharpe_ratio, max_drawdown = self.metrics[name].risk_metrics()
+            rows.append({
+                'Portafolio': name,
+                'RSI_PERIOD': engine.config.RSI_PERIOD,
+                'RSI_BUY_THRESHOLD': engine.config.RSI_BUY_THRESHOLD,
+                'Capital Inicial': engine.initial_usdc_balance,
+                'Valor Final': final_value,
+                'Rendimiento (%)': (final_value / engine.initial_usdc_balance - 1) * 100,
+                'Compras': len(engine.ledger),
+                'Comisiones': accumulated['total_commissions'],
+                'USDC Disponible': accumulated['final_usdc_balance'],
+                'Sharpe Ratio': sharpe_ratio,
+                'Drawdown Máximo (%)': abs(max_drawdown),
+            })
+        return pd.DataFrame(rows)
+
+    def status_lines(self, time_until_next_execution: float) -> list:
+        lines = [
+            f"{Colors.HEADER}="*100 + Colors.ENDC,
+            f"| {Colors.OKBLUE}{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())}{Colors.ENDC} | Ticks Lógica Ejecutada: {self.sim_tick_counter} | Ticks Visuales: {self.visual_tick_counter} | Próximo tick: {max(0.0, time_until_next_execution):.1f}s",
+            f"|  🧩 {Colors.BOLD}BORITRACKER V6.5 - MULTI-PORTAFOLIO{Colors.ENDC} | Portafolios: {len(self.engines)} | Activos: {len(self.tickers)} | Indicadores: {len(self.indicators.nodes)}",
+            f"{Colors.HEADER}="*100 + Colors.ENDC,
+            f"{Colors.BOLD}{'Portafolio':<20} {'RSI':>4} {'Umbral':>7} {'Valor Total':>14} {'Rendimiento':>12} {'Compras':>8} {'USDC Restante':>15}{Colors.ENDC}",
+        ]
+        for name, engine in self.engines.items():
+            value = engine.portfolio_value()
+            return_pct = (value / engine.initial_usdc_balance - 1) * 100
+            color = Colors.OKGREEN if return_pct >= 0 else Colors.FAIL
+            lines.append(f"{name:<20} {engine.config.RSI_PERIOD:>4} {engine.config.RSI_BUY_THRESHOLD:>7} ${value:>13,.2f} "
+                         f"{color}{return_pct:>11,.2f}%{Colors.ENDC} {len(engine.ledger):>8} ${engine.usdc_balance.sum():>14,.2f}")
+        return lines
+
+    def run_trading_loop(self, fetcher: LiveFetcher, renderer: TerminalRenderer = None) -> pd.DataFrame:
+        """Loop en vivo: un fetch por tick para todos los portafolios. Termina con Ctrl+C, SIGTERM o MAX_SIMULATION_TICKS."""
+        renderer = TerminalRenderer(max_fps=CONFIG.RENDER_MAX_FPS) if renderer is None else renderer
+        scheduler = live_loop_scheduler(fetcher)
+        try:
+            while True:
+                events = scheduler.wait()
+                new_prices, is_real_tick, fetch_stage = next_price_frame(events, scheduler, fetcher)
+                if fetch_stage == 'fetch':
+                    renderer.invalidate()
+                if new_prices is not None:
+                    self.step_snapshot(new_prices, is_real_tick)
+                elif 'display' not in events:
+                    continue
+
+                if renderer.frame_due():
+                    renderer.render(self.status_lines(CONFIG.TICK_INTERVAL_SECONDS - (time.time() - fetcher.last_api_call_time)))
+                if CONFIG.MAX_SIMULATION_TICKS and self.sim_tick_counter >= CONFIG.MAX_SIMULATION_TICKS:
+                    print(f"\n\n>>> 🏁 LÍMITE DE TICKS ALCANZADO ({CONFIG.MAX_SIMULATION_TICKS}). Generando reporte final...")
+                    break
+
+        except KeyboardInterrupt:
+            print("\n\n>>> 🛑 SIMULACIÓN DETENIDA: Solicitud de interrupción del usuario (Ctrl+C). Generando reporte final...")
+
+        fetcher.stop_background_feed()
+        return self.summary()
+
+
+def load_portfolio_specs(path: str) -> dict:
+    """Lee {nombre: {PARÁMETRO: valor}} desde .json o .toml (una tabla por portafolio)."""
+    with open(path, 'rb') as f:
+        if path.endswith('.toml'):
+            import tomllib
+            specs = tomllib.load(f)
+        else:
+            specs = json.load(f)
+    if isinstance(specs, list):
+        specs = {spec.pop('name', f"P{i + 1}"): spec for i, spec in enumerate(specs)}
+    if not specs:
+        raise ValueError(f"{path} no define ningún portafolio")
+    return specs
+
+
+def _multi_arguments(parser):
+    # --config es la configuración base común a todos los portafolios
+    parser.add_argument('portfolios', help='Archivo .json o .toml con {nombre: {PARÁMETRO: valor}}')
+    parser.add_argument('--max-ticks', type=int, default=None, help='Terminar tras N ticks de lógica (0 = sin límite)')
+    parser.add_argument('--out', help='Guardar la tabla final por portafolio en CSV')
+
+
+def run_multi_cli(args) -> int:
+    import signal
+    try:
+        specs = load_portfolio_specs(args.portfolios)
+        seed_rngs(CONFIG.RNG_SEED)
+        fetcher = LiveFetcher(CONFIG.ASSETS_TO_TRACK)
+        engine = MultiPortfolioEngine.from_history_map(fetcher.fetch_initial_history(), specs, CONFIG.ASSETS_TO_TRACK)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.FAIL}Configuración inválida:{Colors.ENDC} {e}")
+        return 2
+
+    if CONFIG.PRICE_FEED_BACKGROUND:
+        fetcher.start_background_feed()
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    table = engine.run_trading_loop(fetcher)
+
+    print("\n" + f"{Colors.HEADER}="*60 + Colors.ENDC)
+    print(f"🧩 {Colors.BOLD}REPORTE MULTI-PORTAFOLIO{Colors.ENDC} ({len(table)} portafolios | Ticks de Lógica: {engine.sim_tick_counter})")
+    print(f"{Colors.HEADER}="*60 + Colors.ENDC)
+    print(table.to_string(index=False, float_format="%.4f"))
+    if args.out:
+        table.to_csv(args.out, index=False)
+    return 0
+
+# -----------------------------------------------------------
+# ⏪ BACKTEST SIN PANTALLA (REPRODUCCIÓN DE PRECIOS HISTÓRICOS)
+# -----------------------------------------------------------
+def load_price_history(path: str, tickers: list = None):
+    """Carga una matriz de precios (ticks x activos) desde CSV, Parquet o NPY.
+
+    En CSV/Parquet cada columna numérica es un activo; las columnas de tiempo se ignoran.
+    Un .npy no trae nombres: se usan `tickers` o, si el ancho coincide, CONFIG.ASSETS_TO_TRACK.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        prices = np.load(path, mmap_mode='r')
+        if tickers is None:
+            if prices.shape[1] != len(CONFIG.ASSETS_TO_TRACK):
+                raise ValueError(f"{path} tiene {prices.shape[1]} columnas; indique los tickers explícitamente")
+            tickers = list(CONFIG.ASSETS_TO_TRACK)
+        return list(tickers), prices
+
+    if ext == '.csv':
+        df = pd.read_csv(path)
+    elif ext in ('.parquet', '.pq'):
+        df = pd.read_parquet(path)
+    else:
+        raise ValueError(f"Formato de historial no soportado: {ext!r} (use .csv, .parquet o .npy)")
+
+    df = df.drop(columns=[c for c in df.columns if str(c).lower() in ('timestamp', 'time', 'date', 'datetime', 'tick')])
+    if tickers is None:
+        tickers = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    return list(tickers), df[tickers].to_numpy(dtype=float)
+
+
+def run_backtest(prices: np.ndarray, tickers: list, config: BotConfiguration = None, block_size: int = 65536) -> dict:
+    """Reproduce la serie histórica con la lógica DCA sin pausas ni render.
+
+    Las primeras INITIAL_HISTORY_TICKS filas son el historial inicial (como fetch_initial_history);
+    cada fila restante es un tick de lógica.
+    """
+    config = CONFIG if config is None else config
+    warmup = min(config.INITIAL_HISTORY_TICKS, len(prices))
+    engine = VectorizedPortfolioEngine(tickers, config=config)
+    engine.load_history(np.asarray(prices[:warmup], dtype=float))
+
+    values = np.empty(len(prices))
+    values[:warmup] = engine.initial_usdc_balance
+    for start in range(warmup, len(prices), block_size):
+        stop = min(start + block_size, len(prices))
+        values[start:stop] = engine.run_block(prices[start:stop])
+
+    total_ticks = len(prices) - warmup
+    final_value = engine.portfolio_value()
+    metrics = calculate_session_metrics(final_value, total_ticks, calculate_risk_metrics(pd.Series(values)),
+                                        engine.get_accumulated_metrics(), engine.initial_usdc_balance)
+    return {
+        'engine': engine,
+        'metrics': metrics,
+        'transaction_log': engine.transaction_log(),
+        'portfolio_values': values,
+        'final_value': final_value,
+        'total_ticks': total_ticks,
+    }
+
+
+def print_backtest_report(result: dict, elapsed: float):
+    metrics = dict(result['metrics'])
+    bank_details = metrics.pop("Acumulaciones Bancarias")
+    log_df = result['transaction_log']
+
+    print("\n" + f"{Colors.HEADER}="*60 + Colors.ENDC)
+    print(f"⏪ {Colors.BOLD}REPORTE DE BACKTEST (DCA Pura){Colors.ENDC}")
+    print(f"Ticks de Lógica: {result['total_ticks']:,} | Activos: {len(result['engine'].tickers)} | Tiempo: {elapsed:.2f}s")
+    print(f"{Colors.HEADER}="*60 + Colors.ENDC)
+    for key, value in metrics.items():
+        print(f"{key:<35}: {value:>20}")
+    print(f"{'Comisiones Totales':<35}: {bank_details['Comisiones Totales']:>20,.4f}")
+    print(f"{'USDC Disponible':<35}: {bank_details['USDC Disponible']:>20,.2f}")
+    print("-" * 60)
+    print(f"📜 {Colors.BOLD}Compras registradas:{Colors.ENDC} {len(log_df):,} (Últimas 10)")
+    if not log_df.empty:
+        print(log_df.tail(10).to_string(index=False, float_format="%.4f"))
+    else:
+        print("--- NO HAY COMPRAS REGISTRADAS EN ESTE BACKTEST ---")
+
+
+def _backtest_arguments(parser):
+    parser.add_argument('path', help='Archivo .csv, .parquet o .npy (ticks x activos)')
+    parser.add_argument('--tickers', nargs='+', help='Nombres de columnas/activos (obligatorio para .npy con ancho distinto)')
+    parser.add_argument('--log-out', help='Guardar el registro de transacciones completo (.csv, .parquet o .arrow)')
+
+
+def run_backtest_cli(args) -> int:
+    tickers, prices = load_price_history(args.path, args.tickers)
+    started = time.perf_counter()
+    result = run_backtest(prices, tickers, config=CONFIG)
+    print_backtest_report(result, time.perf_counter() - started)
+    if args.log_out:
+        result['engine'].ledger.export(args.log_out)
+    return 0
+
+
+def _simulate_arguments(parser):
+    parser.add_argument('path', help='Archivo de salida .npy o .csv')
+    parser.add_argument('--ticks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def run_simulate_cli(args) -> int:
+    simulator = MarketSimulator(CONFIG.ASSETS_TO_TRACK, seed=args.seed)
+    started = time.perf_counter()
+    paths = simulator.simulate_paths(args.ticks, [CONFIG.INITIAL_PRICES[t] for t in CONFIG.ASSETS_TO_TRACK])
+    elapsed = time.perf_counter() - started
+    if args.path.endswith('.csv'):
+        pd.DataFrame(paths, columns=CONFIG.ASSETS_TO_TRACK).to_csv(args.path, index=False)
+    else:
+        np.save(args.path, paths)
+    print(f"[{Colors.OKCYAN}SIM{Colors.ENDC}] {paths.size:,} precios sintéticos en {elapsed:.2f}s ({paths.size / elapsed:,.0f} ticks/s) -> {args.path}")
+    return 0
+
+
+# -----------------------------------------------------------
+# 🔬 BARRIDO PARALELO DE PARÁMETROS (RSI / UMBRAL / ASIGNACIÓN)
+# -----------------------------------------------------------
+_SWEEP_PRICES = None
+
+
+def _sweep_worker_init(prices_path: str):
+    """Cada proceso abre la misma matriz como mmap de solo lectura (sin pickle de precios)."""
+    global _SWEEP_PRICES
+    _SWEEP_PRICES = np.load(prices_path, mmap_mode='r')
+
+
+def _sweep_indicator_worker(task) -> str:
+    """Una sola pasada del pipeline por RSI_PERIOD: vuelca los indicadores de todas las filas a un .npy."""
+    keys, warmup, tickers, block_size, values_path = task
+    prices = _SWEEP_PRICES
+    pipeline = IndicatorPipeline(len(tickers), keys)
+    out = np.lib.format.open_memmap(values_path, mode='w+', dtype=float, shape=(len(keys), *prices.shape))
+    # Mismos cortes de bloque que el backtest (historial y luego bloques de block_size)
+    bounds = [0, warmup] + list(range(warmup + block_size, len(prices), block_size)) + [len(prices)]
+    for start, stop in zip(bounds, bounds[1:]):
+        if stop > start:
+            values_block = pipeline.update_block(np.asarray(prices[start:stop], dtype=float))
+            for i, key in enumerate(keys):
+                out[i, start:stop] = values_block[key]
+    out.flush()
+    return values_path
+
+
+def _sweep_worker(task) -> list:
+    """Evalúa un grupo de combinaciones de un RSI_PERIOD sobre los indicadores ya calculados."""
+    period, combos, keys, tickers, block_size, base_config, values_path = task
+    prices = _SWEEP_PRICES
+    indicator_values = np.load(values_path, mmap_mode='r')
+    # La configuración llega en la tarea: con spawn/forkserver el CONFIG global del proceso
+    # hijo se re-importa con los valores por defecto (sin --config/--set/entorno)
+    base_config = copy.copy(base_config)
+    base_config.RSI_PERIOD = period
+    warmup = min(base_config.INITIAL_HISTORY_TICKS, len(prices))
+    history = np.asarray(prices[:warmup], dtype=float)
+
+    # El pipeline solo define llaves y calentamientos: nunca se actualiza en este proceso
+    shared = IndicatorPipeline(len(tickers), keys)
+    engines = []
+    for threshold, trade_pct in combos:
+        config = copy.copy(base_config)
+        config.RSI_BUY_THRESHOLD = threshold
+        config.USDC_TO_TRADE_PCT = trade_pct
+        engine = VectorizedPortfolioEngine(tickers, config=config, indicators=shared)
+        engine.load_history(history)
+        engines.append(engine)
+    values = [np.full(len(prices), engine.initial_usdc_balance) for engine in engines]
+
+    for start in range(warmup, len(prices), block_size):
+        stop = min(start + block_size, len(prices))
+        prices_block = np.asarray(prices[start:stop], dtype=float)
+        values_block = {CLOSE: prices_block}
+        for i, key in enumerate(keys):
+            values_block[key] = np.asarray(indicator_values[i, start:stop])
+        for engine, engine_values in zip(engines, values):
+            warmup_rows = max(0, engine.warmup - start - 1)
+            engine_values[start:stop] = engine.run_block(prices_block, values_block, warmup_rows)
+
+    rows = []
+    for (threshold, trade_pct), engine, engine_values in zip(combos, engines, values):
+        final_value = engine.portfolio_value()
+        volatility, sharpe_ratio, max_drawdown = calculate_risk_metrics(pd.Series(engine_values))
+        rows.append({
+            'RSI_PERIOD': period,
+            'RSI_BUY_THRESHOLD': threshold,
+            'USDC_TO_TRADE_PCT': trade_pct,
+            'Rendimiento (%)': (final_value / engine.initial_usdc_balance - 1) * 100,
+            'Sharpe Ratio': sharpe_ratio,
+            'Drawdown Máximo (%)': abs(max_drawdown),
+            'Volatilidad Anualizada (%)': volatility * 100,
+            'Compras': len(engine.ledger),
+        })
+    return rows
+
+
+def run_parameter_sweep(prices: np.ndarray, tickers: list, grid: dict, workers: int = None,
+                        block_size: int = 65536, sort_by: str = 'Sharpe Ratio',
+                        config: BotConfiguration = None) -> pd.DataFrame:
+    """Evalúa cada combinación del grid sobre el mismo historial usando un pool de procesos.
+
+    `grid` admite las llaves RSI_PERIOD, RSI_BUY_THRESHOLD y USDC_TO_TRADE_PCT (listas de valores;
+    las que falten toman el valor de `config`, por defecto CONFIG). Primero se calcula el pipeline
+    de indicadores una sola vez por RSI_PERIOD (un período por proceso) y se guarda en un .npy
+    mapeado; después las combinaciones de umbral/asignación se reparten entre todos los procesos
+    leyendo esos mismos valores.
+    """
+    config = CONFIG if config is None else config
+    periods = grid.get('RSI_PERIOD', [config.RSI_PERIOD])
+    thresholds = grid.get('RSI_BUY_THRESHOLD', [config.RSI_BUY_THRESHOLD])
+    trade_pcts = grid.get('USDC_TO_TRADE_PCT', [config.USDC_TO_TRADE_PCT])
+    combos = [(threshold, trade_pct) for threshold in thresholds for trade_pct in trade_pcts]
+    workers = workers or os.cpu_count() or 1
+    warmup = min(config.INITIAL_HISTORY_TICKS, len(prices))
+
+    # Las llaves del pipeline solo dependen del período (y de BUY_SIGNAL), no del umbral
+    period_keys = {}
+    for period in periods:
+        period_config = copy.copy(config)
+        period_config.RSI_PERIOD = period
+        period_keys[period] = [key for key in BuySignal(period_config.BUY_SIGNAL, period_config).requirements
+                               if key != CLOSE]
+
+    splits = max(1, min(len(combos), -(-workers // len(periods))))
+    chunk = -(-len(combos) // splits)
+
+    # Los precios se comparten como .npy mapeado en memoria: si ya vienen de un mmap se usa
+    # el mismo archivo, si no se vuelca una vez a un temporal.
+    temp_dir = tempfile.mkdtemp(prefix='bori-sweep-')
+    if isinstance(prices, np.memmap) and prices.filename and prices.filename.endswith('.npy'):
+        prices_path = prices.filename
+    else:
+        prices_path = os.path.join(temp_dir, 'prices.npy')
+        np.save(prices_path, np.ascontiguousarray(prices, dtype=float))
+
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        indicator_tasks = [(period_keys[period], warmup, list(tickers), block_size,
+                            os.path.join(temp_dir, f'indicators-{i}.npy')) for i, period in enumerate(periods)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(periods) * -(-len(combos) // chunk)), initializer=_sweep_worker_init,
+                                 initargs=(prices_path,)) as pool:
+            values_paths = dict(zip(periods, pool.map(_sweep_indicator_worker, indicator_tasks)))
+            tasks = [(period, combos[i:i + chunk], period_keys[period], list(tickers), block_size, config,
+                      values_paths[period]) for period in periods for i in range(0, len(combos), chunk)]
+            rows = [row for task_rows in pool.map(_sweep_worker, tasks) for row in task_rows]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    table = pd.DataFrame(rows).sort_values(sort_by, ascending=False, na_position='last')
+    return table.reset_index(drop=True)
+
+
+def _sweep_arguments(parser):
+    # Los ejes que no se barren toman el valor de la configuración resuelta
+    parser.add_argument('path', help='Archivo .csv, .parquet o .npy (ticks x activos)')
+    parser.add_argument('--tickers', nargs='+', help='Nombres de columnas/activos (obligatorio para .npy con ancho distinto)')
+    parser.add_argument('--rsi-period', nargs='+', type=int, default=None, help='Por defecto RSI_PERIOD')
+    parser.add_argument('--threshold', nargs='+', type=float, default=None, help='Por defecto RSI_BUY_THRESHOLD')
+    parser.add_argument('--trade-pct', nargs='+', type=float, default=None, help='Por defecto USDC_TO_TRADE_PCT')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sort-by', default='Sharpe Ratio')
+    parser.add_argument('--out', help='Guardar la tabla completa en CSV')
+
+
+def run_sweep_cli(args) -> int:
+    tickers, prices = load_price_history(args.path, args.tickers)
+    grid = {name: values for name, values in (('RSI_PERIOD', args.rsi_period), ('RSI_BUY_THRESHOLD', args.threshold),
+                                              ('USDC_TO_TRADE_PCT', args.trade_pct)) if values is not None}
+    started = time.perf_counter()
+    table = run_parameter_sweep(prices, tickers, grid, workers=args.workers, sort_by=args.sort_by, config=CONFIG)
+    elapsed = time.perf_counter() - started
+
+    print("\n" + f"{Colors.HEADER}="*60 + Colors.ENDC)
+    print(f"🔬 {Colors.BOLD}RANKING DEL BARRIDO DE PARÁMETROS{Colors.ENDC} ({len(table)} combinaciones en {elapsed:.2f}s)")
+    print(f"{Colors.HEADER}="*60 + Colors.ENDC)
+    print(table.to_string(index=False, float_format="%.4f"))
+    if args.out:
+        table.to_csv(args.out, index=False)
+    return 0
+
+# -----------------------------------------------------------
+# 💾 CHECKPOINTS ATÓMICOS Y REANUDACIÓN DE LA SESIÓN
+# -----------------------------------------------------------
+CHECKPOINT_VERSION = 1
+
+
+def _flatten_state(state: dict, prefix: str, arrays: dict, meta: dict):
+    """Separa un estado anidado en arrays (miembros del .npz) y escalares/listas (JSON), con llaves 'a/b/c'."""
+    for key, value in state.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            _flatten_state(value, name + '/', arrays, meta)
+        elif isinstance(value, np.ndarray):
+            arrays[name] = value
+        else:
+            meta[name] = value
+    return arrays, meta
+
+
+def _unflatten_state(arrays: dict, meta: dict) -> dict:
+    state = {}
+    for name, value in list(meta.items()) + list(arrays.items()):
+        node = state
+        *parents, leaf = name.split('/')
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return state
+
+
+def write_checkpoint(path: str, state: dict):
+    """Escribe `state` como .npz sin compresión de forma atómica (temporal + fsync + os.replace).
+
+    Un corte a mitad de escritura deja intacto el checkpoint anterior.
+    """
+    arrays, meta = _flatten_state(state, '', {}, {})
+    meta['version'] = CHECKPOINT_VERSION
+    arrays['__meta__'] = np.frombuffer(json.dumps(meta, default=lambda value: value.item()).encode(), dtype=np.uint8)
+    fd, tmp_path = tempfile.mkstemp(prefix='.checkpoint-', suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_checkpoint(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    meta = json.loads(arrays.pop('__meta__').tobytes())
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: versión de checkpoint no soportada ({meta.get('version')})")
+    return _unflatten_state(arrays, meta)
+
+
+class CheckpointWriter:
+    """Serializa y escribe checkpoints en un hilo de fondo; el loop solo entrega el estado capturado.
+
+    Si llega un estado nuevo antes de escribir el anterior, se escribe solo el más reciente.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.written = 0
+        self.last_error = None
+        self.last_write_seconds = None
+        self._pending = None
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, state: dict):
+        with self._cond:
+            self._pending = state
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closing:
+                    self._cond.wait()
+                state, self._pending = self._pending, None
+            if state is None:
+                return
+            started = time.perf_counter()
+            try:
+                write_checkpoint(self.path, state)
+                self.written += 1
+                self.last_write_seconds = time.perf_counter() - started
+            except Exception as e:
+                # Disco lleno, estado no serializable (ValueError de np.savez)...: el hilo sigue vivo
+                # y el próximo checkpoint se vuelve a intentar
+                self.last_error = e
+                print(f"{Colors.FAIL}No se pudo escribir el checkpoint {self.path}:{Colors.ENDC} {type(e).__name__}: {e}")
+
+    def close(self, timeout: float = 10.0):
+        """Escribe lo pendiente y detiene el hilo."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+# -----------------------------------------------------------
+# 📼 DIARIO DE SESIÓN (GRABACIÓN BINARIA Y REPRODUCCIÓN)
+# -----------------------------------------------------------
+def seed_rngs(seed: int = None) -> int:
+    """Siembra `random` y `np.random` (si seed es None se genera uno) y retorna la semilla usada."""
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), 'little')
+    random.seed(seed)
+    np.random.seed(seed)
+    return seed
+
+
+class SessionJournal:
+    """Diario binario de solo-agregado: snapshots de precios, límites de tick, semilla y compras.
+
+    Formato: cabecera mágica y luego registros `<BI` (tipo, largo) + payload. Un archivo es
+    una sola sesión: abrir un `path` existente lo reemplaza.
+    """
+
+    MAGIC = b'BORIJNL1'
+    RECORD = struct.Struct('<BI')
+    FRAME = struct.Struct('<?Qdd')       # tick real, tick visual, time.time(), índice de mercado
+    FILL = struct.Struct('<IQdddddd')    # activo, tick, precio ejec., qty, comisión, avg, USDC, total activo
+    SHAPE = struct.Struct('<II')
+
+    HEADER, HISTORY, FRAME_TYPE, FILL_TYPE, CHECKPOINT = 1, 2, 3, 4, 5
+
+    def __init__(self, path: str, tickers: list):
+        self.path = path
+        self.tickers = list(tickers)
+        self.ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        # 'wb': agregar una segunda sesión haría que replay mezcle dos HEADER/HISTORY en una
+        self._file = open(path, 'wb', buffering=1 << 16)
+        self._file.write(self.MAGIC)
+
+    def _write(self, record_type: int, payload: bytes):
+        self._file.write(self.RECORD.pack(record_type, len(payload)))
+        self._file.write(payload)
+
+    def write_header(self, seed: int):
+        meta = {
+            'seed': seed,
+            'tickers': self.tickers,
+            'config': {key: getattr(CONFIG, key) for key in (
+                'INITIAL_USDC_BALANCE', 'COMMISSION_PCT', 'SLIPPAGE_PCT', 'RSI_PERIOD', 'RSI_SMOOTHING',
+                'RSI_BUY_THRESHOLD', 'BUY_SIGNAL', 'SIGNAL_TIMEFRAME', 'CANDLE_TIMEFRAMES', 'USDC_TO_TRADE_PCT',
+                'TICK_INTERVAL_SECONDS', 'DISPLAY_INTERVAL_SECONDS', 'PRICE_WINDOW_SIZE', 'LIVE_TRADING_ENABLED')},
+        }
+        self._write(self.HEADER, json.dumps(meta).encode())
+
+    def write_history(self, history_data_map: dict):
+        history = np.column_stack([history_closes(history_data_map[ticker]) for ticker in self.tickers])
+        self._write(self.HISTORY, self.SHAPE.pack(*history.shape) + history.tobytes())
+
+    def write_checkpoint(self, checkpoint: bytes):
+        """Checkpoint (.npz tal cual) desde el que arrancó una sesión reanudada."""
+        self._write(self.CHECKPOINT, checkpoint)
+
+    def write_frame(self, is_real_tick: bool, visual_tick: int, prices: dict, market_index_value: float,
+                    timestamp: float = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        payload = self.FRAME.pack(is_real_tick, visual_tick, timestamp, market_index_value)
+        self._write(self.FRAME_TYPE, payload + np.fromiter((prices[t] for t in self.tickers), float, len(self.tickers)).tobytes())
+        if is_real_tick:
+            self._file.flush()
+
+    def write_fill(self, ticker: str, tick: int, exec_price: float, qty: float, commission: float,
+                   avg_price: float, usdc_remaining: float, asset_total: float):
+        self._write(self.FILL_TYPE, self.FILL.pack(self.ticker_index[ticker], tick, exec_price, qty, commission,
+                                                   avg_price, usdc_remaining, asset_total))
+
+    def close(self):
+        self._file.close()
+
+    @classmethod
+    def read(cls, path: str):
+        """Itera (tipo, datos) sobre los registros de un diario."""
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} no es un diario de sesión de BoriTracker")
+            n_assets = 0
+            while True:
+                head = f.read(cls.RECORD.size)
+                if len(head) < cls.RECORD.size:
+                    return
+                record_type, length = cls.RECORD.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return  # Registro truncado (proceso interrumpido a mitad de escritura)
+
+                if record_type == cls.HEADER:
+                    meta = json.loads(payload)
+                    n_assets = len(meta['tickers'])
+                    yield record_type, meta
+                elif record_type == cls.HISTORY:
+                    rows, cols = cls.SHAPE.unpack_from(payload)
+                    yield record_type, np.frombuffer(payload, float, rows * cols, cls.SHAPE.size).reshape(rows, cols)
+                elif record_type == cls.FRAME_TYPE:
+                    is_real_tick, visual_tick, timestamp, market_index_value = cls.FRAME.unpack_from(payload)
+                    prices = np.frombuffer(payload, float, n_assets, cls.FRAME.size)
+                    yield record_type, (is_real_tick, visual_tick, timestamp, market_index_value, prices)
+                elif record_type == cls.FILL_TYPE:
+                    yield record_type, cls.FILL.unpack(payload)
+                elif record_type == cls.CHECKPOINT:
+                    yield record_type, payload
+
+
+def replay_journal(path: str):
+    """Reproduce un diario a máxima velocidad a través de PortfolioManager.
+
+    Retorna (manager, compras grabadas, compras reproducidas) para verificar el estado final.
+    """
+    manager = None
+    recorded_fills = []
+    first_fill = 0
+    for record_type, data in SessionJournal.read(path):
+        if record_type == SessionJournal.HEADER and manager is not None:
+            break  # Diarios viejos (abiertos en modo agregado) pueden traer otra sesión detrás
+        if record_type == SessionJournal.HEADER:
+            for key, value in data['config'].items():
+                setattr(CONFIG, key, value)
+            tickers = data['tickers']
+            CONFIG.set_assets(tickers)
+            # La reproducción no debe escribir sobre el registro volcado por la sesión original
+            CONFIG.LEDGER_PATH = None
+            seed_rngs(data['seed'])
+        elif record_type == SessionJournal.HISTORY:
+            history_data_map = {ticker: {'Close': data[:, i]} for i, ticker in enumerate(tickers)}
+            fetcher = LiveFetcher(tickers)
+            manager = PortfolioManager(history_data_map, fetcher)
+        elif record_type == SessionJournal.CHECKPOINT:
+            # Sesión reanudada: parte del mismo estado que restauró la sesión original
+            manager.restore_state(read_checkpoint(io.BytesIO(data)))
+            first_fill = len(manager.ledger)  # Las compras del checkpoint no están grabadas en este diario
+        elif record_type == SessionJournal.FRAME_TYPE:
+            is_real_tick, _, timestamp, market_index_value, prices = data
+            fetcher.previous_prices = fetcher.current_prices
+            fetcher.current_prices = dict(zip(tickers, prices.tolist()))
+            fetcher.market_index_history.append(market_index_value)
+            manager._process_frame(fetcher.current_prices, is_real_tick, timestamp)
+        elif record_type == SessionJournal.FILL_TYPE:
+            asset_idx, tick, exec_price, qty, commission, avg_price, usdc_remaining, asset_total = data
+            recorded_fills.append((tickers[asset_idx], tick, exec_price, qty, commission, avg_price, usdc_remaining, asset_total))
+
+    if manager is None:
+        raise ValueError(f"{path} no contiene historial inicial")
+    log = manager.ledger.to_dataframe(first_fill)
+    replayed_fills = list(zip(
+        log['Asset'], log['Tick'].tolist(), log['Exec_Price'].tolist(), log['Qty_Bought'].tolist(),
+        log['Commission'].tolist(), log['Avg_Entry_Price'].tolist(), log['USDC_Remaining'].tolist(),
+        log['Asset_Total'].tolist(),
+    ))
+    return manager, recorded_fills, replayed_fills
+
+
+def _replay_arguments(parser):
+    parser.add_argument('path', help='Diario binario grabado con JOURNAL_PATH')
+
+
+def run_replay_cli(args) -> int:
+    started = time.perf_counter()
+    manager, recorded_fills, replayed_fills = replay_journal(args.path)
+    elapsed = time.perf_counter() - started
+    log_df, total_ticks, final_value = manager._finalize_session()
+    metrics = manager._calculate_metrics(final_value, total_ticks)
+    metrics.pop("Acumulaciones Bancarias")
+
+    same_fills = sorted(recorded_fills) == sorted(replayed_fills)
+    status = f"{Colors.OKGREEN}IDÉNTICO{Colors.ENDC}" if same_fills else f"{Colors.FAIL}DIFERENTE{Colors.ENDC}"
+    print("\n" + f"{Colors.HEADER}="*60 + Colors.ENDC)
+    print(f"📼 {Colors.BOLD}REPRODUCCIÓN DE SESIÓN{Colors.ENDC} | Ticks Visuales: {manager.visual_tick_counter:,} | Tiempo: {elapsed:.2f}s")
+    print(f"{Colors.HEADER}="*60 + Colors.ENDC)
+    for key, value in metrics.items():
+        print(f"{key:<35}: {value:>20}")
+    print(f"Compras grabadas / reproducidas: {len(recorded_fills)} / {len(replayed_fills)} -> {status}")
+    return 0 if same_fills else 1
+
+# -----------------------------------------------------------
+# 🧪 SERVIDOR LOCAL DE PRUEBA (STAND-IN DE COINGECKO)
+# -----------------------------------------------------------
+def synthetic_coin_id(ticker: str) -> str:
+    """Id de CoinGecko de los activos sintéticos (SYN0030 -> syn0030-token)."""
+    return CONFIG.COINGECKO_IDS.get(ticker, f"{ticker.lower()}-token")
+
+
+def load_recorded_payloads(path: str = None, n_assets: int = None) -> list:
+    """Carga respuestas grabadas de simple/price (lista, respuesta única o snapshot de CoinGeckoCache).
+
+    Sin archivo se sintetiza una respuesta con todos los ids de CONFIG (o `n_assets` activos,
+    completando con activos sintéticos).
+    """
+    if not path:
+        rng = random.Random(CONFIG.RNG_SEED)
+        if n_assets:
+            coin_ids = [synthetic_coin_id(ticker) for ticker in _bench_tickers(n_assets) if ticker != 'BRCN']
+        else:
+            coin_ids = list(CONFIG.COINGECKO_IDS.values())
+        return [{coin_id: {'usd': rng.uniform(0.5, 500.0)} for coin_id in coin_ids}]
+    with open(path) as f:
+        stored = json.load(f)
+    if isinstance(stored, list):
+        return stored
+    if 'entries' in stored:
+        return [entry['data'] for key, entry in stored['entries'].items() if '/simple/price' in key]
+    return [stored]
+
+
+class CoinGeckoStandIn:
+    """Servidor HTTP local que imita simple/price y coins/list con latencia y tasa de errores configurables."""
+
+    def __init__(self, payloads: list = None, latency: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_share: float = 0.5, host: str = '127.0.0.1', port: int = 0, seed: int = None):
+        from http.server import ThreadingHTTPServer
+        self.payloads = payloads or load_recorded_payloads()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share  # Fracción de los errores que son HTTP 429
+        self.requests_served = 0
+        self.errors_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/v3"
+
+    def _next_payload(self) -> dict:
+        with self._lock:
+            payload = self.payloads[self.requests_served % len(self.payloads)]
+            self.requests_served += 1
+            failed = self._rng.random() < self.error_rate
+            rate_limited = failed and self._rng.random() < self.rate_limit_share
+            if failed:
+                self.errors_served += 1
+        return payload, failed, rate_limited
+
+    def coins_list(self) -> list:
+        """Volcado estilo /coins/list con los ids que conoce el servidor."""
+        symbols = {coin_id: ticker.lower() for ticker, coin_id in CONFIG.COINGECKO_IDS.items()}
+        coin_ids = dict.fromkeys(coin_id for payload in self.payloads for coin_id in payload)
+        return [{'id': coin_id, 'symbol': symbols.get(coin_id, coin_id.split('-')[0]), 'name': coin_id.replace('-', ' ').title()}
+                for coin_id in coin_ids]
+
+    def _make_handler(self):
+        from http.server import BaseHTTPRequestHandler
+        from urllib.parse import urlparse, parse_qs
+        import hashlib
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, como la API real
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.endswith('/coins/list'):
+                    return self._send(200, json.dumps(stand_in.coins_list()).encode())
+                if not url.path.endswith('/simple/price'):
+                    return self._send(404, b'{"error":"not found"}')
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+
+                payload, failed, rate_limited = stand_in._next_payload()
+                if rate_limited:
+                    return self._send(429, b'{"status":{"error_code":429}}', {'Retry-After': '1'})
+                if failed:
+                    return self._send(500, b'{"error":"stand-in failure"}')
+
+                ids = parse_qs(url.query).get('ids', [''])[0].split(',')
+                body = json.dumps({coin_id: payload[coin_id] for coin_id in ids if coin_id in payload}).encode()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    return self._send(304, b'', {'ETag': etag})
+                self._send(200, body, {'ETag': etag})
+
+            def _send(self, status: int, body: bytes, headers: dict = None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='coingecko-stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def benchmark_fetch_path(base_url: str, n_requests: int = 200, cache_ttl: float = 0.0, n_assets: int = None) -> dict:
+    """Mide throughput y latencia del camino de consulta (índice de ids + plan por lotes + caché) contra `base_url`.
+
+    Sin límite de consultas por minuto: el servidor es local y se mide el camino, no el presupuesto.
+    """
+    tickers = _bench_tickers(n_assets) if n_assets else CONFIG.ASSETS_TO_TRACK
+    ticker_to_id = resolve_coingecko_ids(tickers, index=CoinIdIndex(path='', base_url=base_url))
+    cache = CoinGeckoCache(ttl=cache_ttl, path='')
+    planner = FetchPlanner(f"{base_url}/simple/price", cache, budget=RequestBudget(per_minute=1e9, burst=1e6))
+    feed = BackgroundPriceFeed(f"{base_url}/simple/price", list(ticker_to_id.values()),
+                               {v: k for k, v in ticker_to_id.items()}, cache=cache, planner=planner)
+    latencies, errors, prices = [], 0, {}
+    started = time.perf_counter()
+    for _ in range(n_requests):
+        t0 = time.perf_counter()
+        try:
+            prices = feed.fetch_once()
+        except requests.exceptions.RequestException:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    planner.close()
+    cache.close()
+    return {
+        'assets': len(tickers),
+        'resolved_ids': len(ticker_to_id),
+        'prices_per_refresh': len(prices),
+        'batches_per_refresh': len(planner.plan(feed.api_ids)),
+        'failed_batches': planner.failed_batches,
+        'refreshes': n_requests,
+        'errors': errors,
+        'refreshes_per_second': n_requests / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'cache_hits': cache.hits,
+        'revalidated_304': cache.revalidated,
+    }
+
+
+def _standin_arguments(parser):
+    parser.add_argument('--payloads', help='JSON con respuestas grabadas (o el snapshot de la caché)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Latencia por respuesta en segundos')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probabilidad de responder 429/500')
+    parser.add_argument('--assets', type=int, default=None, help='Sintetizar N activos (completa con activos sintéticos)')
+    parser.add_argument('--bench', type=int, default=0, help='Medir N refrescos completos contra el servidor y salir')
+
+
+def run_standin_cli(args) -> int:
+    stand_in = CoinGeckoStandIn(load_recorded_payloads(args.payloads, args.assets), latency=args.latency,
+                                error_rate=args.error_rate, port=args.port).start()
+    if args.bench:
+        print(json.dumps(benchmark_fetch_path(stand_in.base_url, args.bench, n_assets=args.assets), indent=2))
+        stand_in.stop()
+        return 0
+
+    print(f"[{Colors.OKCYAN}STAND-IN{Colors.ENDC}] Sirviendo en {stand_in.base_url} (export BORI_COINGECKO_API_URL={stand_in.base_url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stand_in.stop()
+    return 0
+
+def load_recorded_ticks(path: str = None, n_assets: int = None, n_ticks: int = 4096, seed: int = None):
+    """Ticks a reproducir por el stand-in WebSocket: (tickers, matriz ticks x activos).
+
+    Con `path` se usa load_price_history (CSV, Parquet o NPY); sin archivo se simulan trayectorias
+    correlacionadas para los activos de CONFIG (o `n_assets`, completando con activos sintéticos).
+    """
+    if path:
+        return load_price_history(path)
+    tickers = [t for t in (_bench_tickers(n_assets) if n_assets else CONFIG.ASSETS_TO_TRACK) if t != 'BRCN']
+    rng = random.Random(CONFIG.RNG_SEED if seed is None else seed)
+    start_prices = [CONFIG.INITIAL_PRICES.get(ticker) or rng.uniform(0.5, 500.0) for ticker in tickers]
+    simulator = MarketSimulator(tickers, seed=rng.randrange(2**31))
+    return tickers, simulator.simulate_paths(n_ticks, start_prices)
+
+
+class TickerStandIn:
+    """Servidor WebSocket local que reproduce ticks grabados como el canal `ticker` de Coinbase.
+
+    Emite `rate` mensajes por segundo en total (cada fila de `prices` es un mensaje por activo
+    suscrito, en ciclo) agrupados en frames de hasta `batch` mensajes; rate <= 0 emite tan rápido
+    como el cliente consuma. Cada mensaje lleva `ts` (epoch) para medir el retraso de ingesta.
+    """
+
+    def __init__(self, tickers: list, prices: np.ndarray, rate: float = 1000.0, batch: int = 1,
+                 host: str = '127.0.0.1', port: int = 0, quote: str = None):
+        self.tickers = list(tickers)
+        self.prices = np.asarray(prices, dtype=float)
+        self.rate = rate
+        self.batch = max(1, batch)
+        self.host = host
+        self.port = port
+        self.quote = CONFIG.WS_QUOTE_CURRENCY if quote is None else quote
+        self.messages_sent = 0
+        self.frames_sent = 0
+        self._ready = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._stopped = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='ticker-stand-in', daemon=True)
+        self._thread.start()
+        self._ready.wait(WEBSOCKET_OPEN_TIMEOUT_SECONDS)
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set_result, None)
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    def _run(self):
+        import asyncio
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._loop.close()
+
+    async def _serve(self):
+        import websockets
+        self._stopped = self._loop.create_future()
+        async with websockets.serve(self._handler, self.host, self.port, max_size=None) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stopped
+
+    def _messages(self, columns: list):
+        """Genera los mensajes de los activos suscritos fila por fila, en ciclo sobre la grabación."""
+        prefixes = [f'{{"type":"ticker","product_id":"{self.tickers[col]}-{self.quote}","price":"' for col in columns]
+        while True:
+            for row in self.prices[:, columns].tolist():
+                for prefix, price in zip(prefixes, row):
+                    yield prefix, price
+
+    async def _handler(self, ws):
+        import asyncio
+        import websockets
+        subscribe = json.loads(await ws.recv())
+        wanted = set(subscribe.get('product_ids', ()))
+        columns = [col for col, ticker in enumerate(self.tickers) if f"{ticker}-{self.quote}" in wanted]
+        await ws.send(json.dumps({'type': 'subscriptions', 'channels': [
+            {'name': 'ticker', 'product_ids': [f"{self.tickers[col]}-{self.quote}" for col in columns]}]}))
+        if not columns:
+            return
+        stream = self._messages(columns)
+        loop = asyncio.get_running_loop()
+        started, sent = loop.time(), 0
+        try:
+            while True:
+                # Se envía lo que corresponde al reloj (ritmo exacto aunque el sleep sea grueso)
+                due = self.batch * 64 if self.rate <= 0 else int((loop.time() - started) * self.rate) - sent
+                while due > 0:
+                    size = min(self.batch, due)
+                    ts = time.time()
+                    chunk = [f'{prefix}{price:.10g}","ts":{ts:.6f}}}' for prefix, price in
+                             (next(stream) for _ in range(size))]
+                    await ws.send(chunk[0] if self.batch == 1 else '[' + ','.join(chunk) + ']')
+                    sent += size
+                    due -= size
+                    self.messages_sent += size
+                    self.frames_sent += 1
+                await asyncio.sleep(0.001 if self.rate > 0 else 0)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+
+def benchmark_stream_ingest(url: str, tickers: list, seconds: float = 5.0, publish_interval: float = None) -> dict:
+    """Conecta un WebSocketPriceFeed a `url` durante `seconds` y mide ingesta, coalescencia y retraso."""
+    feed = WebSocketPriceFeed(url, tickers, publish_interval=publish_interval).start()
+    if not feed.connected.wait(WEBSOCKET_OPEN_TIMEOUT_SECONDS):
+        feed.stop()
+        raise RuntimeError(f"No se pudo conectar a {url}: {feed.last_error}")
+    started_cpu = time.process_time()
+    started, received = time.perf_counter(), feed.messages_received
+    time.sleep(seconds)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - started_cpu
+    stats = feed.stats()
+    feed.stop()
+    lag = stats.pop('lag')
+    stats.update({
+        'assets': len(feed.product_to_ticker),
+        'seconds': elapsed,
+        'messages_per_second': (stats['messages_received'] - received) / elapsed,
+        'snapshots_per_second': stats['snapshots_published'] / elapsed,
+        'process_cpu_percent': 100.0 * cpu / elapsed,
+        'lag_p50_ms': lag['p50_seconds'] * 1000,
+        'lag_p99_ms': lag['p99_seconds'] * 1000,
+        'lag_max_ms': lag['max_seconds'] * 1000,
+    })
+    return stats
+
+
+def _ws_standin_arguments(parser):
+    parser.add_argument('--history', help='Ticks grabados a reproducir (CSV, Parquet o NPY; por defecto simulados)')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--rate', type=float, default=1000.0, help='Mensajes por segundo en total (0 = sin límite)')
+    parser.add_argument('--batch', type=int, default=1, help='Mensajes por frame WebSocket (lista JSON si > 1)')
+    parser.add_argument('--assets', type=int, default=None, help='Simular N activos (completa con activos sintéticos)')
+    parser.add_argument('--bench', type=float, default=0, help='Medir la ingesta del feed durante N segundos y salir')
+
+
+def run_ws_standin_cli(args) -> int:
+    import importlib.util
+    if importlib.util.find_spec('websockets') is None:
+        print(f"{Colors.FAIL}El stand-in WebSocket requiere el paquete websockets (pip install websockets).{Colors.ENDC}")
+        return 2
+
+    tickers, prices = load_recorded_ticks(args.history, args.assets)
+    stand_in = TickerStandIn(tickers, prices, rate=args.rate, batch=args.batch,
+                             port=0 if args.bench else args.port).start()
+    if args.bench:
+        result = benchmark_stream_ingest(stand_in.url, tickers, args.bench)
+        result.update({'requested_rate': args.rate, 'batch': args.batch})
+        stand_in.stop()
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"[{Colors.OKCYAN}STAND-IN{Colors.ENDC}] Ticker en {stand_in.url} ({len(tickers)} activos, {args.rate:g} msg/s) "
+          f"(export BORI_PRICE_FEED=websocket BORI_WS_URL={stand_in.url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stand_in.stop()
+    return 0
+
+# -----------------------------------------------------------
+# ⏱️ BENCHMARKS DEL PIPELINE DE TICKS (MICRO Y MACRO)
+# -----------------------------------------------------------
+class _NullSink:
+    """Stream que descarta la salida del render (mide el formateo, no la terminal)."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+BENCH_CASES = ('set_new_price', 'calculate_indicators', 'run_tick', 'display_status', 'update_mock_brcn_and_index',
+               'loop_iteration', 'loop_iteration_instrumented')
+
+
+def _bench_tickers(n_assets: int) -> list:
+    """Los activos reales primero y luego activos sintéticos hasta completar `n_assets`."""
+    base = BotConfiguration().ASSETS_TO_TRACK
+    return base[:n_assets] + [f"SYN{i:04d}" for i in range(len(base), n_assets)]
+
+
+def _bench_manager(n_assets: int, window: int, seed: int):
+    """Arma fetcher + manager sin red ni diario, con el buffer de precios lleno (`window` puntos)."""
+    CONFIG.set_assets(_bench_tickers(n_assets))
+    CONFIG.PRICE_WINDOW_SIZE = window
+    CONFIG.LEDGER_PATH = None
+    seed_rngs(seed)
+    fetcher = LiveFetcher(CONFIG.ASSETS_TO_TRACK)
+    start_prices = [CONFIG.INITIAL_PRICES[ticker] for ticker in CONFIG.ASSETS_TO_TRACK]
+    paths = fetcher.simulator.simulate_paths(window, start_prices)
+    history_data_map = {ticker: {'Close': paths[:, i]} for i, ticker in enumerate(CONFIG.ASSETS_TO_TRACK)}
+    manager = PortfolioManager(history_data_map, fetcher)
+    manager.renderer = TerminalRenderer(stream=_NullSink())
+    return manager
+
+
+def _time_case(case: str, manager, min_time: float, max_iterations: int) -> list:
+    """Latencias (s) de `case` por tick: cada tick recorre todos los activos del portafolio."""
+    fetcher = manager.fetcher
+    assets = list(manager.assets.values())
+    opinions = {}
+    latencies = []
+    perf_counter = time.perf_counter
+    deadline = perf_counter() + min_time
+    instrumentation = manager.enable_instrumentation() if case == 'loop_iteration_instrumented' else None
+    # Un tick real cada TICK/DISPLAY vueltas, como con el feed por consulta
+    logic_every = (max(1, int(CONFIG.TICK_INTERVAL_SECONDS / CONFIG.DISPLAY_INTERVAL_SECONDS))
+                   if CONFIG.DISPLAY_INTERVAL_SECONDS > 0 else 1)
+
+    while len(latencies) < max_iterations and (perf_counter() < deadline or len(latencies) < 5):
+        # Preparación fuera del cronómetro: un precio nuevo para que nada quede en caché
+        prices = fetcher._mock_prices_only() if case != 'update_mock_brcn_and_index' else None
+        if case not in ('set_new_price', 'update_mock_brcn_and_index', 'loop_iteration', 'loop_iteration_instrumented'):
+            for asset in assets:
+                asset.set_new_price(prices[asset.ticker])
+
+        if case == 'set_new_price':
+            t0 = perf_counter()
+            for asset in assets:
+                asset.set_new_price(prices[asset.ticker])
+        elif case == 'calculate_indicators':
+            t0 = perf_counter()
+            for asset in assets:
+                asset._calculate_indicators()
+        elif case == 'run_tick':
+            t0 = perf_counter()
+            for asset in assets:
+                opinions[asset.ticker] = asset.run_tick(True)[0]
+        elif case == 'display_status':
+            t0 = perf_counter()
+            manager.display_status(CONFIG.TICK_INTERVAL_SECONDS, opinions)
+        elif case == 'update_mock_brcn_and_index':
+            fetcher.previous_prices = fetcher.current_prices.copy()
+            t0 = perf_counter()
+            fetcher._update_mock_brcn_and_index()
+        elif instrumentation is None:
+            # Una vuelta de run_trading_loop sin el sleep: precios mock, lógica y render
+            t0 = perf_counter()
+            is_real_tick = manager.visual_tick_counter % logic_every == 0
+            new_prices = fetcher._mock_prices_only()
+            opinions = manager._process_frame(new_prices, is_real_tick)
+            manager.display_status(CONFIG.TICK_INTERVAL_SECONDS, opinions)
+        else:
+            # La misma vuelta con los histogramas por etapa activos (mide el sobrecosto)
+            t0 = perf_counter()
+            frame_start_ns = time.perf_counter_ns()
+            is_real_tick = manager.visual_tick_counter % logic_every == 0
+            new_prices = fetcher._mock_prices_only()
+            instrumentation.record('mock_prices', time.perf_counter_ns() - frame_start_ns)
+            opinions = manager._process_frame(new_prices, is_real_tick)
+            display_start_ns = time.perf_counter_ns()
+            if manager.display_status(CONFIG.TICK_INTERVAL_SECONDS, opinions):
+                instrumentation.record('display_status', time.perf_counter_ns() - display_start_ns)
+            instrumentation.record('frame', time.perf_counter_ns() - frame_start_ns)
+        latencies.append(perf_counter() - t0)
+    manager.instrumentation = None
+    return latencies
+
+
+def run_benchmarks(asset_counts=(30, 300, 3000), windows=(28, 300, 5000), cases=BENCH_CASES,
+                   min_time: float = 0.5, max_iterations: int = 20000, seed: int = 1234) -> dict:
+    """Mide cada caso en la matriz activos x ventana. Restaura CONFIG al terminar."""
+    saved_config = copy.deepcopy(CONFIG.__dict__)
+    results = []
+    try:
+        for n_assets in asset_counts:
+            for window in windows:
+                setup_start = time.perf_counter()
+                manager = _bench_manager(n_assets, window, seed)
+                setup_seconds = time.perf_counter() - setup_start
+                for case in cases:
+                    # Calentamiento sin medir (cachés de CPU/intérprete) antes de las muestras
+                    _time_case(case, manager, min_time / 10, max_iterations // 10)
+                    latencies = np.array(_time_case(case, manager, min_time, max_iterations))
+                    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+                    results.append({
+                        'case': case,
+                        'assets': n_assets,
+                        'window': window,
+                        'iterations': int(latencies.size),
+                        'ticks_per_second': float(latencies.size / latencies.sum()),
+                        'mean_us': float(latencies.mean() * 1e6),
+                        'p50_us': float(p50 * 1e6),
+                        'p90_us': float(p90 * 1e6),
+                        'p99_us': float(p99 * 1e6),
+                        'max_us': float(latencies.max() * 1e6),
+                        'per_asset_ns': float(p50 * 1e9 / n_assets),
+                        'setup_seconds': setup_seconds,
+                    })
+    finally:
+        CONFIG.__dict__.clear()
+        CONFIG.__dict__.update(saved_config)
+
+    import platform
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'min_time': min_time,
+        },
+        'results': results,
+    }
+
+
+def compare_benchmarks(current: dict, baseline: dict, threshold: float = 0.15, metric: str = 'p50_us') -> list:
+    """Compara `metric` contra la línea base; marca regresión si empeora más de `threshold` (0.15 = 15%)."""
+    baseline_rows = {(row['case'], row['assets'], row['window']): row for row in baseline['results']}
+    comparison = []
+    for row in current['results']:
+        base = baseline_rows.get((row['case'], row['assets'], row['window']))
+        if base is None or not base[metric]:
+            continue
+        ratio = row[metric] / base[metric]
+        comparison.append({
+            'case': row['case'], 'assets': row['assets'], 'window': row['window'],
+            'baseline': base[metric], 'current': row[metric], 'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return comparison
+
+
+def print_benchmark_report(result: dict, comparison: list = None):
+    print("\n" + f"{Colors.HEADER}="*96 + Colors.ENDC)
+    print(f"⏱️ {Colors.BOLD}BENCHMARK DEL PIPELINE DE TICKS{Colors.ENDC} | Python {result['meta']['python']} | NumPy {result['meta']['numpy']}")
+    print(f"{Colors.HEADER}="*96 + Colors.ENDC)
+    print(f"{'Caso':<28} {'Activos':>7} {'Ventana':>7} {'Ticks/s':>12} {'p50 µs':>11} {'p90 µs':>11} {'p99 µs':>11} {'ns/activo':>10}")
+    for row in result['results']:
+        print(f"{row['case']:<28} {row['assets']:>7} {row['window']:>7} {row['ticks_per_second']:>12,.1f} "
+              f"{row['p50_us']:>11,.1f} {row['p90_us']:>11,.1f} {row['p99_us']:>11,.1f} {row['per_asset_ns']:>10,.0f}")
+    if comparison:
+        print(f"\n{Colors.BOLD}COMPARACIÓN CONTRA LA LÍNEA BASE (p50){Colors.ENDC}")
+        for row in comparison:
+            color = Colors.FAIL if row['regression'] else Colors.OKGREEN
+            flag = "REGRESIÓN" if row['regression'] else "ok"
+            print(f"{row['case']:<28} {row['assets']:>7} {row['window']:>7} {row['baseline']:>11,.1f} -> {row['current']:>11,.1f} "
+                  f"{color}{row['ratio']:>6.2f}x {flag}{Colors.ENDC}")
+
+
+def _bench_arguments(parser):
+    parser.add_argument('--assets', type=int, nargs='+', default=[30, 300, 3000])
+    parser.add_argument('--windows', type=int, nargs='+', default=[28, 300, 5000])
+    parser.add_argument('--cases', nargs='+', choices=BENCH_CASES, default=list(BENCH_CASES))
+    parser.add_argument('--min-time', type=float, default=0.5, help='Segundos mínimos por caso')
+    parser.add_argument('--max-iterations', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--out', help='Guardar los resultados en JSON')
+    parser.add_argument('--baseline', help='JSON de una corrida anterior para detectar regresiones')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Empeoramiento tolerado del p50 (0.15 = 15%%)')
+
+
+def run_bench_cli(args) -> int:
+    result = run_benchmarks(args.assets, args.windows, args.cases, args.min_time, args.max_iterations, args.seed)
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare_benchmarks(result, json.load(f), args.threshold)
+        result['comparison'] = comparison
+    print_benchmark_report(result, comparison)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+    return 1 if comparison and any(row['regression'] for row in comparison) else 0
+
+def _interactive_mode_choice() -> bool:
+    """Menú clásico de selección de modo (solo con --interactive)."""
+    print(f"\nSeleccione el modo de operación:")
+    print(f"1. {Colors.OKCYAN}Modo SIMULACIÓN{Colors.ENDC} (Recomendado para pruebas)")
+    print(f"2. {Colors.FAIL}Modo LIVE TRADING{Colors.ENDC} (Requiere API Key real y opera en Coinbase)")
+    
+    mode_choice = input(f"\nSeleccione un modo (1 o 2) y presione Enter: ")
+    
+    if mode_choice == '2':
+        confirm = input(f"{Colors.FAIL}ADVERTENCIA:{Colors.ENDC} ¿Está seguro que desea activar el **LIVE TRADING**? (S/N): ").lower()
+        if confirm == 's':
+            print(f"{Colors.OKGREEN}Modo LIVE TRADING ACTIVADO.{Colors.ENDC} ¡Operaciones reales en camino!")
+            return True
+        print(f"{Colors.WARNING}Volviendo al Modo Simulación. Analicemos primero la estrategia.{Colors.ENDC}")
+    return False
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _live_arguments(parser):
+    parser.add_argument('--mode', choices=('sim', 'live'), default=None, help='Modo de operación (por defecto: sim)')
+    parser.add_argument('--yes', action='store_true', help='Confirma el modo live sin preguntar')
+    parser.add_argument('--interactive', action='store_true', help='Usar el menú clásico de selección de modo')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla de la sesión')
+    parser.add_argument('--max-ticks', type=int, default=None, help='Terminar tras N ticks de lógica (0 = sin límite)')
+    parser.add_argument('--resume', nargs='?', const='', default=None, metavar='CHECKPOINT',
+                        help='Reanudar desde un checkpoint (por defecto CHECKPOINT_PATH)')
+
+
+def run_live_cli(args) -> int:
+    """Arranque sin menú: la configuración (archivo, entorno BORI_<PARÁMETRO> y argv) ya viene resuelta."""
+    import signal
+    print(f"\n{Colors.HEADER}====================================================={Colors.ENDC}")
+    print(f"  {Colors.BOLD}BORITRACKER V6.5 - MODO ACUMULACIÓN (DCA){Colors.ENDC}")
+    print(f"  {Colors.WARNING}Solo Compras en RSI bajo | No hay Ventas (SL/TP desactivados){Colors.ENDC}")
+    print(f"{Colors.HEADER}====================================================={Colors.ENDC}")
+
+    if args.interactive:
+        CONFIG.LIVE_TRADING_ENABLED = _interactive_mode_choice()
+    elif args.mode is not None:
+        CONFIG.LIVE_TRADING_ENABLED = args.mode == 'live'
+    if CONFIG.LIVE_TRADING_ENABLED and not args.interactive and not args.yes:
+        # Sin terminal no hay a quién preguntar: el modo live exige confirmación explícita
+        print(f"{Colors.FAIL}El modo LIVE TRADING requiere --yes cuando se arranca sin --interactive.{Colors.ENDC}")
+        return 2
+
+    current_mode = "LIVE DCA" if CONFIG.LIVE_TRADING_ENABLED else "SIMULACIÓN DCA"
+    CONFIG.display_options(current_mode)
+    # Bajo un gestor de procesos (systemd, supervisord, docker stop) SIGTERM cierra igual que Ctrl+C
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+
+    # 1. Carga Inicial
+    session_seed = seed_rngs(CONFIG.RNG_SEED)
+    temp_fetcher = LiveFetcher(CONFIG.ASSETS_TO_TRACK) 
+    # La corrección está aquí: la función fetch_initial_history ya está en LiveFetcher
+    initial_history_data = temp_fetcher.fetch_initial_history()
+    if CONFIG.PRICE_FEED_BACKGROUND:
+        temp_fetcher.start_background_feed()
+
+    # 2. Inicializar el Manager
+    manager = PortfolioManager(
+        history_data_map=initial_history_data,
+        fetcher_instance=temp_fetcher
+    ) 
+    resumed_checkpoint = None
+    if args.resume is not None:
+        if CONFIG.CHECKPOINT_PATH and os.path.exists(CONFIG.CHECKPOINT_PATH):
+            started = time.perf_counter()
+            try:
+                with open(CONFIG.CHECKPOINT_PATH, 'rb') as f:
+                    resumed_checkpoint = f.read()
+                manager.restore_state(read_checkpoint(io.BytesIO(resumed_checkpoint)))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"{Colors.FAIL}No se pudo reanudar desde {CONFIG.CHECKPOINT_PATH}:{Colors.ENDC} {e}")
+                return 2
+            print(f"[{Colors.OKCYAN}CHECKPOINT{Colors.ENDC}] Sesión reanudada desde {CONFIG.CHECKPOINT_PATH} "
+                  f"(tick de lógica {manager.sim_tick_counter}, {(time.perf_counter() - started) * 1000:.1f} ms)")
+        else:
+            print(f"[{Colors.WARNING}CHECKPOINT{Colors.ENDC}] No hay checkpoint que reanudar: se inicia una sesión nueva.")
+    if CONFIG.CHECKPOINT_PATH:
+        manager.enable_checkpoints(CONFIG.CHECKPOINT_PATH)
+    if CONFIG.JOURNAL_PATH:
+        journal_path = CONFIG.JOURNAL_PATH
+        if resumed_checkpoint is not None:
+            # Diario nuevo (el de la sesión original queda intacto) que arranca con el checkpoint restaurado
+            root, ext = os.path.splitext(journal_path)
+            journal_path = f"{root}.resume-{manager.sim_tick_counter:06d}{ext}"
+        journal = SessionJournal(journal_path, CONFIG.ASSETS_TO_TRACK)
+        journal.write_header(session_seed)
+        journal.write_history(initial_history_data)
+        if resumed_checkpoint is not None:
+            journal.write_checkpoint(resumed_checkpoint)
+        manager.attach_journal(journal)
+    if CONFIG.METRICS_EXPORT_PATH or CONFIG.METRICS_PORT:
+        manager.enable_instrumentation(CONFIG.METRICS_EXPORT_PATH, CONFIG.METRICS_PORT)
+    if CONFIG.LIVE_TRADING_ENABLED and CONFIG.ORDER_PIPELINE_ENABLED:
+        # Sin conector de exchange real todavía: las órdenes van al exchange simulado
+        manager.attach_order_pipeline(AsyncOrderPipeline(MockExchange()))
 
     # 3. Ejecutar el loop de trading (Continuo hasta Ctrl+C)
     transaction_log, total_ticks, final_value = manager.run_trading_loop()
     
     # 4. Generar el reporte completo
     manager.generate_report(transaction_log, final_value, total_ticks)
+    return 0
+
+# --- PUNTO DE ENTRADA ---
+# Subcomando -> (función, argumentos propios, descripción, {opción: PARÁMETRO que fija en la configuración})
+CLI_SUBCOMMANDS = {
+    'backtest': (run_backtest_cli, _backtest_arguments, 'Backtest DCA sin pantalla sobre precios históricos.', {}),
+    'simulate': (run_simulate_cli, _simulate_arguments,
+                 'Genera un historial sintético correlacionado (.npy o .csv) para backtest/sweep.', {}),
+    'sweep': (run_sweep_cli, _sweep_arguments, 'Barrido paralelo de parámetros DCA sobre precios históricos.', {}),
+    'replay': (run_replay_cli, _replay_arguments, 'Reproduce un diario de sesión a máxima velocidad.', {}),
+    'standin': (run_standin_cli, _standin_arguments, 'Servidor local que imita CoinGecko simple/price.', {}),
+    'wsstandin': (run_ws_standin_cli, _ws_standin_arguments,
+                  'Servidor WebSocket local que reproduce ticks con el formato ticker de Coinbase.', {}),
+    'bench': (run_bench_cli, _bench_arguments, 'Benchmarks del pipeline de ticks (activos x ventana).', {}),
+    'multi': (run_multi_cli, _multi_arguments, 'Varios portafolios DCA en un proceso sobre un mismo feed.',
+              {'max_ticks': 'MAX_SIMULATION_TICKS'}),
+    'orders': (run_orders_cli, _orders_arguments, 'Mide el pipeline de órdenes contra el exchange simulado.', {}),
+}
+LIVE_CONFIG_ARGS = {'seed': 'RNG_SEED', 'max_ticks': 'MAX_SIMULATION_TICKS', 'resume': 'CHECKPOINT_PATH'}
+
+
+def build_cli_parser():
+    """Sin subcomando arranca el tracker en vivo; --config y --set valen para todos los subcomandos."""
+    import argparse
+    parser = argparse.ArgumentParser(prog='Bori_tracker.py', description='Tracker DCA en vivo (sin menú interactivo por defecto).')
+    parser.add_argument('--config', default=os.environ.get('BORI_CONFIG'), help='Archivo de configuración .json o .toml')
+    parser.add_argument('--set', action='append', default=[], metavar='PARAM=VALOR', help='Sobrescribe un parámetro (repetible)')
+    _live_arguments(parser)
+    parser.set_defaults(handler=run_live_cli, config_args=LIVE_CONFIG_ARGS)
+
+    # Tras el subcomando, --config reemplaza al anterior y cada --set se suma a los de antes
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default=argparse.SUPPRESS, help='Archivo de configuración .json o .toml')
+    common.add_argument('--set', dest='command_set', action='append', default=[], metavar='PARAM=VALOR',
+                        help='Sobrescribe un parámetro (repetible)')
+    subparsers = parser.add_subparsers(dest='command', metavar='SUBCOMANDO')
+    for name, (handler, add_arguments, description, config_args) in CLI_SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(name, parents=[common], help=description, description=description)
+        add_arguments(subparser)
+        subparser.set_defaults(handler=handler, config_args=config_args)
+    return parser
+
+
+def main(argv: list) -> int:
+    """Resuelve la configuración (archivo < BORI_<PARÁMETRO> < argv) y despacha el subcomando."""
+    parser = build_cli_parser()
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set + getattr(args, 'command_set', []):
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"--set espera PARAM=VALOR, recibido: {item}")
+        overrides[key.strip()] = value
+    for option, key in args.config_args.items():
+        value = getattr(args, option)
+        if value is not None and value != '':
+            overrides[key] = value
+    try:
+        CONFIG.load_sources(args.config, overrides=overrides)
+    except (OSError, ValueError) as e:
+        print(f"{Colors.FAIL}Configuración inválida:{Colors.ENDC} {e}")
+        return 2
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
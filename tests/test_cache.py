@@ -0,0 +1,101 @@
+"""Caché de CoinGecko: TTL, revalidación con ETag y snapshot compartido en disco."""
+import pytest
+
+import Bori_tracker as bori
+
+URL = 'https://api.coingecko.com/api/v3/simple/price'
+PARAMS = {'ids': 'bitcoin', 'vs_currencies': 'usd'}
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise bori.requests.exceptions.HTTPError(f"{self.status_code}")
+
+
+class FakeSession:
+    """Responde 304 si llega el ETag vigente; si no, 200 con el precio actual."""
+
+    def __init__(self):
+        self.price = 1.0
+        self.etag = '"v1"'
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, {'bitcoin': {'usd': self.price}}, {'ETag': self.etag})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(bori.time, 'time', lambda: now[0])
+    return now
+
+
+def test_fresh_entries_are_served_without_requests(clock):
+    session = FakeSession()
+    cache = bori.CoinGeckoCache(ttl=10, path='', session=session)
+
+    assert cache.get_json(URL, PARAMS) == {'bitcoin': {'usd': 1.0}}
+    clock[0] += 9
+    assert cache.get_json(URL, dict(reversed(list(PARAMS.items())))) == {'bitcoin': {'usd': 1.0}}
+    assert (cache.hits, cache.misses, len(session.requests)) == (1, 1, 1)
+
+
+def test_expired_entries_are_revalidated_with_the_etag(clock):
+    session = FakeSession()
+    cache = bori.CoinGeckoCache(ttl=10, path='', session=session)
+    cache.get_json(URL, PARAMS)
+
+    clock[0] += 10
+    assert cache.get_json(URL, PARAMS) == {'bitcoin': {'usd': 1.0}}
+    assert session.requests[-1] == {'If-None-Match': '"v1"'}
+    assert cache.revalidated == 1
+    # El 304 renueva el TTL
+    clock[0] += 5
+    cache.get_json(URL, PARAMS)
+    assert (cache.hits, len(session.requests)) == (1, 2)
+
+    session.price, session.etag = 2.0, '"v2"'
+    clock[0] += 10
+    assert cache.get_json(URL, PARAMS) == {'bitcoin': {'usd': 2.0}}
+    assert cache.misses == 2
+
+
+def test_snapshot_on_disk_is_shared_between_caches(clock, tmp_path):
+    path = str(tmp_path / 'cache.json')
+    writer_session = FakeSession()
+    bori.CoinGeckoCache(ttl=10, path=path, session=writer_session).get_json(URL, PARAMS)
+
+    # Otro proceso (o un reinicio) con el snapshot fresco no sale a la red
+    reader_session = FakeSession()
+    reader = bori.CoinGeckoCache(ttl=10, path=path, session=reader_session)
+    clock[0] += 5
+    assert reader.get_json(URL, PARAMS) == {'bitcoin': {'usd': 1.0}}
+    assert (reader.hits, reader_session.requests) == (1, [])
+
+    # Vencido, revalida con el ETag que guardó el otro proceso
+    clock[0] += 10
+    reader.get_json(URL, PARAMS)
+    assert reader_session.requests == [{'If-None-Match': '"v1"'}]
+
+
+def test_http_errors_are_raised_and_not_cached(clock):
+    session = FakeSession()
+    session.get = lambda *args, **kwargs: FakeResponse(429)
+    cache = bori.CoinGeckoCache(ttl=10, path='', session=session)
+
+    with pytest.raises(bori.requests.exceptions.HTTPError):
+        cache.get_json(URL, PARAMS)
+    assert cache.entries == {}
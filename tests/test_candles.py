@@ -0,0 +1,77 @@
+"""Velas OHLC: actualización en sitio, cierre al cambiar de intervalo y anillo de `window` velas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import Bori_tracker as bori
+
+
+def test_ticks_in_one_interval_update_the_current_candle():
+    series = bori.CandleSeries(60, 2, window=5)
+
+    assert not series.update(np.array([10.0, 1.0]), 120.0)
+    assert not series.update(np.array([12.0, 0.5]), 150.0)
+    assert not series.update(np.array([11.0, 0.8]), 179.9)
+
+    candles = series.to_frame(0)
+    assert len(candles) == 1 and series.count == 1
+    assert candles.iloc[0].tolist() == [10.0, 12.0, 10.0, 11.0]
+    assert series.to_frame(1).iloc[0].tolist() == [1.0, 1.0, 0.5, 0.8]
+    assert candles.index[0] == pd.Timestamp(120, unit='s')
+
+
+def test_new_interval_closes_the_previous_candle():
+    series = bori.CandleSeries(60, 1, window=5)
+    series.update(np.array([10.0]), 0.0)
+    series.update(np.array([13.0]), 30.0)
+
+    assert series.update(np.array([12.0]), 60.0)
+    assert series.last_closed().tolist() == [13.0]
+    assert series.to_frame(0, include_current=False)['Close'].tolist() == [13.0]
+    assert series.to_frame(0)['Open'].tolist() == [10.0, 12.0]
+
+
+def test_late_ticks_update_the_current_candle():
+    series = bori.CandleSeries(60, 1, window=5)
+    series.update(np.array([10.0]), 0.0)
+    series.update(np.array([11.0]), 65.0)
+
+    # Un tick con hora de la vela anterior no la reabre
+    assert not series.update(np.array([9.0]), 59.0)
+    assert series.count == 2
+    assert series.to_frame(0).iloc[-1].tolist() == [11.0, 11.0, 9.0, 9.0]
+    assert series.to_frame(0).iloc[0].tolist() == [10.0, 10.0, 10.0, 10.0]
+
+
+def test_empty_intervals_create_no_candles():
+    series = bori.CandleSeries(60, 1, window=5)
+    series.update(np.array([10.0]), 0.0)
+
+    assert series.update(np.array([11.0]), 600.0)
+    starts = series.to_frame(0).index
+    assert series.count == 2 and list(starts) == list(pd.to_datetime([0, 600], unit='s'))
+
+
+def test_window_keeps_the_latest_candles_in_order():
+    series = bori.CandleSeries(60, 1, window=4)
+    for k in range(10):
+        series.update(np.array([float(k)]), k * 60.0 + 1)
+
+    candles = series.to_frame(0)
+    assert candles['Close'].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert series.last_closed().tolist() == [8.0]
+
+    resumed = bori.CandleSeries(60, 1, window=4)
+    resumed.set_state(series.get_state())
+    resumed.update(np.array([10.0]), 600.0)
+    assert resumed.to_frame(0)['Close'].tolist() == [7.0, 8.0, 9.0, 10.0]
+
+
+def test_aggregator_reports_the_timeframes_that_closed():
+    aggregator = bori.CandleAggregator(1, timeframes=['1m', '5m'], window=10)
+    aggregator.update(np.array([1.0]), 0.0)
+
+    assert aggregator.update(np.array([2.0]), 60.0) == ['1m']
+    assert aggregator.update(np.array([3.0]), 300.0) == ['1m', '5m']
+    with pytest.raises(ValueError):
+        bori.CandleAggregator(1, timeframes=['7m'])
@@ -0,0 +1,55 @@
+"""CLI: un solo parser con subcomandos; --config, BORI_* y --set se resuelven para todos."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Bori_tracker as bori
+
+
+@pytest.fixture(autouse=True)
+def fresh_config(monkeypatch):
+    monkeypatch.delenv('BORI_CONFIG', raising=False)
+    monkeypatch.setattr(bori, 'CONFIG', bori.BotConfiguration())
+
+
+def test_sweep_uses_config_sources(tmp_path, monkeypatch):
+    prices_path, config_path, out_path = tmp_path / 'p.npy', tmp_path / 'c.json', tmp_path / 'tabla.csv'
+    assert bori.main(['simulate', str(prices_path), '--ticks', '400', '--seed', '4']) == 0
+    config_path.write_text(json.dumps({'RSI_PERIOD': 9}))
+    monkeypatch.setenv('BORI_RSI_BUY_THRESHOLD', '25')
+
+    assert bori.main(['--config', str(config_path), 'sweep', str(prices_path), '--workers', '1',
+                      '--set', 'USDC_TO_TRADE_PCT=0.4', '--out', str(out_path)]) == 0
+
+    row = pd.read_csv(out_path).iloc[0]
+    assert (row['RSI_PERIOD'], row['RSI_BUY_THRESHOLD'], row['USDC_TO_TRADE_PCT']) == (9, 25, 0.4)
+
+
+def test_backtest_uses_config_sources(tmp_path, capsys):
+    prices_path = tmp_path / 'p.npy'
+    np.save(prices_path, bori.MarketSimulator(bori.CONFIG.ASSETS_TO_TRACK, seed=2).simulate_paths(
+        400, [bori.CONFIG.INITIAL_PRICES[t] for t in bori.CONFIG.ASSETS_TO_TRACK]))
+
+    assert bori.main(['backtest', str(prices_path), '--set', 'INITIAL_USDC_BALANCE=500']) == 0
+    assert bori.CONFIG.CAPITAL_PER_ASSET == 500 / len(bori.CONFIG.ASSETS_TO_TRACK)
+    assert 'REPORTE DE BACKTEST' in capsys.readouterr().out
+
+
+def test_config_options_before_and_after_the_subcommand():
+    parser = bori.build_cli_parser()
+    args = parser.parse_args(['--config', 'a.json', '--set', 'A=1', 'bench', '--config', 'b.json', '--set', 'B=2',
+                              '--seed', '7'])
+    assert args.handler is bori.run_bench_cli
+    assert (args.config, args.set, args.command_set) == ('b.json', ['A=1'], ['B=2'])
+    # El --seed de bench es la semilla del benchmark, no RNG_SEED
+    assert args.config_args == {}
+
+    args = parser.parse_args(['--seed', '7', '--max-ticks', '0'])
+    assert args.handler is bori.run_live_cli and args.config_args == bori.LIVE_CONFIG_ARGS
+
+
+def test_invalid_config_returns_2(tmp_path, capsys):
+    assert bori.main(['backtest', str(tmp_path / 'p.npy'), '--set', 'RSI_PERIOD=xx']) == 2
+    assert 'Configuración inválida' in capsys.readouterr().out
@@ -0,0 +1,123 @@
+"""Equivalencias entre las rutas rápidas y la lógica de referencia sobre caminos sembrados.
+
+- PortfolioManager (por activo) vs VectorizedPortfolioEngine: mismas compras y ticks.
+- VectorizedPortfolioEngine.run_block vs step fila por fila.
+- IncrementalRSI vs el RSI con ewm de pandas.
+- Checkpoint: guardar, restaurar y continuar da el mismo resultado que no detenerse.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+def make_history():
+    bori.seed_rngs(3)
+    fetcher = bori.LiveFetcher(TICKERS)
+    return fetcher.fetch_initial_history(), fetcher
+
+
+def price_path(history, n_ticks, seed=0):
+    """Camino con deriva bajista (para que haya compras) que parte del último precio del historial."""
+    rng = np.random.default_rng(seed)
+    start = np.array([bori.history_closes(history[ticker])[-1] for ticker in TICKERS])
+    returns = rng.normal(-0.0003, 0.01, (n_ticks, len(TICKERS)))
+    return start * np.cumprod(1 + returns, axis=0)
+
+
+def ledger_rows(ledger):
+    return {name: ledger.column(name) for name in ('tick', 'asset_id', 'exec_price', 'qty', 'commission')}
+
+
+def assert_same_ledger(left, right):
+    left, right = ledger_rows(left), ledger_rows(right)
+    assert len(left['tick']) > 0, "el camino de prueba debería generar compras"
+    np.testing.assert_array_equal(left['tick'], right['tick'])
+    np.testing.assert_array_equal(left['asset_id'], right['asset_id'])
+    for name in ('exec_price', 'qty', 'commission'):
+        np.testing.assert_allclose(left[name], right[name], rtol=1e-12)
+
+
+def feed_manager(manager, path, first_frame=0, t0=1_700_000_000.0):
+    for k, row in enumerate(path, start=first_frame):
+        manager._process_frame(dict(zip(TICKERS, row.tolist())), k % 3 == 0, t0 + k * 0.5)
+
+
+def test_portfolio_manager_matches_vectorized_engine():
+    history, fetcher = make_history()
+    manager = bori.PortfolioManager(history, fetcher)
+    engine = bori.VectorizedPortfolioEngine.from_history_map(history, TICKERS)
+    path = price_path(history, 600)
+
+    feed_manager(manager, path)
+    for k, row in enumerate(path):
+        engine.step(row, k % 3 == 0)
+
+    assert_same_ledger(manager.ledger, engine.ledger)
+    np.testing.assert_allclose(engine.usdc_balance, [asset.usdc_balance for asset in manager.assets.values()],
+                               rtol=1e-12)
+    np.testing.assert_allclose(engine.asset_balance, [asset.asset_balance for asset in manager.assets.values()],
+                               rtol=1e-12)
+
+
+def test_run_block_matches_step():
+    history, _ = make_history()
+    stepped = bori.VectorizedPortfolioEngine.from_history_map(history, TICKERS)
+    blocked = bori.VectorizedPortfolioEngine.from_history_map(history, TICKERS)
+    path = price_path(history, 3000, seed=1)
+
+    step_values = []
+    for row in path:
+        stepped.step(row)
+        step_values.append(stepped.portfolio_value())
+    block_values = np.concatenate([blocked.run_block(block) for block in np.array_split(path, 4)])
+
+    assert_same_ledger(stepped.ledger, blocked.ledger)
+    np.testing.assert_allclose(block_values, step_values, rtol=1e-12)
+    assert stepped.current_tick_index == blocked.current_tick_index
+
+
+@pytest.mark.parametrize('smoothing', ['ema', 'wilder'])
+def test_incremental_rsi_matches_ewm(smoothing):
+    period = 14
+    prices = pd.Series(100 * np.cumprod(1 + np.random.default_rng(2).normal(0, 0.01, 500)))
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    alpha = bori.rsi_smoothing_alpha(period, smoothing)
+    avg_gain = gain.ewm(alpha=alpha, adjust=False).mean()
+    avg_loss = loss.ewm(alpha=alpha, adjust=False).mean()
+    expected = (100 - 100 / (1 + avg_gain / avg_loss.replace(0, np.nan))).to_numpy(copy=True)
+    expected[:period - 1] = np.nan
+
+    engine = bori.IncrementalRSI(period, smoothing)
+    actual = np.array([engine.update(price) for price in prices])
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, equal_nan=True)
+
+
+def test_checkpoint_round_trip(tmp_path):
+    history, fetcher = make_history()
+    path = price_path(history, 600, seed=4)
+    reference = bori.PortfolioManager(history, fetcher)
+    feed_manager(reference, path)
+
+    history, fetcher = make_history()
+    before = bori.PortfolioManager(history, fetcher)
+    feed_manager(before, path[:300])
+    checkpoint_path = str(tmp_path / 'estado.npz')
+    bori.write_checkpoint(checkpoint_path, before.capture_state())
+
+    history, fetcher = make_history()
+    resumed = bori.PortfolioManager(history, fetcher)
+    resumed.restore_state(bori.read_checkpoint(checkpoint_path))
+    assert resumed.sim_tick_counter == before.sim_tick_counter
+    feed_manager(resumed, path[300:], first_frame=300)
+
+    assert_same_ledger(reference.ledger, resumed.ledger)
+    for ticker in TICKERS:
+        assert resumed.assets[ticker].usdc_balance == reference.assets[ticker].usdc_balance
+        assert resumed.assets[ticker].current_tick_index == reference.assets[ticker].current_tick_index
@@ -0,0 +1,92 @@
+"""El tick de lógica solo opera con precios reales nuevos; el hilo del feed sobrevive a errores."""
+import time
+
+import pytest
+import requests
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+QUOTED = next(ticker for ticker in TICKERS if ticker != 'BRCN')  # BRCN no cotiza: se simula
+
+
+class FixedFeed(bori.PriceFeed):
+    """Feed sin hilo: los tests publican a mano."""
+
+    def _run(self):
+        self._stop_event.wait()
+
+
+def sync_fetcher(fetch):
+    fetcher = bori.LiveFetcher(TICKERS)
+    fetcher.fetch_initial_history()
+    fetcher._resolve_ids = lambda: None
+    fetcher.api_ids = ['bitcoin']
+    fetcher.id_to_ticker = {'bitcoin': QUOTED}
+    fetcher.planner.fetch = fetch
+    fetcher.last_api_call_time = 0.0
+    return fetcher
+
+
+def test_sync_fetch_failure_is_not_a_real_tick():
+    def fail(ids, *args, **kwargs):
+        raise requests.exceptions.ConnectionError('sin red')
+
+    fetcher = sync_fetcher(fail)
+    prices, is_real_tick, _ = bori.next_price_frame({'logic'}, bori.live_loop_scheduler(fetcher), fetcher)
+
+    assert prices is not None
+    assert not is_real_tick
+    assert not fetcher.has_fresh_prices
+    assert fetcher.is_stale
+
+
+def test_sync_fetch_success_is_a_real_tick():
+    fetcher = sync_fetcher(lambda ids, *args, **kwargs: {'bitcoin': {'usd': 123.0}})
+    prices, is_real_tick, _ = bori.next_price_frame({'logic'}, bori.live_loop_scheduler(fetcher), fetcher)
+
+    assert is_real_tick
+    assert prices[QUOTED] == 123.0
+    assert not fetcher.is_stale
+
+
+def test_repeated_snapshot_is_not_a_real_tick():
+    fetcher = bori.LiveFetcher(TICKERS)
+    fetcher.fetch_initial_history()
+    fetcher.feed = FixedFeed()
+    fetcher.feed._publish({ticker: 1.0 for ticker in TICKERS})
+    scheduler = bori.live_loop_scheduler(fetcher)
+
+    assert bori.next_price_frame({'logic'}, scheduler, fetcher)[1]
+    # El vigía vence otra vez sin snapshot nuevo (todavía no 'stale'): solo micro-movimientos
+    _, is_real_tick, _ = bori.next_price_frame({'logic'}, scheduler, fetcher)
+    assert not is_real_tick
+    assert not fetcher.is_stale
+
+
+def test_background_feed_survives_malformed_payload(monkeypatch):
+    monkeypatch.setattr(bori.CONFIG, 'FEED_BACKOFF_BASE_SECONDS', 0.01)
+    monkeypatch.setattr(bori.CONFIG, 'FEED_BACKOFF_MAX_SECONDS', 0.02)
+    feed = bori.BackgroundPriceFeed('http://127.0.0.1:9', ['bitcoin'], {'bitcoin': 'BTC'}, interval=0.01)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise KeyError('usd')
+        return {'BTC': 1.0}
+
+    feed.fetch_once = flaky
+    feed.start()
+    deadline = time.time() + 5
+    while feed.latest() is None and time.time() < deadline:
+        time.sleep(0.01)
+    feed.stop()
+
+    assert feed.latest() is not None
+    assert feed.consecutive_errors == 0 and feed.last_error is None
+
+
+def test_price_feed_requires_run():
+    with pytest.raises(TypeError):
+        bori.PriceFeed()
@@ -0,0 +1,88 @@
+"""FetchPlanner: lotes parejos bajo el largo máximo de URL, fusión de respuestas y presupuesto común."""
+import pytest
+
+import Bori_tracker as bori
+
+URL = 'https://api.coingecko.com/api/v3/simple/price'
+
+
+class FakeCache:
+    """Responde cada lote con un precio por id; los ids de `failing` hacen fallar su lote."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+
+    def get_json(self, url, params, timeout=None):
+        ids = params['ids'].split(',')
+        self.batches.append(ids)
+        if self.failing & set(ids):
+            raise bori.requests.exceptions.ConnectionError('caída')
+        return {coin_id: {'usd': float(len(coin_id))} for coin_id in ids}
+
+
+def make_planner(cache=None, max_url_length=200, per_minute=6000, burst=100):
+    return bori.FetchPlanner(URL, cache=cache or FakeCache(), budget=bori.RequestBudget(per_minute, burst),
+                             max_url_length=max_url_length, max_workers=4)
+
+
+def ids(n):
+    return [f"coin-{k:03d}" for k in range(n)]
+
+
+def test_plan_uses_the_fewest_even_batches_under_the_url_limit():
+    planner = make_planner()
+    coin_ids = ids(40)
+
+    batches = planner.plan(coin_ids)
+
+    assert [coin_id for batch in batches for coin_id in batch] == coin_ids
+    assert all(planner._batch_length(batch) <= planner.max_url_length for batch in batches)
+    # Mismo número de lotes que el reparto greedy, pero de tamaños parejos
+    assert len(batches) == 4 and max(map(len, batches)) - min(map(len, batches)) <= 1
+    assert planner.plan(list(coin_ids)) is batches
+
+
+def test_fetch_merges_every_batch():
+    cache = FakeCache()
+    planner = make_planner(cache)
+
+    prices = planner.fetch(ids(40), time_budget=5)
+    planner.close()
+
+    assert sorted(prices) == ids(40) and len(cache.batches) == 4
+
+
+def test_failed_batches_are_dropped_until_all_fail():
+    planner = make_planner(FakeCache(failing={'coin-000'}))
+    prices = planner.fetch(ids(40), time_budget=5)
+    assert 'coin-000' not in prices and len(prices) == 30 and planner.failed_batches == 1
+
+    planner.cache.failing = set(ids(40))
+    with pytest.raises(bori.requests.exceptions.ConnectionError):
+        planner.fetch(ids(40), time_budget=5)
+    planner.close()
+
+
+def test_exhausted_budget_fails_the_batch_instead_of_blocking():
+    cache = FakeCache()
+    planner = make_planner(cache, per_minute=0.001, burst=1)
+
+    assert planner.fetch(ids(5), time_budget=0.05) == {coin_id: {'usd': 8.0} for coin_id in ids(5)}
+    with pytest.raises(bori.requests.exceptions.RequestException):
+        planner.fetch(ids(5), time_budget=0.05)
+    assert len(cache.batches) == 1
+
+
+def test_budget_refills_at_its_rate(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(bori.time, 'monotonic', lambda: now[0])
+    budget = bori.RequestBudget(per_minute=60, burst=2)
+
+    assert budget.acquire(timeout=0) and budget.acquire(timeout=0)
+    assert not budget.acquire(timeout=0)
+    now[0] += 1.0
+    assert budget.acquire(timeout=0) and not budget.acquire(timeout=0)
+    now[0] += 10.0
+    # La cubeta no acumula más que `burst`
+    assert budget.acquire(timeout=0) and budget.acquire(timeout=0) and not budget.acquire(timeout=0)
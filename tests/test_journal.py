@@ -0,0 +1,68 @@
+"""Diario de sesión: una sesión por archivo y una reproducción con las mismas compras."""
+import numpy as np
+import pytest
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+@pytest.fixture(autouse=True)
+def fresh_config(monkeypatch):
+    # replay_journal aplica la configuración grabada sobre CONFIG
+    monkeypatch.setattr(bori, 'CONFIG', bori.BotConfiguration())
+
+
+def price_path(history, n_ticks, seed):
+    rng = np.random.default_rng(seed)
+    start = np.array([bori.history_closes(history[ticker])[-1] for ticker in TICKERS])
+    return start * np.cumprod(1 + rng.normal(-0.0003, 0.01, (n_ticks, len(TICKERS))), axis=0)
+
+
+def record_session(path, n_ticks, seed=3):
+    session_seed = bori.seed_rngs(seed)
+    fetcher = bori.LiveFetcher(TICKERS)
+    history = fetcher.fetch_initial_history()
+    manager = bori.PortfolioManager(history, fetcher)
+    journal = bori.SessionJournal(str(path), TICKERS)
+    journal.write_header(session_seed)
+    journal.write_history(history)
+    manager.attach_journal(journal)
+    for k, row in enumerate(price_path(history, n_ticks, seed)):
+        manager._process_frame(dict(zip(TICKERS, row.tolist())), k % 3 == 0, 1_700_000_000.0 + k * 0.5)
+    journal.close()
+    return manager
+
+
+def test_replay_reproduces_the_recorded_fills(tmp_path):
+    path = tmp_path / 'sesion.bjn'
+    manager = record_session(path, 600)
+
+    replayed, recorded_fills, replayed_fills = bori.replay_journal(str(path))
+
+    assert len(recorded_fills) == len(manager.ledger) > 0
+    assert sorted(recorded_fills) == sorted(replayed_fills)
+    assert replayed.sim_tick_counter == manager.sim_tick_counter
+
+
+def test_reopening_a_journal_replaces_the_previous_session(tmp_path):
+    path = tmp_path / 'sesion.bjn'
+    record_session(path, 900, seed=3)
+    manager = record_session(path, 300, seed=5)
+
+    headers = [data for record_type, data in bori.SessionJournal.read(str(path))
+               if record_type == bori.SessionJournal.HEADER]
+    assert [header['seed'] for header in headers] == [5]
+    _, recorded_fills, replayed_fills = bori.replay_journal(str(path))
+    assert len(recorded_fills) == len(manager.ledger)
+    assert sorted(recorded_fills) == sorted(replayed_fills)
+
+
+def test_truncated_journal_stops_at_the_last_whole_record(tmp_path):
+    path = tmp_path / 'sesion.bjn'
+    record_session(path, 300)
+    whole = list(bori.SessionJournal.read(str(path)))
+    with open(path, 'r+b') as f:
+        f.truncate(path.stat().st_size - 5)
+
+    assert len(list(bori.SessionJournal.read(str(path)))) == len(whole) - 1
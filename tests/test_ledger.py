@@ -0,0 +1,83 @@
+"""Registro de compras: volcado incremental, una sesión por archivo y volcado por timer en el loop."""
+import numpy as np
+import pytest
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+QUOTED = next(ticker for ticker in TICKERS if ticker != 'BRCN')
+
+
+def append_rows(ledger, n_rows, first_tick=0):
+    for k in range(n_rows):
+        ledger.append(first_tick + k, k % len(TICKERS), 'BUY_DCA', 1.0, 1.0 + k, 0.5, 100.0 - k, 0.5 * (k + 1), 0.01)
+
+
+def test_rows_are_flushed_every_flush_rows(tmp_path):
+    path = str(tmp_path / 'compras.csv')
+    ledger = bori.TransactionLedger(TICKERS, path=path, flush_rows=3, flush_seconds=3600)
+
+    append_rows(ledger, 7)
+    assert len(bori.TransactionLedger.read(path)) == 6
+    ledger.close()
+    written = bori.TransactionLedger.read(path)
+    np.testing.assert_array_equal(written['Tick'], ledger.column('tick'))
+    np.testing.assert_array_equal(written['Exec_Price'], ledger.column('exec_price'))
+
+
+@pytest.mark.parametrize('name', ['compras.csv', 'compras.parquet', 'compras.arrow'])
+def test_first_flush_replaces_a_previous_session(tmp_path, name):
+    path = str(tmp_path / name)
+    previous = bori.TransactionLedger(TICKERS, path=path, flush_rows=1, flush_seconds=3600)
+    append_rows(previous, 5, first_tick=100)
+    previous.close()
+
+    ledger = bori.TransactionLedger(TICKERS, path=path, flush_rows=2, flush_seconds=3600)
+    append_rows(ledger, 4)
+    ledger.close()
+
+    assert bori.TransactionLedger.read(path)['Tick'].tolist() == [0, 1, 2, 3]
+
+
+def test_loop_timer_flushes_a_lone_buy(tmp_path, monkeypatch):
+    path = str(tmp_path / 'compras.csv')
+    monkeypatch.setattr(bori.CONFIG, 'LEDGER_PATH', path)
+    monkeypatch.setattr(bori.CONFIG, 'LEDGER_FLUSH_ROWS', 10 ** 6)
+    monkeypatch.setattr(bori.CONFIG, 'LEDGER_FLUSH_SECONDS', 3600.0)
+    monkeypatch.setattr(bori.CONFIG, 'RSI_BUY_THRESHOLD', 100)  # Toda señal compra
+    bori.seed_rngs(3)
+    fetcher = bori.LiveFetcher(TICKERS)
+    manager = bori.PortfolioManager(fetcher.fetch_initial_history(), fetcher)
+    fetcher._resolve_ids = lambda: None
+    fetcher.api_ids, fetcher.id_to_ticker = ['bitcoin'], {'bitcoin': QUOTED}
+    fetcher.planner.fetch = lambda ids, *args, **kwargs: {'bitcoin': {'usd': 1.0}}
+    fetcher.last_api_call_time = 0.0
+
+    rows_seen = []
+
+    def stop():
+        rows_seen.append(len(bori.TransactionLedger.read(path)))
+        raise KeyboardInterrupt
+
+    def flush_timer():
+        # La compra sigue en memoria: ni LEDGER_FLUSH_ROWS ni el tiempo entre compras la volcaron
+        rows_seen.append(len(manager.ledger) - manager.ledger._flushed)
+        return {'ledger_flush'}
+
+    # Los timers reales del loop, pero `wait` devuelve eventos guionados en lugar de dormir
+    schedulers = []
+    live_loop_scheduler = bori.live_loop_scheduler
+
+    def scripted_scheduler(*args):
+        scheduler = live_loop_scheduler(*args)
+        script = iter([lambda: {'logic'}, flush_timer, stop])
+        scheduler.wait = lambda: next(script)()
+        schedulers.append(scheduler)
+        return scheduler
+
+    monkeypatch.setattr(bori, 'live_loop_scheduler', scripted_scheduler)
+    manager.run_trading_loop()
+
+    assert 'ledger_flush' in schedulers[0].intervals
+    assert rows_seen[0] == len(manager.ledger) > 0
+    assert rows_seen[1] == len(manager.ledger)
@@ -0,0 +1,45 @@
+"""Métricas en streaming vs el cálculo con pandas sobre la serie completa."""
+import numpy as np
+import pandas as pd
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+def test_streaming_metrics_match_pandas():
+    values = 1000 * np.cumprod(1 + np.random.default_rng(5).normal(0, 0.002, 2000))
+    metrics = bori.StreamingMetrics()
+    for value in values:
+        metrics.update(value)
+
+    np.testing.assert_allclose(metrics.risk_metrics(), bori.calculate_risk_metrics(pd.Series(values)), rtol=1e-9)
+
+
+def test_recent_std_uses_the_window():
+    values = 1000 * np.cumprod(1 + np.random.default_rng(6).normal(0, 0.002, 300))
+    metrics = bori.StreamingMetrics(window=28)
+    for value in values:
+        metrics.update(value)
+
+    expected = pd.Series(values).pct_change().iloc[-28:].std()
+    np.testing.assert_allclose(metrics.recent_std(), expected, rtol=1e-9)
+
+
+def test_report_metrics_only_see_real_ticks():
+    bori.seed_rngs(3)
+    fetcher = bori.LiveFetcher(TICKERS)
+    manager = bori.PortfolioManager(fetcher.fetch_initial_history(), fetcher)
+    rng = np.random.default_rng(7)
+    prices = np.array([bori.CONFIG.INITIAL_PRICES[ticker] for ticker in TICKERS])
+    real_values = [manager.initial_usdc_balance]
+    for k in range(400):
+        prices = prices * (1 + rng.normal(-0.0003, 0.01, len(prices)))
+        # Cadencia irregular de frames (feed, vigía, visuales): solo algunos son ticks reales
+        is_real_tick = rng.random() < 0.2
+        manager._process_frame(dict(zip(TICKERS, prices.tolist())), is_real_tick, 1_700_000_000.0 + k)
+        if is_real_tick:
+            real_values.append(manager.portfolio_value_history.last())
+
+    np.testing.assert_allclose(manager.logic_metrics.risk_metrics(),
+                               bori.calculate_risk_metrics(pd.Series(real_values)), rtol=1e-9)
@@ -0,0 +1,41 @@
+"""Frames simulados: una sola fila del simulador por frame, BRCN incluido."""
+import numpy as np
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+def counting_fetcher():
+    fetcher = bori.LiveFetcher(TICKERS)
+    fetcher.fetch_initial_history()
+    rows = []
+    next_returns = fetcher.simulator.next_returns
+
+    def record(scale=1.0):
+        rows.append(next_returns(scale))
+        return rows[-1]
+
+    fetcher.simulator.next_returns = record
+    return fetcher, rows
+
+
+def test_mock_frame_draws_one_row_for_every_asset():
+    fetcher, rows = counting_fetcher()
+    before = np.array([fetcher.current_prices[ticker] for ticker in TICKERS])
+
+    fetcher._mock_prices_only()
+
+    assert len(rows) == 1
+    after = np.array([fetcher.current_prices[ticker] for ticker in TICKERS])
+    np.testing.assert_allclose(after, before * (1 + rows[0]), rtol=1e-15)
+
+
+def test_real_prices_draw_one_row_for_brcn():
+    fetcher, rows = counting_fetcher()
+    before = fetcher.current_prices['BRCN']
+
+    fetcher._apply_prices({ticker: 1.0 for ticker in TICKERS if ticker != 'BRCN'})
+
+    assert len(rows) == 1
+    assert fetcher.current_prices['BRCN'] == before * (1 + rows[0][TICKERS.index('BRCN')])
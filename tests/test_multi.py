@@ -0,0 +1,59 @@
+"""Multi-portafolio: un pipeline compartido y los mismos resultados que un motor por separado."""
+import copy
+
+import numpy as np
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+def simulated_paths(n_ticks=2000, seed=3):
+    simulator = bori.MarketSimulator(TICKERS, seed=seed)
+    return simulator.simulate_paths(n_ticks, [bori.CONFIG.INITIAL_PRICES[ticker] for ticker in TICKERS])
+
+
+def test_portfolios_match_standalone_engines():
+    paths = simulated_paths()
+    history = {ticker: {'Close': paths[:28, i]} for i, ticker in enumerate(TICKERS)}
+    specs = {'base': {}, 'agresivo': {'RSI_BUY_THRESHOLD': '45'}, 'rsi14': {'RSI_PERIOD': '14'}}
+    multi = bori.MultiPortfolioEngine.from_history_map(history, specs, TICKERS)
+    standalone = {}
+    for name, spec in specs.items():
+        config = copy.copy(bori.CONFIG)
+        config.apply_overrides(spec)
+        standalone[name] = bori.VectorizedPortfolioEngine.from_history_map(history, TICKERS, config=config)
+
+    for k, row in enumerate(paths[28:]):
+        multi.step(row, k % 3 == 0)
+        for engine in standalone.values():
+            engine.step(row, k % 3 == 0)
+
+    for name, engine in standalone.items():
+        shared = multi.engines[name]
+        np.testing.assert_array_equal(shared.ledger.column('tick'), engine.ledger.column('tick'))
+        np.testing.assert_array_equal(shared.usdc_balance, engine.usdc_balance)
+        assert shared.indicators is multi.indicators and shared.shared_indicators
+    # El RSI de período 5 se comparte entre 'base' y 'agresivo': dos RSI en total
+    assert sum(1 for key in multi.indicators.nodes if key[0] == 'rsi') == 2
+
+
+def test_portfolio_overrides_keep_explicit_base_values():
+    base = bori.BotConfiguration()
+    base.apply_overrides({'USDC_TO_TRADE_PCT': '0.5', 'CAPITAL_PER_ASSET': '50'})
+    multi = bori.MultiPortfolioEngine(TICKERS, {'umbral': {'RSI_BUY_THRESHOLD': '20'}}, config=base)
+
+    config = multi.engines['umbral'].config
+    assert config.USDC_TO_TRADE_PCT == 0.5
+    assert config.CAPITAL_PER_ASSET == 50.0
+    assert config.RSI_BUY_THRESHOLD == 20
+    # La copia no comparte el conjunto de llaves explícitas con la base
+    assert 'RSI_BUY_THRESHOLD' not in base.explicit_keys
+
+
+def test_derived_values_follow_non_explicit_changes():
+    config = bori.BotConfiguration()
+    config.apply_overrides({'INITIAL_USDC_BALANCE': '2000'})
+
+    assert config.CAPITAL_PER_ASSET == 2000 / len(config.ASSETS_TO_TRACK)
+    assert config.USDC_TO_TRADE_PCT == config.MAX_CAPITAL_ALLOCATION_PCT
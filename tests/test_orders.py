@@ -0,0 +1,53 @@
+"""Órdenes límite: encolar no es ejecutar; el balance cambia recién con el llenado."""
+import numpy as np
+
+import Bori_tracker as bori
+
+TICKER = next(ticker for ticker in bori.CONFIG.ASSETS_TO_TRACK if ticker != 'BRCN')
+
+
+class QueueOnlyPipeline:
+    """Pipeline sin exchange: solo registra las órdenes enviadas."""
+
+    def __init__(self):
+        self.orders = []
+
+    def submit(self, ticker, qty, limit_price, reference_price, trade_type):
+        order = bori.LimitOrder(len(self.orders) + 1, ticker, 'BUY', qty, limit_price, reference_price, trade_type)
+        self.orders.append(order)
+        return order
+
+
+def oversold_asset():
+    # Caída sostenida: RSI en 0, muy por debajo de RSI_BUY_THRESHOLD
+    closes = np.linspace(100.0, 50.0, bori.CONFIG.INITIAL_HISTORY_TICKS)
+    asset = bori.TradingAsset(TICKER, 1000.0, {'Close': closes}, None)
+    asset.order_pipeline = QueueOnlyPipeline()
+    return asset
+
+
+def test_queued_limit_order_is_not_an_executed_buy(monkeypatch):
+    monkeypatch.setattr(bori.CONFIG, 'LIVE_TRADING_ENABLED', True)
+    asset = oversold_asset()
+
+    opinion, action_taken = asset.run_tick(True)
+
+    assert not action_taken
+    assert 'ORDEN LÍMITE ENVIADA' in opinion and 'COMPRA DCA' not in opinion
+    assert asset.pending_order_id == 1
+    assert asset.usdc_balance == 1000.0 and len(asset.ledger) == 0
+
+
+def test_fill_updates_balances(monkeypatch):
+    monkeypatch.setattr(bori.CONFIG, 'LIVE_TRADING_ENABLED', True)
+    asset = oversold_asset()
+    asset.run_tick(True)
+    order = asset.order_pipeline.orders[0]
+
+    # Mientras la orden está en vuelo no se duplica la señal
+    opinion, _ = asset.run_tick(True)
+    assert 'EN CURSO' in opinion and len(asset.order_pipeline.orders) == 1
+
+    asset.apply_fill(order, bori.OrderFill(order.order_id, TICKER, order.qty, order.limit_price, 'FILLED'))
+    assert asset.pending_order_id is None
+    assert asset.asset_balance == order.qty and len(asset.ledger) == 1
@@ -0,0 +1,74 @@
+"""Reanudar desde un checkpoint: registro reescrito y un diario nuevo que replay reproduce igual."""
+import numpy as np
+import pytest
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+@pytest.fixture(autouse=True)
+def fresh_config(monkeypatch):
+    # replay_journal aplica la configuración grabada sobre CONFIG
+    monkeypatch.setattr(bori, 'CONFIG', bori.BotConfiguration())
+
+
+def append_rows(ledger, ticks):
+    for tick in ticks:
+        ledger.append(tick, 0, 'BUY_DCA', 1.0, 1.0, 0.5, 100.0, 0.5, 0.01)
+
+
+def test_restored_ledger_rewrites_its_path(tmp_path):
+    path = str(tmp_path / 'compras.csv')
+    before = bori.TransactionLedger(TICKERS, path=path, flush_rows=1, flush_seconds=3600)
+    append_rows(before, [0, 1, 2])
+    state = before.get_state()
+    # Compras posteriores al checkpoint que ya llegaron al disco antes de la caída
+    append_rows(before, [3, 4])
+    assert len(bori.TransactionLedger.read(path)) == 5
+
+    resumed = bori.TransactionLedger(TICKERS, path=path, flush_rows=1, flush_seconds=3600)
+    resumed.set_state(state)
+    assert bori.TransactionLedger.read(path)['Tick'].tolist() == [0, 1, 2]
+    append_rows(resumed, [3])
+    resumed.close()
+    assert bori.TransactionLedger.read(path)['Tick'].tolist() == [0, 1, 2, 3]
+
+
+def new_session(seed=3):
+    session_seed = bori.seed_rngs(seed)
+    fetcher = bori.LiveFetcher(TICKERS)
+    history = fetcher.fetch_initial_history()
+    return bori.PortfolioManager(history, fetcher), history, session_seed
+
+
+def feed(manager, path, first_frame):
+    for k, row in enumerate(path, start=first_frame):
+        manager._process_frame(dict(zip(TICKERS, row.tolist())), k % 3 == 0, 1_700_000_000.0 + k * 0.5)
+
+
+def test_resumed_journal_replays_identically(tmp_path):
+    manager, history, _ = new_session()
+    start = np.array([bori.history_closes(history[ticker])[-1] for ticker in TICKERS])
+    path = start * np.cumprod(1 + np.random.default_rng(4).normal(-0.0003, 0.01, (600, len(TICKERS))), axis=0)
+    feed(manager, path[:300], 0)
+    checkpoint_path = tmp_path / 'estado.npz'
+    bori.write_checkpoint(str(checkpoint_path), manager.capture_state())
+    checkpoint = checkpoint_path.read_bytes()
+
+    # Proceso nuevo: restaura el checkpoint y graba un diario que arranca desde él
+    resumed, history, session_seed = new_session()
+    resumed.restore_state(bori.read_checkpoint(str(checkpoint_path)))
+    journal_path = str(tmp_path / 'sesion.resume.bjn')
+    journal = bori.SessionJournal(journal_path, TICKERS)
+    journal.write_header(session_seed)
+    journal.write_history(history)
+    journal.write_checkpoint(checkpoint)
+    resumed.attach_journal(journal)
+    feed(resumed, path[300:], 300)
+    journal.close()
+
+    replayed, recorded_fills, replayed_fills = bori.replay_journal(journal_path)
+    assert len(recorded_fills) == len(resumed.ledger) - len(manager.ledger) > 0
+    assert sorted(recorded_fills) == sorted(replayed_fills)
+    assert replayed.sim_tick_counter == resumed.sim_tick_counter
@@ -0,0 +1,55 @@
+"""LoopScheduler con un reloj falso: deadlines, re-armado y despertar por evento."""
+import pytest
+
+import Bori_tracker as bori
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def scheduler():
+    return bori.LoopScheduler(clock=FakeClock())
+
+
+def test_timers_fire_in_deadline_order(scheduler):
+    scheduler.add_timer('logic', 2.0, first_delay=0.0)
+    scheduler.add_timer('visual', 0.5)
+
+    assert scheduler.wait() == {'logic'}
+    assert scheduler.time_until('visual') == 0.5
+    scheduler.clock.now = 0.5
+    assert scheduler.wait() == {'visual'}
+    scheduler.clock.now = 2.0
+    # Ambos vencen juntos; cada uno se re-arma desde ahora
+    assert scheduler.wait() == {'logic', 'visual'}
+    assert scheduler.time_until('logic') == 2.0 and scheduler.time_until('visual') == 0.5
+
+
+def test_reset_replaces_the_previous_deadline(scheduler):
+    scheduler.add_timer('logic', 10.0)
+    scheduler.reset('logic', 1.0)
+    assert scheduler.time_until('logic') == 1.0
+
+    scheduler.clock.now = 1.0
+    assert scheduler.wait() == {'logic'}
+    assert scheduler.time_until('logic') == 10.0
+    # La entrada original (t=10) quedó sin efecto: solo dispara el deadline re-armado (t=11)
+    scheduler.clock.now = 11.0
+    assert scheduler.wait() == {'logic'}
+    assert [deadline for deadline, _ in scheduler._heap] == [21.0]
+    assert scheduler.time_until('otro') == float('inf')
+
+
+def test_wake_event_interrupts_the_wait(scheduler):
+    scheduler.add_timer('logic', 60.0)
+    scheduler.wake_event.set()
+
+    assert scheduler.wait() == {'wake'}
+    assert not scheduler.wake_event.is_set()
+    assert scheduler.time_until('logic') == 60.0
@@ -0,0 +1,59 @@
+"""BUY_SIGNAL: parseo de expresiones y un DAG de indicadores que comparte nodos comunes."""
+import numpy as np
+import pytest
+
+import Bori_tracker as bori
+
+CONFIG = bori.BotConfiguration()
+
+
+def test_signal_parsing():
+    signal = bori.BuySignal('rsi <= RSI_BUY_THRESHOLD & close < bb_lower(20, 2) | rsi(14) < 10', CONFIG)
+    rsi = ('rsi', CONFIG.RSI_PERIOD, CONFIG.RSI_SMOOTHING)
+    bb_lower = ('affine', ('sma', bori.CLOSE, 20), ('std', 20), -2.0)
+
+    assert signal.clauses == [[(rsi, '<=', float(CONFIG.RSI_BUY_THRESHOLD)), (bori.CLOSE, '<', bb_lower)],
+                              [(('rsi', 14, CONFIG.RSI_SMOOTHING), '<', 10.0)]]
+    assert signal.requirements == [rsi, bori.CLOSE, bb_lower, ('rsi', 14, CONFIG.RSI_SMOOTHING)]
+    assert bori.BuySignal(CONFIG.BUY_SIGNAL, CONFIG).is_rsi_threshold(CONFIG)
+    assert not signal.is_rsi_threshold(CONFIG)
+
+
+@pytest.mark.parametrize('expression', ['rsi = 30', 'vwap < 10', 'rsi <= NO_EXISTE', 'ema(12, 3) > close'])
+def test_invalid_signals_raise_value_error(expression):
+    with pytest.raises(ValueError):
+        bori.BuySignal(expression, CONFIG)
+
+
+def test_pipeline_shares_common_nodes():
+    requirements = bori.BuySignal('close < bb_lower(20, 2) | close > bb_upper(20, 2) | close < sma(20)'
+                                  ' | macd_hist > 0 | macd > 0', CONFIG).requirements
+    pipeline = bori.IndicatorPipeline(3, requirements)
+
+    # Bandas + sma: sma(close), square, sma(square), std y las dos bandas (una sola media de 20).
+    # MACD + histograma: dos ema, la resta, su ema de señal y el histograma (un solo MACD).
+    assert len(pipeline.nodes) == 6 + 5
+    assert sum(1 for key in pipeline.nodes if key[0] == 'ewm') == 3
+    assert pipeline.warmup([('sma', bori.CLOSE, 20)]) == 20
+
+
+def test_update_block_matches_rows():
+    prices = 100 * np.cumprod(1 + np.random.default_rng(8).normal(0, 0.01, (400, 3)), axis=0)
+    requirements = bori.BuySignal('rsi < 30 | close < bb_lower(20, 2) | macd_hist > 0', CONFIG).requirements
+    by_row = bori.IndicatorPipeline(3, requirements)
+    by_block = bori.IndicatorPipeline(3, requirements)
+
+    rows = [by_row.update(row) for row in prices]
+    blocks = [by_block.update_block(block) for block in np.array_split(prices, 3)]
+
+    for key in requirements:
+        np.testing.assert_allclose(np.concatenate([block[key] for block in blocks]),
+                                   np.array([row[key] for row in rows]), rtol=1e-9, equal_nan=True)
+
+
+def test_indicator_node_requires_update():
+    class NoUpdate(bori.IndicatorNode):
+        pass
+
+    with pytest.raises(TypeError):
+        NoUpdate(('x',), 1)
@@ -0,0 +1,24 @@
+"""Barrido paralelo: una pasada de indicadores por período y los mismos resultados que cada backtest."""
+import copy
+
+import numpy as np
+
+import Bori_tracker as bori
+
+TICKERS = bori.CONFIG.ASSETS_TO_TRACK
+
+
+def test_sweep_rows_match_individual_backtests():
+    paths = bori.MarketSimulator(TICKERS, seed=11).simulate_paths(3000, [bori.CONFIG.INITIAL_PRICES[t] for t in TICKERS])
+    grid = {'RSI_PERIOD': [5, 14], 'RSI_BUY_THRESHOLD': [20, 35], 'USDC_TO_TRADE_PCT': [0.3]}
+    table = bori.run_parameter_sweep(paths, TICKERS, grid, workers=2, block_size=700)
+
+    assert len(table) == 4
+    for row in table.to_dict('records'):
+        config = copy.copy(bori.CONFIG)
+        for name in grid:
+            setattr(config, name, row[name])
+        engine = bori.run_backtest(paths, TICKERS, config=config, block_size=700)['engine']
+        assert row['Compras'] == len(engine.ledger) > 0
+        np.testing.assert_allclose(row['Rendimiento (%)'],
+                                   (engine.portfolio_value() / engine.initial_usdc_balance - 1) * 100, rtol=1e-12)
@@ -0,0 +1,45 @@
+"""TieredSeries: memoria acotada sin perder el índice ni el último valor de cada bucket."""
+import numpy as np
+
+import Bori_tracker as bori
+
+
+def make_series(values=()):
+    return bori.TieredSeries(values, raw_capacity=50, rollup_factor=4, levels=2, level_capacity=10)
+
+
+def test_memory_is_bounded_and_every_sample_is_accounted_for():
+    values = np.random.default_rng(1).normal(100, 5, 5000)
+    series = make_series(values)
+
+    assert len(series) == 5000 and series.peak == values.max()
+    assert len(series._raw) == 50 and all(len(level) <= 10 for level in series._levels)
+    kept = sum(bucket[4] for level in series._levels for bucket in level)
+    kept += sum(pending[4] for pending in series._pending if pending is not None)
+    assert kept + len(series._raw) + series.dropped == 5000
+
+
+def test_series_points_are_real_samples():
+    values = np.random.default_rng(2).normal(100, 5, 700)
+    series = make_series(values)
+
+    xs, ys = series.series()
+    assert np.all(np.diff(xs) > 0) and xs[-1] == 699
+    # Cada punto (también los agregados) es el último valor de su tramo
+    np.testing.assert_array_equal(ys, values[xs])
+    assert series.tail(20) == values[-20:].tolist()
+    assert series.last() == values[-1]
+
+
+def test_state_round_trip_continues_identically():
+    values = np.random.default_rng(3).normal(100, 5, 900)
+    reference = make_series(values)
+
+    before = make_series(values[:437])
+    resumed = make_series()
+    resumed.set_state(before.get_state())
+    resumed.extend(values[437:])
+
+    for left, right in zip(reference.series(), resumed.series()):
+        np.testing.assert_array_equal(left, right)
+    assert (resumed.count, resumed.dropped, resumed.peak) == (reference.count, reference.dropped, reference.peak)